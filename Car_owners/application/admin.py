@@ -8,10 +8,15 @@ class CarInLine(admin.TabularInline):
 
 class OwnerAdmin(admin.ModelAdmin):
     inlines = [CarInLine]
+    list_display = ("__str__", *Owner.AGGREGATE_FIELDS)
+    # Maintained on car changes only
+    readonly_fields = Owner.AGGREGATE_FIELDS
 
 
 class CarAdmin(admin.ModelAdmin):
     list_display = ("__str__", "owner")
+    # Owners are joined, not fetched once per listed car
+    list_select_related = ("owner",)
     list_filter = ("owner",)
 
 
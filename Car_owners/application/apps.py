@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ApplicationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "application"
+
+    def ready(self) -> None:
+        from . import checks, signals  # noqa: F401
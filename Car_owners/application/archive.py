@@ -0,0 +1,47 @@
+import datetime
+from django.db import connection, transaction
+from django.utils import timezone
+from .cache import invalidate_model
+from .models import Car, ArchivedCar
+
+
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def archive_batch(cutoff: datetime.datetime, batch_size: int) -> int:
+    """
+    Moves one batch of repaired cars last changed before cutoff to the archive
+    table, in a short transaction of its own. Returns the number of moved cars,
+    0 when none is left. Cars locked by other transactions are skipped on
+    Postgres and archived by a later batch.
+
+    Archived cars still count in the statistics and owners' aggregates, so
+    neither is updated.
+    """
+    columns = ", ".join(
+        connection.ops.quote_name(field.column) for field in Car._meta.concrete_fields
+    )
+    cars_table = connection.ops.quote_name(Car._meta.db_table)
+    archive_table = connection.ops.quote_name(ArchivedCar._meta.db_table)
+    with transaction.atomic():
+        ids = list(
+            Car.objects.select_for_update(skip_locked=True)
+            .filter(repaired=True, updated_at__lt=cutoff)
+            .order_by("updated_at")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+
+        ids_sql = ", ".join(["%s"] * len(ids))
+        archived_at = connection.ops.adapt_datetimefield_value(timezone.now())
+        with connection.cursor() as cursor:
+            # Raw statements keep updated_at and send no delete signals
+            cursor.execute(
+                f"INSERT INTO {archive_table} ({columns}, archived_at) "
+                f"SELECT {columns}, %s FROM {cars_table} WHERE id IN ({ids_sql})",
+                [archived_at, *ids],
+            )
+            cursor.execute(f"DELETE FROM {cars_table} WHERE id IN ({ids_sql})", ids)
+        invalidate_model(Car)
+    return len(ids)
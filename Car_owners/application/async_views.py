@@ -0,0 +1,83 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views import View
+from rest_framework.exceptions import APIException, NotAcceptable
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import BaseRenderer, BrowsableAPIRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from .db_routers import replica_reads
+from .views import BaseViewSet
+
+
+class AsyncReadView(View):
+    """
+    Async variant of a viewset's read action (list, retrieve or unrepaired). Under
+    an ASGI server requests waiting on the database do not hold a worker thread.
+    Responses are rendered with the viewset's renderers picked by the Accept
+    header, except for the browsable API, JSON by default. Access is checked and
+    responses are cached as in the sync views.
+    """
+
+    viewset_class: type[BaseViewSet] = None
+    action: str = None
+
+    @staticmethod
+    def select_renderer(request: Request) -> tuple[BaseRenderer, str]:
+        renderers = [
+            renderer_class()
+            for renderer_class in api_settings.DEFAULT_RENDERER_CLASSES
+            if not issubclass(renderer_class, BrowsableAPIRenderer)
+        ]
+        try:
+            return DefaultContentNegotiation().select_renderer(request, renderers)
+        except NotAcceptable:
+            return renderers[0], renderers[0].media_type
+
+    @staticmethod
+    def check_access(viewset: BaseViewSet, request: Request) -> None:
+        """
+        Runs the viewset's authentication, permission and throttling checks, as the
+        sync views do before any action.
+        """
+        viewset.perform_authentication(request)
+        viewset.check_permissions(request)
+        viewset.check_throttles(request)
+
+    async def get(self, request: HttpRequest, **kwargs) -> HttpResponse:
+        viewset = self.viewset_class(
+            action=self.action, kwargs=kwargs, format_kwarg=None
+        )
+        api_request = Request(request, authenticators=viewset.get_authenticators())
+        renderer, media_type = self.select_renderer(api_request)
+        api_request.accepted_renderer = renderer
+        api_request.accepted_media_type = media_type
+        viewset.request = api_request
+
+        try:
+            # Authentication may read the session and the user from the database
+            await sync_to_async(self.check_access)(viewset, api_request)
+            with replica_reads():
+                response = await getattr(viewset, f"a{self.action}")(
+                    api_request, **kwargs
+                )
+        except (APIException, Http404) as exception:
+            # Also answers 403 instead of 401 when no authenticator sends a challenge
+            response = viewset.handle_exception(exception)
+        if not isinstance(response, Response):
+            # Not modified
+            return response
+
+        for header, value in viewset.validator_headers.items():
+            response.headers.setdefault(header, value)
+        patch_vary_headers(response, ["Accept"])
+        response.accepted_renderer = renderer
+        response.accepted_media_type = media_type
+        response.renderer_context = {
+            "view": viewset,
+            "request": api_request,
+            "response": response,
+        }
+        return response.render()
@@ -0,0 +1,177 @@
+import collections
+import functools
+import hashlib
+import inspect
+import json
+import time
+from typing import Callable
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models import Model
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+from .db_routers import primary_pinned, replica_configured
+
+
+RESPONSE_CACHE_ALIAS = "api_responses"
+VERSION_CACHE_ALIAS = "api_versions"
+
+# Counted per worker process
+cache_stats = collections.Counter(hits=0, misses=0)
+
+
+def get_version_key(model: type[Model]) -> str:
+    return f"version:{model._meta.label_lower}"
+
+
+def get_written_key(model: type[Model]) -> str:
+    return f"written:{model._meta.label_lower}"
+
+
+def get_model_version(model: type[Model]) -> int:
+    versions = caches[VERSION_CACHE_ALIAS]
+    version = versions.get(get_version_key(model))
+    if version is None:
+        # Starting from the clock never reuses a version from before an eviction
+        versions.add(get_version_key(model), time.time_ns())
+        version = versions.get(get_version_key(model))
+    return version
+
+
+def bump_model_version(model: type[Model]) -> None:
+    versions = caches[VERSION_CACHE_ALIAS]
+    try:
+        versions.incr(get_version_key(model))
+    except ValueError:
+        versions.set(get_version_key(model), time.time_ns())
+    if replica_configured():
+        versions.set(get_written_key(model), time.time())
+
+
+def written_recently(models: list[type[Model]]) -> bool:
+    """
+    Tells whether any of models was written within the replica's maximum lag, so
+    the replica may still return data older than the models' current versions.
+    """
+    written_at = caches[VERSION_CACHE_ALIAS].get_many(
+        [get_written_key(model) for model in models]
+    )
+    return any(
+        time.time() - timestamp < settings.REPLICA_MAX_LAG
+        for timestamp in written_at.values()
+    )
+
+
+def invalidate_model(model: type[Model]) -> None:
+    """
+    Makes every cached response depending on model unreachable. Inside a
+    transaction the version is bumped again on commit, so responses cached from
+    the old data before the commit are not served afterwards.
+    """
+    bump_model_version(model)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: bump_model_version(model))
+
+
+def get_cache_key(request, dependencies: list[type[Model]]) -> str:
+    key_data = [
+        request.build_absolute_uri(request.path),
+        sorted(request.query_params.lists()),
+        # Data is the same for every format, but headers, e.g. ETag, are not
+        request.accepted_renderer.format,
+        [get_model_version(model) for model in dependencies],
+    ]
+    return hashlib.sha256(json.dumps(key_data).encode()).hexdigest()
+
+
+def get_not_modified_response(
+    request, validator_headers: dict[str, str]
+) -> HttpResponse | None:
+    """
+    Returns 304 (or 412) response when request's If-None-Match or If-Modified-Since
+    headers match the ETag and Last-Modified validators.
+    """
+    response = get_conditional_response(
+        request,
+        etag=validator_headers.get("ETag"),
+        last_modified=parse_http_date_safe(validator_headers.get("Last-Modified")),
+    )
+    if response is not None:
+        for header, value in validator_headers.items():
+            response[header] = value
+    return response
+
+
+def get_cached_response(view, request) -> tuple[str, HttpResponse | None]:
+    """
+    Returns the cache key of request and the response cached under it, if any. On
+    a miss shortly after a write, pins the request's reads to primary.
+    """
+    key = get_cache_key(request, view.cache_dependencies)
+    cached = caches[RESPONSE_CACHE_ALIAS].get(key)
+    if cached is None:
+        cache_stats["misses"] += 1
+        if replica_configured() and written_recently(view.cache_dependencies):
+            primary_pinned.set(True)
+        return key, None
+
+    cache_stats["hits"] += 1
+    response = get_not_modified_response(request, cached["headers"])
+    if response is None:
+        response = Response(cached["data"], headers=cached["headers"])
+    response["X-Cache"] = "HIT"
+    return key, response
+
+
+def store_response(view, key: str, response: HttpResponse) -> None:
+    if response.status_code == status.HTTP_200_OK:
+        caches[RESPONSE_CACHE_ALIAS].set(
+            key, {"data": response.data, "headers": view.validator_headers}
+        )
+    response["X-Cache"] = "MISS"
+
+
+def cache_response(view_method: Callable) -> Callable:
+    """
+    Caches successful responses of a viewset method, keyed on the URL, normalized
+    query parameters and versions of models in view's cache_dependencies. Cached
+    validators answer conditional requests without touching the database.
+    Wraps async view methods too, reaching the cache in a thread.
+    Shortly after a write responses are built from primary, as the replica's data
+    would be cached under the new versions. Requests marked with
+    skip_response_cache, e.g. profiled ones, bypass it.
+    """
+
+    if inspect.iscoroutinefunction(view_method):
+
+        @functools.wraps(view_method)
+        async def async_wrapper(view, request, *args, **kwargs) -> Response:
+            if getattr(request, "skip_response_cache", False):
+                return await view_method(view, request, *args, **kwargs)
+            # Cache backends may block on the network
+            key, response = await sync_to_async(get_cached_response)(view, request)
+            if response is not None:
+                return response
+            response = await view_method(view, request, *args, **kwargs)
+            await sync_to_async(store_response)(view, key, response)
+            return response
+
+        return async_wrapper
+
+    @functools.wraps(view_method)
+    def wrapper(view, request, *args, **kwargs) -> Response:
+        if getattr(request, "skip_response_cache", False):
+            return view_method(view, request, *args, **kwargs)
+        key, response = get_cached_response(view, request)
+        if response is not None:
+            return response
+        response = view_method(view, request, *args, **kwargs)
+        store_response(view, key, response)
+        return response
+
+    return wrapper
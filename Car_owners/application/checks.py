@@ -0,0 +1,18 @@
+from django.core.checks import Tags, Warning, register
+from .openapi import get_stale_schema_paths
+
+
+@register(Tags.compatibility, deploy=True)
+def check_openapi_schema(app_configs, **kwargs) -> list[Warning]:
+    """
+    Warns on deployment checks when the prebuilt OpenAPI schema does not match
+    the API code.
+    """
+    return [
+        Warning(
+            f"Prebuilt OpenAPI schema {path} is stale.",
+            hint="Run python manage.py generate_openapi_schema.",
+            id="application.W001",
+        )
+        for path in get_stale_schema_paths()
+    ]
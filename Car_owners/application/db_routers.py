@@ -0,0 +1,63 @@
+import contextlib
+import contextvars
+from typing import Iterator
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Model
+
+
+REPLICA_DB_ALIAS = "replica"
+
+# Set for safe read actions, reads anywhere else always go to primary
+replica_reads_enabled = contextvars.ContextVar("replica_reads_enabled", default=False)
+# Set on the first write, so later reads see the written data
+primary_pinned = contextvars.ContextVar("primary_pinned", default=False)
+
+
+def replica_configured() -> bool:
+    return REPLICA_DB_ALIAS in connections.settings
+
+
+@contextlib.contextmanager
+def replica_reads() -> Iterator[None]:
+    """
+    Sends reads to the replica until the end of the block, or until the first
+    write inside it. Usable as a decorator of sync views too.
+    """
+    enabled_token = replica_reads_enabled.set(True)
+    pinned_token = primary_pinned.set(False)
+    try:
+        yield
+    finally:
+        primary_pinned.reset(pinned_token)
+        replica_reads_enabled.reset(enabled_token)
+
+
+class ReplicaRouter:
+    """
+    Routes reads inside replica_reads() blocks to the replica database, when one
+    is configured. Writes, reads after a write and reads inside a transaction on
+    primary stay on primary.
+    """
+
+    def db_for_read(self, model: type[Model], **hints) -> str:
+        if (
+            replica_configured()
+            and replica_reads_enabled.get()
+            and not primary_pinned.get()
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model: type[Model], **hints) -> str:
+        if replica_reads_enabled.get():
+            primary_pinned.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints) -> bool:
+        # Replica holds the same data as primary
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, **hints) -> bool:
+        # Replica receives the schema from primary through replication
+        return db == DEFAULT_DB_ALIAS
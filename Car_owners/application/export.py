@@ -0,0 +1,33 @@
+import csv
+import json
+from typing import Any, Iterable, Iterator
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+class Echo:
+    """
+    File-like object handing every written line straight back to the caller,
+    so csv.writer can be used without buffering the whole file.
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def stream_csv(fields: list[str], rows: Iterable[tuple[Any, ...]]) -> Iterator[str]:
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_ndjson(fields: list[str], rows: Iterable[tuple[Any, ...]]) -> Iterator[str]:
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    for row in rows:
+        yield encoder.encode(dict(zip(fields, row))) + "\n"
+
+
+EXPORT_FORMATS = {
+    "csv": (stream_csv, "text/csv"),
+    "ndjson": (stream_ndjson, "application/x-ndjson"),
+}
@@ -0,0 +1,38 @@
+import datetime
+import time
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.utils import timezone
+from application.archive import ARCHIVE_BATCH_SIZE, archive_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves repaired cars not changed for a given number of days from the cars "
+        "table to the archive, in short batches, so car queries scan fewer rows. "
+        "Archived cars are listed with ?include_archived=true."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--older-than-days", type=int, default=365)
+        parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Seconds to wait between batches, to spread the load.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        if options["older_than_days"] < 0 or options["batch_size"] < 1:
+            raise CommandError(
+                "Days should not be negative and batch size should be positive."
+            )
+
+        cutoff = timezone.now() - datetime.timedelta(days=options["older_than_days"])
+        archived = 0
+        while moved := archive_batch(cutoff, options["batch_size"]):
+            archived += moved
+            self.stdout.write(f"{archived} cars archived")
+            time.sleep(options["pause"])
+
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} repaired cars"))
@@ -0,0 +1,243 @@
+import datetime
+import json
+import math
+import random
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection
+from django.db.models import Count, Max, Min
+from django.test import Client, override_settings
+from application.cache import RESPONSE_CACHE_ALIAS
+from application.models import Owner, Car, CarStatistics
+
+
+METRICS_MIDDLEWARE = "application.metrics.MetricsMiddleware"
+
+
+class Dataset(NamedTuple):
+    owners: int
+    cars: int
+    owner_ids: tuple[int, int]
+    car_ids: tuple[int, int]
+    brands: list[str]
+    surnames: list[str]
+
+
+class Scenario(NamedTuple):
+    method: str
+    # Builds the path and body of the next request
+    build: Callable[[random.Random, Dataset], tuple[str, dict | None]]
+
+
+SCENARIOS = {
+    "owners_filtered": Scenario(
+        "get",
+        lambda rng, dataset: (
+            f"/app/owners/?surname={rng.choice(dataset.surnames)}",
+            None,
+        ),
+    ),
+    "cars_filtered": Scenario(
+        "get",
+        lambda rng, dataset: (f"/app/cars/?brand={rng.choice(dataset.brands)}", None),
+    ),
+    "cars_ordered": Scenario(
+        "get", lambda rng, dataset: ("/app/cars/?ordering=production_date", None)
+    ),
+    "cars_unrepaired": Scenario(
+        "get", lambda rng, dataset: ("/app/cars/unrepaired/", None)
+    ),
+    "owner_retrieve": Scenario(
+        "get",
+        lambda rng, dataset: (f"/app/owners/{rng.randint(*dataset.owner_ids)}/", None),
+    ),
+    "car_retrieve": Scenario(
+        "get",
+        lambda rng, dataset: (f"/app/cars/{rng.randint(*dataset.car_ids)}/", None),
+    ),
+    "car_create": Scenario(
+        "post",
+        lambda rng, dataset: (
+            "/app/cars/",
+            {
+                "brand": rng.choice(dataset.brands),
+                "model": "Benchmark",
+                "production_date": "2020-01-01",
+                "problem_description": "Benchmark",
+                "repaired": False,
+                "total_cost": 0,
+                "owner": rng.randint(*dataset.owner_ids),
+            },
+        ),
+    ),
+}
+
+
+def get_dataset() -> Dataset:
+    owners = Owner.objects.aggregate(count=Count("id"), low=Min("id"), high=Max("id"))
+    cars = Car.objects.aggregate(count=Count("id"), low=Min("id"), high=Max("id"))
+    return Dataset(
+        owners=owners["count"],
+        cars=cars["count"],
+        owner_ids=(owners["low"], owners["high"]),
+        car_ids=(cars["low"], cars["high"]),
+        # Most common brands and surnames, so filters return many rows
+        brands=list(
+            CarStatistics.objects.filter(
+                dimension=CarStatistics.BRAND, cars_count__gt=0
+            )
+            .order_by("-cars_count")
+            .values_list("key", flat=True)[:5]
+        ),
+        surnames=list(
+            Owner.objects.values_list("surname", flat=True).order_by("id")[:100]
+        ),
+    )
+
+
+def get_percentile(durations: list[float], percentile: int) -> float:
+    """
+    Nearest-rank percentile of sorted durations.
+    """
+    return durations[max(math.ceil(len(durations) * percentile / 100) - 1, 0)]
+
+
+def get_rows_number(data: dict | list | str) -> int:
+    if isinstance(data, dict):
+        return len(data["results"]) if "results" in data else 1
+    # Lists, or the message returned when no object was found
+    return len(data) if isinstance(data, list) else 0
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the key API endpoints against the current database, e.g. filled by "
+        "generate_workshop_data, and reports p50/p95 latency and rows/s. Results "
+        "are written to JSON and can be compared with a previous run."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--requests", type=int, default=50)
+        parser.add_argument(
+            "--scenarios",
+            nargs="+",
+            choices=SCENARIOS,
+            default=[*SCENARIOS],
+            help="Endpoints to time, all by default.",
+        )
+        parser.add_argument("--output", type=Path, default=Path("benchmark.json"))
+        parser.add_argument(
+            "--baseline", type=Path, help="Results of a previous run to compare with."
+        )
+        parser.add_argument(
+            "--warm-cache",
+            action="store_true",
+            help="Keep the response cache between requests, cleared by default.",
+        )
+        parser.add_argument(
+            "--without-metrics",
+            action="store_true",
+            help="Skip the metrics middleware, to measure its overhead.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options) -> None:
+        if options["requests"] < 1:
+            raise CommandError("Send at least one request per endpoint.")
+        dataset = get_dataset()
+        if not dataset.cars or not dataset.brands:
+            raise CommandError("No cars to benchmark, run generate_workshop_data.")
+        baseline = {}
+        if options["baseline"]:
+            baseline = json.loads(options["baseline"].read_text())["endpoints"]
+
+        middleware = settings.MIDDLEWARE
+        if options["without_metrics"]:
+            middleware = [name for name in middleware if name != METRICS_MIDDLEWARE]
+
+        rng = random.Random(options["seed"])
+        results = {}
+        with override_settings(MIDDLEWARE=middleware):
+            client = Client()
+            for name in options["scenarios"]:
+                results[name] = self.run_scenario(
+                    client, SCENARIOS[name], dataset, rng, options
+                )
+                self.stdout.write(self.format_result(name, results[name], baseline))
+
+        options["output"].write_text(
+            json.dumps(
+                {
+                    "created_at": datetime.datetime.now().isoformat(),
+                    "database": connection.vendor,
+                    "dataset": {"owners": dataset.owners, "cars": dataset.cars},
+                    "requests": options["requests"],
+                    "warm_cache": options["warm_cache"],
+                    "metrics": METRICS_MIDDLEWARE in middleware,
+                    "endpoints": results,
+                },
+                indent=2,
+            )
+        )
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    @staticmethod
+    def run_scenario(
+        client: Client,
+        scenario: Scenario,
+        dataset: Dataset,
+        rng: random.Random,
+        options: dict,
+    ) -> dict[str, float | int]:
+        durations = []
+        rows_number = 0
+        errors = 0
+        created_ids = []
+        for _ in range(options["requests"]):
+            path, data = scenario.build(rng, dataset)
+            if not options["warm_cache"]:
+                caches[RESPONSE_CACHE_ALIAS].clear()
+
+            start = time.perf_counter()
+            response = getattr(client, scenario.method)(
+                path, data=data, content_type="application/json"
+            )
+            durations.append(time.perf_counter() - start)
+
+            if response.status_code >= 400:
+                errors += 1
+                continue
+            rows_number += get_rows_number(response.json())
+            if scenario.method == "post":
+                created_ids.append(response.json()["id"])
+
+        # Cars created by the benchmark would change the next runs' dataset
+        Car.objects.filter(id__in=created_ids).delete()
+
+        durations.sort()
+        return {
+            "requests": len(durations),
+            "errors": errors,
+            "p50_ms": round(get_percentile(durations, 50) * 1000, 2),
+            "p95_ms": round(get_percentile(durations, 95) * 1000, 2),
+            "mean_ms": round(sum(durations) / len(durations) * 1000, 2),
+            "rows": rows_number,
+            "rows_per_s": round(rows_number / sum(durations), 1),
+        }
+
+    @staticmethod
+    def format_result(
+        name: str, result: dict[str, float | int], baseline: dict[str, dict]
+    ) -> str:
+        line = (
+            f"{name}: p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, "
+            f"{result['rows_per_s']} rows/s, {result['errors']} errors"
+        )
+        if name in baseline and baseline[name]["p95_ms"]:
+            change = result["p95_ms"] / baseline[name]["p95_ms"] - 1
+            line += f" (p95 {change:+.0%} vs baseline)"
+        return line
@@ -0,0 +1,76 @@
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+
+
+ENDPOINTS = {
+    "owners": ("/app/owners/", "/app/async/owners/"),
+    "cars": ("/app/cars/", "/app/async/cars/"),
+    "unrepaired": ("/app/cars/unrepaired/", "/app/async/cars/unrepaired/"),
+}
+
+
+def get_duration(url: str) -> float:
+    start = time.perf_counter()
+    request = urllib.request.Request(url, headers={"Accept": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends the same concurrent GET requests to a running WSGI server "
+        "(sync views) and a running ASGI server (async views) and compares "
+        "throughput and latency. Both sides serve repeated requests from the "
+        "response cache, as in production."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--wsgi-url",
+            default="http://localhost:8000",
+            help="Base URL of the WSGI server, e.g. gunicorn or runserver.",
+        )
+        parser.add_argument(
+            "--asgi-url",
+            default="http://localhost:8001",
+            help="Base URL of the ASGI server, e.g. uvicorn car_owners.asgi.",
+        )
+        parser.add_argument("--endpoint", choices=ENDPOINTS, default="unrepaired")
+        parser.add_argument("--query", default="", help="Query string to send.")
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=50)
+
+    def handle(self, *args, **options) -> None:
+        sync_path, async_path = ENDPOINTS[options["endpoint"]]
+        query = f"?{options['query']}" if options["query"] else ""
+        for name, url in [
+            ("WSGI", f"{options['wsgi_url']}{sync_path}{query}"),
+            ("ASGI", f"{options['asgi_url']}{async_path}{query}"),
+        ]:
+            self.run_benchmark(name, url, options["requests"], options["concurrency"])
+
+    def run_benchmark(
+        self, name: str, url: str, requests_number: int, concurrency: int
+    ) -> None:
+        try:
+            # Warm-up, also checks that the server is running
+            get_duration(url)
+        except OSError as error:
+            raise CommandError(f"{name} server is not reachable at {url}: {error}")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            durations = sorted(executor.map(get_duration, [url] * requests_number))
+        elapsed = time.perf_counter() - start
+
+        percentiles = statistics.quantiles(durations, n=100)
+        self.stdout.write(
+            f"{name} {url}: {requests_number / elapsed:.1f} req/s, "
+            f"p50 {percentiles[49] * 1000:.1f} ms, "
+            f"p95 {percentiles[94] * 1000:.1f} ms "
+            f"({requests_number} requests, concurrency {concurrency})"
+        )
@@ -0,0 +1,122 @@
+import datetime
+import io
+import json
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from application.models import Car
+from application.renderers import (
+    MessagePackParser,
+    MessagePackRenderer,
+    ORJSONParser,
+    ORJSONRenderer,
+)
+from application.serializers import CarSerializer, get_values_reader
+from .benchmark_api import get_percentile
+
+
+class Codec(NamedTuple):
+    renderer_class: type[BaseRenderer]
+    parser_class: type[BaseParser]
+
+
+# DRF's own JSON first, the others are compared with it
+CODECS = {
+    "json": Codec(JSONRenderer, JSONParser),
+    "orjson": Codec(ORJSONRenderer, ORJSONParser),
+    "msgpack": Codec(MessagePackRenderer, MessagePackParser),
+}
+
+
+def time_calls(function: Callable, rounds: int) -> list[float]:
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return sorted(durations)
+
+
+class Command(BaseCommand):
+    help = (
+        "Times encoding a page of cars, as sent by the cars list, with each "
+        "renderer and decoding it with the matching parser, and compares payload "
+        "sizes. Cars are read from the current database, e.g. filled by "
+        "generate_workshop_data."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--rows", type=int, default=1000, help="Cars on the page, 1000 by default."
+        )
+        parser.add_argument("--rounds", type=int, default=20)
+        parser.add_argument(
+            "--output", type=Path, default=Path("benchmark_renderers.json")
+        )
+
+    def handle(self, *args, **options) -> None:
+        if options["rows"] < 1 or options["rounds"] < 1:
+            raise CommandError("Render at least one car at least once.")
+        values_reader = get_values_reader(CarSerializer)
+        rows = values_reader.get_values(Car.objects.order_by("id"))[: options["rows"]]
+        results = values_reader.to_representation(rows)
+        if not results:
+            raise CommandError("No cars to render, run generate_workshop_data.")
+        page = {"next": None, "previous": None, "results": results}
+
+        codecs_results = {}
+        for name, codec in CODECS.items():
+            codecs_results[name] = self.run_codec(codec, page, options["rounds"])
+            self.stdout.write(
+                self.format_result(name, codecs_results[name], codecs_results["json"])
+            )
+
+        options["output"].write_text(
+            json.dumps(
+                {
+                    "created_at": datetime.datetime.now().isoformat(),
+                    "rows": len(results),
+                    "rounds": options["rounds"],
+                    "codecs": codecs_results,
+                },
+                indent=2,
+            )
+        )
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    @staticmethod
+    def run_codec(codec: Codec, page: dict, rounds: int) -> dict[str, float | int]:
+        renderer = codec.renderer_class()
+        parser = codec.parser_class()
+        content = renderer.render(page, renderer.media_type, {})
+        if parser.parse(io.BytesIO(content), parser.media_type, {}) != page:
+            raise CommandError(f"{parser.media_type} parser changed the page.")
+
+        encode_durations = time_calls(
+            lambda: renderer.render(page, renderer.media_type, {}), rounds
+        )
+        decode_durations = time_calls(
+            lambda: parser.parse(io.BytesIO(content), parser.media_type, {}), rounds
+        )
+        return {
+            "encode_p50_ms": round(get_percentile(encode_durations, 50) * 1000, 3),
+            "decode_p50_ms": round(get_percentile(decode_durations, 50) * 1000, 3),
+            "bytes": len(content),
+        }
+
+    @staticmethod
+    def format_result(
+        name: str, result: dict[str, float | int], baseline: dict[str, float | int]
+    ) -> str:
+        line = (
+            f"{name}: encode p50 {result['encode_p50_ms']} ms, decode p50 "
+            f"{result['decode_p50_ms']} ms, {result['bytes']} bytes"
+        )
+        if result is not baseline and result["encode_p50_ms"]:
+            speedup = baseline["encode_p50_ms"] / result["encode_p50_ms"]
+            size_change = result["bytes"] / baseline["bytes"] - 1
+            line += f" (encode {speedup:.1f}x, size {size_change:+.0%} vs json)"
+        return line
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from application.openapi import (
+    SCHEMA_FORMATS,
+    generate_schema,
+    get_schema_path,
+    get_stale_schema_paths,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates the OpenAPI schema as JSON and YAML files served by the API, so "
+        "it is not introspected on requests. Run it at build time after API changes."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only check that the prebuilt schema matches the code.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        if options["check"]:
+            if stale_paths := get_stale_schema_paths():
+                raise CommandError(
+                    f"OpenAPI schema is stale: {', '.join(map(str, stale_paths))}. "
+                    "Run generate_openapi_schema."
+                )
+            self.stdout.write(self.style.SUCCESS("OpenAPI schema is up to date"))
+            return
+
+        for schema_format in SCHEMA_FORMATS:
+            path = get_schema_path(schema_format)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(generate_schema(schema_format))
+            self.stdout.write(self.style.SUCCESS(f"Written {path}"))
@@ -0,0 +1,154 @@
+import datetime
+import itertools
+import random
+import time
+from typing import Iterator
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection, transaction
+from application.cache import invalidate_model
+from application.models import Owner, Car
+from application.statistics import update_car_statistics
+from .import_workshop_data import Command as ImportCommand, batched
+
+
+# Share of cars per brand, the most popular brands take most of the workshop
+BRANDS = {
+    "Toyota": (18, ["Corolla", "Yaris", "RAV4", "Auris"]),
+    "Volkswagen": (16, ["Golf", "Passat", "Polo", "Tiguan"]),
+    "Skoda": (14, ["Octavia", "Fabia", "Superb"]),
+    "Ford": (12, ["Focus", "Fiesta", "Mondeo"]),
+    "Opel": (10, ["Astra", "Corsa", "Insignia"]),
+    "Renault": (7, ["Clio", "Megane"]),
+    "BMW": (6, ["X5", "E90"]),
+    "Audi": (5, ["A4", "A6"]),
+    "Hyundai": (4, ["i30", "Tucson"]),
+    "Fiat": (3, ["Panda", "Punto"]),
+    "Mercedes-Benz": (3, ["C-Class", "E-Class"]),
+    "Kia": (2, ["Ceed", "Sportage"]),
+}
+NAMES = ["Andrzej", "Tadeusz", "Jan", "Piotr", "Anna", "Maria", "Katarzyna", "Ewa"]
+SURNAMES = [
+    "Nowak",
+    "Kowalski",
+    "Wiśniewski",
+    "Wójcik",
+    "Kamiński",
+    "Lewandowski",
+    "Zieliński",
+    "Szymański",
+    "Madej",
+    "Starczyk",
+]
+PROBLEMS = [
+    "Weak breaks",
+    "Engine start problem",
+    "Oil leak",
+    "Noisy suspension",
+    "Clutch slipping",
+    "Air conditioning not cooling",
+    "Check engine light",
+    "",
+]
+# Synthetic owners get consecutive phone numbers, so runs with the same number
+# of owners update the same owners instead of adding new ones
+FIRST_PHONE = 500_000_000
+# Mean car age in years, newer cars come more often
+MEAN_CAR_AGE = 6
+MAX_CAR_AGE = 30
+REPAIRED_SHARE = 0.75
+# Zipf exponent of cars per owner, a few fleet owners have hundreds of cars
+OWNER_SKEW = 0.5
+
+
+def generate_owners(owners_number: int, rng: random.Random) -> Iterator[dict]:
+    for index in range(owners_number):
+        yield {
+            "name": rng.choice(NAMES),
+            "surname": rng.choice(SURNAMES),
+            "phone": str(FIRST_PHONE + index),
+        }
+
+
+def generate_cars(
+    cars_number: int, owners_number: int, rng: random.Random
+) -> Iterator[dict]:
+    brands = [*BRANDS]
+    brand_weights = list(itertools.accumulate(weight for weight, _ in BRANDS.values()))
+    owner_weights = list(
+        itertools.accumulate(
+            1 / (rank + 1) ** OWNER_SKEW for rank in range(owners_number)
+        )
+    )
+    today = datetime.date.today()
+    for _ in range(cars_number):
+        brand = rng.choices(brands, cum_weights=brand_weights)[0]
+        age = min(rng.expovariate(1 / MEAN_CAR_AGE), MAX_CAR_AGE)
+        repaired = rng.random() < REPAIRED_SHARE
+        owner_index = rng.choices(range(owners_number), cum_weights=owner_weights)[0]
+        yield {
+            "brand": brand,
+            "model": rng.choice(BRANDS[brand][1]),
+            "production_date": today - datetime.timedelta(days=int(age * 365)),
+            "problem_description": rng.choice(PROBLEMS),
+            "repaired": repaired,
+            "total_cost": round(rng.lognormvariate(6, 0.8), 2) if repaired else 0.0,
+            "owner_phone": str(FIRST_PHONE + owner_index),
+        }
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-creates a synthetic dataset for benchmarks: owners and cars with "
+        "skewed brands, production dates and cars per owner. The same seed gives "
+        "the same data."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--owners", type=int, default=100_000)
+        parser.add_argument("--cars", type=int, default=1_000_000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+
+    def handle(self, *args, **options) -> None:
+        if options["owners"] < 1 and options["cars"] > 0:
+            raise CommandError("Cars need at least one owner.")
+
+        rng = random.Random(options["seed"])
+        load_batch = (
+            ImportCommand.copy_batch
+            if connection.vendor == "postgresql"
+            else ImportCommand.bulk_batch
+        )
+        start = time.perf_counter()
+        for name, rows, load_rows in [
+            (
+                "owners",
+                generate_owners(options["owners"], rng),
+                lambda owners: load_batch(owners, []),
+            ),
+            (
+                "cars",
+                generate_cars(options["cars"], options["owners"], rng),
+                lambda cars: load_batch([], cars),
+            ),
+        ]:
+            loaded = 0
+            for batch in batched(rows, options["batch_size"]):
+                with transaction.atomic():
+                    # Bulk inserts send no signals
+                    update_car_statistics(added=load_rows(batch))
+                    invalidate_model(Owner)
+                    invalidate_model(Car)
+
+                loaded += len(batch)
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f"{loaded} {name} loaded ({loaded / elapsed:.0f} rows/s)"
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {options['owners']} owners and {options['cars']} cars "
+                f"in {time.perf_counter() - start:.1f} s"
+            )
+        )
@@ -0,0 +1,254 @@
+import csv
+import datetime
+import io
+import itertools
+import json
+import time
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection, transaction
+from application.cache import invalidate_model
+from application.models import Owner, Car
+from application.serializers import get_owner_errors, get_car_errors
+from application.statistics import (
+    STATISTICS_FIELDS,
+    get_car_values,
+    update_car_statistics,
+)
+
+
+OWNER_FIELDS = ["name", "surname", "phone"]
+CAR_FIELDS = [
+    "brand",
+    "model",
+    "production_date",
+    "problem_description",
+    "repaired",
+    "total_cost",
+]
+TRUE_VALUES = {"1", "t", "true", "y", "yes"}
+FALSE_VALUES = {"", "0", "f", "false", "n", "no"}
+
+
+def read_rows(path: Path, file_format: str) -> Iterator[dict[str, Any]]:
+    with path.open(encoding="utf-8", newline="") as file:
+        if file_format == "csv":
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def parse_row(row: dict[str, Any]) -> tuple[dict, dict | None, dict[str, str]]:
+    """
+    Converts one input row into owner and car data, running the same rules as
+    OwnerSerializer and CarSerializer. Car data is None for owner-only rows.
+    """
+    owner = {field: str(row.get(field) or "").strip() for field in OWNER_FIELDS}
+    errors = get_length_errors(Owner, owner) or get_owner_errors(owner)
+    if errors or not row.get("brand"):
+        return owner, None, errors
+
+    car = {field: row.get(field) for field in CAR_FIELDS}
+    try:
+        car["production_date"] = datetime.date.fromisoformat(
+            str(car["production_date"])
+        )
+    except ValueError:
+        errors = {"production_date": "Date should be in YYYY-MM-DD format."}
+        return owner, None, errors
+    try:
+        car["total_cost"] = float(car["total_cost"] or 0)
+    except (TypeError, ValueError):
+        return owner, None, {"total_cost": "A valid number is required."}
+
+    repaired = str(car["repaired"]).strip().lower()
+    if repaired not in TRUE_VALUES | FALSE_VALUES and car["repaired"] is not None:
+        return owner, None, {"repaired": "Must be a valid boolean."}
+    car["repaired"] = repaired in TRUE_VALUES
+    car["problem_description"] = car["problem_description"] or ""
+
+    return owner, car, get_length_errors(Car, car) or get_car_errors(car)
+
+
+def get_length_errors(model: type, data: dict[str, Any]) -> dict[str, str]:
+    for field, value in data.items():
+        max_length = model._meta.get_field(field).max_length
+        if max_length and isinstance(value, str) and len(value) > max_length:
+            return {
+                field: f"Ensure this field has no more than {max_length} characters."
+            }
+    return {}
+
+
+def batched(rows: Iterable[Any], batch_size: int) -> Iterator[list[Any]]:
+    iterator = iter(rows)
+    while batch := list(itertools.islice(iterator, batch_size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports owners and their cars from a CSV or NDJSON file. Every row holds "
+        "owner's name, surname and phone and optionally car's brand, model, "
+        "production_date, problem_description, repaired and total_cost. Owners are "
+        "matched by phone number and updated, cars are always added."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("path", type=Path)
+        parser.add_argument(
+            "--format",
+            choices=["csv", "ndjson"],
+            help="Input format, guessed from the file extension by default.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options) -> None:
+        path = options["path"]
+        if not path.exists():
+            raise CommandError(f"File {path} does not exist.")
+        file_format = options["format"] or path.suffix.lstrip(".").lower()
+        if file_format not in ["csv", "ndjson"]:
+            raise CommandError("Use --format to choose between csv and ndjson.")
+
+        load_batch = (
+            self.copy_batch if connection.vendor == "postgresql" else self.bulk_batch
+        )
+        start = time.perf_counter()
+        totals = {"rows": 0, "owners": 0, "cars": 0, "rejected": 0}
+        rows = read_rows(path, file_format)
+        for batch in batched(enumerate(rows, start=1), options["batch_size"]):
+            owners = {}
+            cars = []
+            for line_number, row in batch:
+                owner, car, errors = parse_row(row)
+                if errors:
+                    totals["rejected"] += 1
+                    self.stderr.write(f"Row {line_number} rejected: {errors}")
+                    continue
+                owners[owner["phone"]] = owner
+                if car:
+                    cars.append({**car, "owner_phone": owner["phone"]})
+
+            with transaction.atomic():
+                added_cars = load_batch(list(owners.values()), cars)
+                # Bulk inserts send no signals
+                update_car_statistics(added=added_cars)
+                invalidate_model(Owner)
+                invalidate_model(Car)
+
+            totals["rows"] += len(batch)
+            totals["owners"] += len(owners)
+            totals["cars"] += len(cars)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{totals['rows']} rows processed, {totals['owners']} owners and "
+                f"{totals['cars']} cars loaded, {totals['rejected']} rejected "
+                f"({totals['rows'] / elapsed:.0f} rows/s)"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {totals['rows'] - totals['rejected']} of {totals['rows']} "
+                f"rows in {time.perf_counter() - start:.1f} s"
+            )
+        )
+
+    @staticmethod
+    def bulk_batch(owners: list[dict], cars: list[dict]) -> list[dict]:
+        Owner.objects.bulk_create(
+            [Owner(**owner) for owner in owners],
+            update_conflicts=True,
+            unique_fields=["phone"],
+            update_fields=["name", "surname", "updated_at"],
+        )
+        owner_ids = dict(
+            Owner.objects.filter(
+                phone__in={car["owner_phone"] for car in cars}
+            ).values_list("phone", "id")
+        )
+        created_cars = Car.objects.bulk_create(
+            [
+                Car(
+                    owner_id=owner_ids[car["owner_phone"]],
+                    **{field: car[field] for field in CAR_FIELDS},
+                )
+                for car in cars
+            ]
+        )
+        return [get_car_values(car) for car in created_cars]
+
+    @staticmethod
+    def copy_batch(owners: list[dict], cars: list[dict]) -> list[dict]:
+        """
+        Loads the batch with COPY into session temporary tables and moves it to
+        the application tables with one set-based statement per table. Returns
+        values of the inserted cars used by the car statistics.
+        """
+        owner_table = Owner._meta.db_table
+        car_table = Car._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS import_owner_staging "
+                f"({get_columns_sql(Owner, OWNER_FIELDS)}) ON COMMIT DELETE ROWS"
+            )
+            cursor.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS import_car_staging "
+                f"({get_columns_sql(Car, CAR_FIELDS)}, owner_phone varchar(9)) "
+                "ON COMMIT DELETE ROWS"
+            )
+            cursor.execute("TRUNCATE import_owner_staging, import_car_staging")
+
+            cursor.copy_expert(
+                f"COPY import_owner_staging ({', '.join(OWNER_FIELDS)}) "
+                "FROM STDIN WITH (FORMAT csv)",
+                to_csv(owners, OWNER_FIELDS),
+            )
+            # New owners start with empty aggregates, cars are added to them with
+            # the car statistics
+            aggregates = ", ".join(Owner.AGGREGATE_FIELDS)
+            zeros = ", ".join(["0"] * len(Owner.AGGREGATE_FIELDS))
+            cursor.execute(
+                f"INSERT INTO {owner_table} ({', '.join(OWNER_FIELDS)}, {aggregates}, "
+                "updated_at) "
+                f"SELECT {', '.join(OWNER_FIELDS)}, {zeros}, now() "
+                "FROM import_owner_staging "
+                "ON CONFLICT (phone) DO UPDATE SET name = EXCLUDED.name, "
+                "surname = EXCLUDED.surname, updated_at = EXCLUDED.updated_at"
+            )
+
+            cursor.copy_expert(
+                f"COPY import_car_staging ({', '.join(CAR_FIELDS)}, owner_phone) "
+                "FROM STDIN WITH (FORMAT csv)",
+                to_csv(cars, CAR_FIELDS + ["owner_phone"]),
+            )
+            staged_fields = ", ".join(f"staged.{field}" for field in CAR_FIELDS)
+            cursor.execute(
+                f"INSERT INTO {car_table} ({', '.join(CAR_FIELDS)}, owner_id, "
+                "updated_at) "
+                f"SELECT {staged_fields}, existing.id, now() "
+                "FROM import_car_staging staged "
+                f"JOIN {owner_table} existing ON existing.phone = staged.owner_phone "
+                f"RETURNING {', '.join(STATISTICS_FIELDS)}"
+            )
+            return [dict(zip(STATISTICS_FIELDS, row)) for row in cursor.fetchall()]
+
+
+def get_columns_sql(model: type, fields: list[str]) -> str:
+    return ", ".join(
+        f"{field} {model._meta.get_field(field).db_type(connection)}"
+        for field in fields
+    )
+
+
+def to_csv(rows: list[dict], fields: list[str]) -> io.StringIO:
+    buffer = io.StringIO()
+    # Quoted strings keep empty descriptions from being read as NULL by COPY
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+    for row in rows:
+        writer.writerow(row[field] for field in fields)
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from application.models import CarStatistics
+from application.statistics import rebuild_car_statistics
+
+
+class Command(BaseCommand):
+    help = (
+        "Recounts the car statistics summary table from the cars table, e.g. after "
+        "cars were changed with raw SQL or queryset.update()."
+    )
+
+    def handle(self, *args, **options) -> None:
+        rebuild_car_statistics()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {CarStatistics.objects.count()} car statistics rows"
+            )
+        )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from application.statistics import UPSERT_BATCH_SIZE, reconcile_owner_aggregates
+
+
+class Command(BaseCommand):
+    help = (
+        "Recounts owners' car count, open jobs and lifetime spend from the cars "
+        "table and fixes owners whose values drifted, e.g. after cars were changed "
+        "with raw SQL or queryset.update()."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=UPSERT_BATCH_SIZE)
+
+    def handle(self, *args, **options) -> None:
+        if options["batch_size"] < 1:
+            raise CommandError("Batch size should be a positive number.")
+
+        fixed = reconcile_owner_aggregates(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Fixed aggregates of {fixed} owners"))
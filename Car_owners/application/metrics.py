@@ -0,0 +1,202 @@
+import bisect
+import contextlib
+import contextvars
+import threading
+import time
+from typing import Any, Callable, Iterator
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.http import HttpRequest, HttpResponse
+
+# Upper bounds of histogram buckets, Prometheus' defaults for durations
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERIES_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """
+    Prometheus histogram of one metric per route and method, counted per worker
+    process.
+    """
+
+    def __init__(self, name: str, description: str, buckets: tuple) -> None:
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        # (route, method) -> [counts per bucket and +Inf, sum of values]
+        self.series: dict[tuple[str, str], list] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, labels: tuple[str, str], value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.setdefault(labels, [[0] * (len(self.buckets) + 1), 0])
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self.lock:
+            series = {
+                labels: (counts.copy(), total)
+                for labels, (counts, total) in self.series.items()
+            }
+        for (route, method), (counts, total) in sorted(series.items()):
+            labels = f'route="{route}",method="{method}"'
+            cumulative = 0
+            for bound, count in zip([*self.buckets, "+Inf"], counts):
+                cumulative += count
+                lines.append(
+                    f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+                )
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Total request time.", DURATION_BUCKETS
+)
+DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in database queries per request.",
+    DURATION_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    "http_request_db_queries", "Database queries per request.", QUERIES_BUCKETS
+)
+SERIALIZATION_DURATION = Histogram(
+    "http_request_serialization_duration_seconds",
+    "Time spent serializing objects per request.",
+    DURATION_BUCKETS,
+)
+HISTOGRAMS = [REQUEST_DURATION, DB_DURATION, DB_QUERIES, SERIALIZATION_DURATION]
+
+
+class RequestTimings:
+    def __init__(self) -> None:
+        self.db_time = 0.0
+        self.db_queries = 0
+        self.serialization_time = 0.0
+
+    def record_query(
+        self, execute: Callable, sql: str, params: Any, many: bool, context: dict
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.db_queries += 1
+
+    def get_server_timing(self, total: float) -> str:
+        return (
+            f"total;dur={total * 1000:.2f}, "
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.db_queries} queries", '
+            f"serialization;dur={self.serialization_time * 1000:.2f}"
+        )
+
+
+# Timings of the request handled in the current thread or task
+current_timings = contextvars.ContextVar("current_timings", default=None)
+
+
+def record_query(
+    execute: Callable, sql: str, params: Any, many: bool, context: dict
+) -> Any:
+    """
+    Execute wrapper installed on every connection, see signals.py. Queries are
+    added to the timings of the current context, which is also copied to threads
+    running the async ORM's queries.
+    """
+    if (timings := current_timings.get()) is None:
+        return execute(sql, params, many, context)
+    return timings.record_query(execute, sql, params, many, context)
+
+
+@contextlib.contextmanager
+def serialization_timer() -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if (timings := current_timings.get()) is not None:
+            timings.serialization_time += time.perf_counter() - start
+
+
+def get_route(request: HttpRequest) -> str:
+    if request.resolver_match is None:
+        return "unmatched"
+    return request.resolver_match.view_name
+
+
+def render_metrics() -> str:
+    lines = [line for histogram in HISTOGRAMS for line in histogram.render()]
+    return "\n".join(lines) + "\n"
+
+
+def is_staff(request: HttpRequest) -> bool:
+    # No user when a middleware before authentication returned the response
+    user = getattr(request, "user", None)
+    return user is not None and user.is_staff
+
+
+class MetricsMiddleware:
+    """
+    Measures total, database and serialization time of every request. They are
+    added to histograms per route, served by the metrics endpoint, and sent to
+    staff users in the Server-Timing header, as they tell e.g. cache hits apart.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        total = time.perf_counter() - start
+        if is_staff(request):
+            response["Server-Timing"] = timings.get_server_timing(total)
+        return self.observe(request, response, timings, total)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        total = time.perf_counter() - start
+        # The user is loaded with blocking calls
+        if await sync_to_async(is_staff)(request):
+            response["Server-Timing"] = timings.get_server_timing(total)
+        return self.observe(request, response, timings, total)
+
+    @staticmethod
+    def observe(
+        request: HttpRequest,
+        response: HttpResponse,
+        timings: RequestTimings,
+        total: float,
+    ) -> HttpResponse:
+        labels = (get_route(request), request.method)
+        REQUEST_DURATION.observe(labels, total)
+        DB_DURATION.observe(labels, timings.db_time)
+        DB_QUERIES.observe(labels, timings.db_queries)
+        SERIALIZATION_DURATION.observe(labels, timings.serialization_time)
+        return response
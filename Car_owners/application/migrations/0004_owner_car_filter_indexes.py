@@ -0,0 +1,78 @@
+# Generated by Django 4.2.1 on 2026-10-17 23:20
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("application", "0003_car_problem_description_car_repaired_car_total_cost"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="car",
+            index=models.Index(
+                django.db.models.functions.text.Upper("brand"),
+                name="car_brand_upper_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="car",
+            index=models.Index(
+                django.db.models.functions.text.Upper("model"),
+                name="car_model_upper_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="car",
+            index=models.Index(fields=["brand", "id"], name="car_brand_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="car",
+            index=models.Index(fields=["model", "id"], name="car_model_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="car",
+            index=models.Index(
+                fields=["production_date", "id"], name="car_production_date_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="car",
+            index=models.Index(
+                fields=["owner", "repaired"], name="car_owner_repaired_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="car",
+            index=models.Index(
+                condition=models.Q(("repaired", False)),
+                fields=["id"],
+                name="car_unrepaired_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="owner",
+            index=models.Index(
+                django.db.models.functions.text.Upper("name"),
+                name="owner_name_upper_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="owner",
+            index=models.Index(
+                django.db.models.functions.text.Upper("surname"),
+                name="owner_surname_upper_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="owner",
+            index=models.Index(fields=["name", "id"], name="owner_name_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="owner",
+            index=models.Index(fields=["surname", "id"], name="owner_surname_id_idx"),
+        ),
+    ]
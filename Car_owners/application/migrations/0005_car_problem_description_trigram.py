@@ -0,0 +1,28 @@
+# Generated by Django 4.2.1 on 2026-10-17 23:21
+
+import application.models
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("application", "0004_owner_car_filter_indexes"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="car",
+            index=application.models.PostgresGinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("problem_description"),
+                    name="gin_trgm_ops",
+                ),
+                name="car_problem_trgm_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.1 on 2026-10-17 23:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("application", "0005_car_problem_description_trigram"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="car",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name="owner",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
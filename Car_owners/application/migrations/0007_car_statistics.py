@@ -0,0 +1,82 @@
+# Generated by Django 4.2.1 on 2026-10-17 23:32
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def count_car_statistics(apps, schema_editor):
+    Car = apps.get_model("application", "Car")
+    CarStatistics = apps.get_model("application", "CarStatistics")
+    db_alias = schema_editor.connection.alias
+    counters = {
+        "cars_count": Count("pk"),
+        "repaired_count": Count("pk", filter=Q(repaired=True)),
+        "revenue": Sum("total_cost"),
+    }
+    totals = Car.objects.using(db_alias).aggregate(**counters)
+    statistics = [
+        CarStatistics(
+            dimension="total", key="", **{**totals, "revenue": totals["revenue"] or 0}
+        )
+    ]
+    for dimension, field in [("brand", "brand"), ("owner", "owner_id")]:
+        for group in (
+            Car.objects.using(db_alias).values(field).annotate(**counters).order_by()
+        ):
+            key = str(group.pop(field))
+            statistics.append(CarStatistics(dimension=dimension, key=key, **group))
+    CarStatistics.objects.using(db_alias).bulk_create(statistics, batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("application", "0006_owner_car_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CarStatistics",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dimension",
+                    models.CharField(
+                        choices=[
+                            ("total", "Total"),
+                            ("brand", "Brand"),
+                            ("owner", "Owner"),
+                        ],
+                        max_length=5,
+                    ),
+                ),
+                ("key", models.CharField(blank=True, max_length=20)),
+                ("cars_count", models.IntegerField(default=0)),
+                ("repaired_count", models.IntegerField(default=0)),
+                ("revenue", models.FloatField(default=0.0)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["dimension", "-cars_count", "key"],
+                        name="car_statistics_cars_count_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="carstatistics",
+            constraint=models.UniqueConstraint(
+                fields=("dimension", "key"), name="car_statistics_dimension_key"
+            ),
+        ),
+        migrations.RunPython(count_car_statistics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 4.2.1 on 2026-10-17 23:59
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def count_owner_aggregates(apps, schema_editor):
+    Owner = apps.get_model("application", "Owner")
+    Car = apps.get_model("application", "Car")
+    db_alias = schema_editor.connection.alias
+    cars = Car.objects.using(db_alias).filter(owner=OuterRef("pk")).order_by()
+    aggregates = {
+        "cars_count": (Count("pk"), Value(0)),
+        "open_jobs_count": (Count("pk", filter=Q(repaired=False)), Value(0)),
+        "lifetime_spend": (Sum("total_cost"), Value(0.0)),
+    }
+    Owner.objects.using(db_alias).update(
+        **{
+            field: Coalesce(
+                Subquery(
+                    cars.values("owner").annotate(value=aggregate).values("value")
+                ),
+                default,
+            )
+            for field, (aggregate, default) in aggregates.items()
+        }
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("application", "0007_car_statistics"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="owner",
+            name="cars_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="owner",
+            name="lifetime_spend",
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name="owner",
+            name="open_jobs_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(count_owner_aggregates, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="owner",
+            index=models.Index(
+                fields=["cars_count", "id"], name="owner_cars_count_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="owner",
+            index=models.Index(
+                fields=["open_jobs_count", "id"], name="owner_open_jobs_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="owner",
+            index=models.Index(
+                fields=["lifetime_spend", "id"], name="owner_lifetime_spend_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 4.2.1 on 2026-10-18 00:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+CAR_COLUMNS = (
+    "id, brand, model, production_date, problem_description, repaired, "
+    "total_cost, owner_id, updated_at"
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("application", "0008_owner_aggregates"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CarHistory",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("brand", models.CharField(max_length=20)),
+                ("model", models.CharField(max_length=40)),
+                ("production_date", models.DateField()),
+                ("problem_description", models.TextField(default="", max_length=150)),
+                ("repaired", models.BooleanField(default=False)),
+                ("total_cost", models.FloatField(default=0.0)),
+                ("updated_at", models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+            options={
+                "db_table": "application_carhistory",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedCar",
+            fields=[
+                ("brand", models.CharField(max_length=20)),
+                ("model", models.CharField(max_length=40)),
+                ("production_date", models.DateField()),
+                ("problem_description", models.TextField(default="", max_length=150)),
+                ("repaired", models.BooleanField(default=False)),
+                ("total_cost", models.FloatField(default=0.0)),
+                ("updated_at", models.DateTimeField(auto_now=True, db_index=True)),
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="application.owner",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.RunSQL(
+            f"CREATE VIEW application_carhistory AS "
+            f"SELECT {CAR_COLUMNS} FROM application_car "
+            f"UNION ALL SELECT {CAR_COLUMNS} FROM application_archivedcar",
+            "DROP VIEW application_carhistory",
+        ),
+    ]
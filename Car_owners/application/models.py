@@ -1,16 +1,74 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
+
+
+class PostgresGinIndex(GinIndex):
+    """
+    GinIndex created on Postgres only. SQLite, used locally, has no GIN indexes,
+    and table rebuilds in later migrations would fail on one.
+    """
+
+    def create_sql(self, model, schema_editor, using="", **kwargs) -> str:
+        if schema_editor.connection.vendor != "postgresql":
+            return ""
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
+
+    def remove_sql(self, model, schema_editor, **kwargs) -> str:
+        if schema_editor.connection.vendor != "postgresql":
+            return ""
+        return super().remove_sql(model, schema_editor, **kwargs)
 
 
 class Owner(models.Model):
     name = models.CharField(max_length=20)
     surname = models.CharField(max_length=20)
     phone = models.CharField(max_length=9, unique=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # Aggregates of owner's cars, changed only together with the car statistics
+    cars_count = models.IntegerField(default=0)
+    open_jobs_count = models.IntegerField(default=0)
+    lifetime_spend = models.FloatField(default=0.0)
+
+    AGGREGATE_FIELDS = ["cars_count", "open_jobs_count", "lifetime_spend"]
+
+    class Meta:
+        indexes = [
+            # OwnerFilter uses iexact, which Postgres compiles to UPPER(column)
+            models.Index(Upper("name"), name="owner_name_upper_idx"),
+            models.Index(Upper("surname"), name="owner_surname_upper_idx"),
+            # Ordering with the keyset pagination tie-breaker
+            models.Index(fields=["name", "id"], name="owner_name_id_idx"),
+            models.Index(fields=["surname", "id"], name="owner_surname_id_idx"),
+            models.Index(fields=["cars_count", "id"], name="owner_cars_count_id_idx"),
+            models.Index(
+                fields=["open_jobs_count", "id"], name="owner_open_jobs_id_idx"
+            ),
+            models.Index(
+                fields=["lifetime_spend", "id"], name="owner_lifetime_spend_id_idx"
+            ),
+        ]
+
+    def save(self, *args, **kwargs) -> None:
+        # Aggregates are changed by relative updates only, saving a loaded copy of
+        # them would undo concurrent car changes
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.AGGREGATE_FIELDS
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self) -> str:
         return f"{self.name} {self.surname}"
 
 
-class Car(models.Model):
+class BaseCar(models.Model):
+    """
+    Columns shared by live, archived and all cars.
+    """
+
     brand = models.CharField(max_length=20)
     model = models.CharField(max_length=40)
     production_date = models.DateField()
@@ -18,6 +76,105 @@ class Car(models.Model):
     repaired = models.BooleanField(default=False)
     total_cost = models.FloatField(default=0.0)
     owner = models.ForeignKey("Owner", on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        abstract = True
 
     def __str__(self) -> str:
         return f"{self.brand} {self.model}"
+
+
+class Car(BaseCar):
+    class Meta:
+        indexes = [
+            # CarFilter uses iexact, which Postgres compiles to UPPER(column)
+            models.Index(Upper("brand"), name="car_brand_upper_idx"),
+            models.Index(Upper("model"), name="car_model_upper_idx"),
+            # Ordering with the keyset pagination tie-breaker
+            models.Index(fields=["brand", "id"], name="car_brand_id_idx"),
+            models.Index(fields=["model", "id"], name="car_model_id_idx"),
+            models.Index(
+                fields=["production_date", "id"], name="car_production_date_id_idx"
+            ),
+            models.Index(fields=["owner", "repaired"], name="car_owner_repaired_idx"),
+            # Backs the unrepaired action
+            models.Index(
+                fields=["id"],
+                name="car_unrepaired_idx",
+                condition=models.Q(repaired=False),
+            ),
+            # Trigram index serving both icontains and the ranked search
+            PostgresGinIndex(
+                OpClass(Upper("problem_description"), name="gin_trgm_ops"),
+                name="car_problem_trgm_idx",
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values) -> "Car":
+        instance = super().from_db(db, field_names, values)
+        # Values as saved in the database, used to update the car statistics
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+
+class ArchivedCar(BaseCar):
+    """
+    Old repaired cars moved out of the cars table by the archive_repaired_cars
+    command, keeping their ids. They still count in the statistics and owners'
+    aggregates.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+
+class CarHistory(BaseCar):
+    """
+    Live and archived cars together, read from a database view with the same
+    columns as the cars table.
+    """
+
+    # Rows are deleted through the cars and archive tables only
+    owner = models.ForeignKey("Owner", on_delete=models.DO_NOTHING, related_name="+")
+
+    class Meta:
+        managed = False
+        db_table = "application_carhistory"
+
+
+class CarStatistics(models.Model):
+    """
+    Summary counters of cars, one row per dimension value: a single row for all
+    cars, one per brand and one per owner. Updated incrementally on car changes.
+    """
+
+    TOTAL = "total"
+    BRAND = "brand"
+    OWNER = "owner"
+    DIMENSION_CHOICES = [(TOTAL, "Total"), (BRAND, "Brand"), (OWNER, "Owner")]
+
+    dimension = models.CharField(max_length=5, choices=DIMENSION_CHOICES)
+    # Brand name or owner's id, empty for the total row
+    key = models.CharField(max_length=20, blank=True)
+    cars_count = models.IntegerField(default=0)
+    repaired_count = models.IntegerField(default=0)
+    revenue = models.FloatField(default=0.0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dimension", "key"], name="car_statistics_dimension_key"
+            ),
+        ]
+        indexes = [
+            # Owners with most cars
+            models.Index(
+                fields=["dimension", "-cars_count", "key"],
+                name="car_statistics_cars_count_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.dimension} {self.key}".strip()
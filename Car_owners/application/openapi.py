@@ -0,0 +1,58 @@
+import functools
+import hashlib
+from pathlib import Path
+from django.conf import settings
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+
+
+API_INFO = openapi.Info(
+    title="Workshop’s customers Management",
+    default_version="v1",
+    description="Application for Workshop’s customers Management – allows adding new "
+    "customers and their’ cars with failure description.",
+    contact=openapi.Contact(email="tobiasz_bernacki@onet.pl"),
+    license=openapi.License(name="GNU License"),
+)
+SCHEMA_FORMATS = {
+    "json": (OpenAPICodecJson, "application/json"),
+    "yaml": (OpenAPICodecYaml, "application/yaml"),
+}
+
+
+def get_schema_path(schema_format: str) -> Path:
+    return Path(settings.OPENAPI_SCHEMA_DIR) / f"schema.{schema_format}"
+
+
+def generate_schema(schema_format: str) -> bytes:
+    """
+    Introspects all API views and returns the encoded OpenAPI schema.
+    """
+    schema = OpenAPISchemaGenerator(API_INFO).get_schema(request=None, public=True)
+    codec_class, _ = SCHEMA_FORMATS[schema_format]
+    return codec_class(validators=[]).encode(schema)
+
+
+def get_stale_schema_paths() -> list[Path]:
+    """
+    Returns prebuilt schema files that are missing or differ from the schema of
+    the current code.
+    """
+    return [
+        get_schema_path(schema_format)
+        for schema_format in SCHEMA_FORMATS
+        if not get_schema_path(schema_format).exists()
+        or get_schema_path(schema_format).read_bytes() != generate_schema(schema_format)
+    ]
+
+
+@functools.cache
+def load_schema(schema_format: str) -> tuple[bytes, str]:
+    """
+    Returns the prebuilt schema and its ETag, read once per worker process. The
+    schema is generated if it was not prebuilt.
+    """
+    path = get_schema_path(schema_format)
+    content = path.read_bytes() if path.exists() else generate_schema(schema_format)
+    return content, f'"{hashlib.sha256(content).hexdigest()}"'
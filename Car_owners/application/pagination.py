@@ -0,0 +1,306 @@
+import json
+from collections import OrderedDict
+from typing import Any
+import coreapi
+import coreschema
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Model, Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+
+COUNT_EXACT = "exact"
+COUNT_ESTIMATED = "estimated"
+COUNT_MODES = [COUNT_EXACT, COUNT_ESTIMATED]
+# Smaller estimates are replaced by exact counts, which are cheap for few rows,
+# while estimates are the least accurate there
+EXACT_COUNT_THRESHOLD = 10_000
+
+
+def get_estimated_count(queryset: QuerySet) -> int | None:
+    """
+    Returns the Postgres planner's estimate of queryset's rows: the table's
+    reltuples for an unfiltered queryset, EXPLAIN's row estimate otherwise. Other
+    databases have no cheap estimate, None is returned there.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    queryset = queryset.order_by()
+    if not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            (reltuples,) = cursor.fetchone()
+        # -1 until the table is vacuumed or analyzed for the first time
+        if reltuples >= 0:
+            return int(reltuples)
+
+    plan = json.loads(queryset.explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination keyed on (ordering field, id).
+
+    DRF's CursorPagination only remembers the first ordering field and skips rows
+    with duplicated values by OFFSET, which degrades on columns like brand. Here the
+    cursor holds the whole key of the boundary row, so every page is a single range
+    condition and deep pages cost the same as the first one.
+    """
+
+    ordering = ("id",)
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    count_query_param = "count"
+    count_query_description = (
+        "Adds the number of all results, 'exact' or 'estimated' by the database "
+        "planner. Without it, only the next link tells whether more results follow."
+    )
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view=None
+    ) -> list[Model] | None:
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+
+        self.count = self.get_count(queryset, request, view)
+        return self.set_page(list(page_queryset))
+
+    async def apaginate_queryset(
+        self, queryset: QuerySet, request: Request, view=None
+    ) -> list[Model] | None:
+        """
+        Async variant of paginate_queryset, fetching the page with the async ORM.
+        """
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+
+        self.count = await sync_to_async(self.get_count)(queryset, request, view)
+        if page_queryset._prefetch_related_lookups:
+            # aiterator() does not support prefetching related objects
+            results = [obj async for obj in page_queryset]
+        else:
+            results = [obj async for obj in page_queryset.aiterator()]
+        return self.set_page(results)
+
+    def get_page_queryset(
+        self, queryset: QuerySet, request: Request, view=None
+    ) -> QuerySet | None:
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        ordering = (
+            self.reverse_ordering(self.ordering) if self.reverse else self.ordering
+        )
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            position = self.decode_position(self.cursor.position, queryset.model)
+            try:
+                queryset = queryset.filter(self.get_keyset_filter(ordering, position))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        # One extra row tells whether there is a page following this one.
+        return queryset[: self.page_size + 1]
+
+    def get_count(self, queryset: QuerySet, request: Request, view=None) -> int | None:
+        """
+        Counts all results in the mode given by the count query parameter, None
+        when no count was requested.
+        """
+        self.count_estimated = False
+        count_mode = request.query_params.get(self.count_query_param)
+        if count_mode not in COUNT_MODES:
+            return None
+
+        if count_mode == COUNT_ESTIMATED:
+            estimate = get_estimated_count(queryset)
+            if estimate is not None and estimate >= EXACT_COUNT_THRESHOLD:
+                self.count_estimated = True
+                return estimate
+        return queryset.count()
+
+    @property
+    def reverse(self) -> bool:
+        return self.cursor is not None and self.cursor.reverse
+
+    def set_page(self, results: list[Model]) -> list[Model]:
+        has_following = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        if self.reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = self.cursor is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_paginated_response(self, data: list) -> Response:
+        if self.count is None:
+            return super().get_paginated_response(data)
+
+        return Response(
+            OrderedDict(
+                [
+                    ("count", self.count),
+                    ("count_estimated", self.count_estimated),
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_schema_fields(self, view) -> list[coreapi.Field]:
+        return super().get_schema_fields(view) + [
+            coreapi.Field(
+                name=self.count_query_param,
+                required=False,
+                location="query",
+                schema=coreschema.Enum(
+                    COUNT_MODES, title="Count", description=self.count_query_description
+                ),
+            )
+        ]
+
+    def get_ordering(
+        self, request: Request, queryset: QuerySet, view=None
+    ) -> tuple[str, ...]:
+        """
+        Returns ordering requested through the ordering filter, falling back to the
+        queryset's own ordering, always ending with id as a unique tie-breaker.
+        """
+        ordering = None
+        for filter_backend in getattr(view, "filter_backends", []):
+            if hasattr(filter_backend, "get_ordering"):
+                ordering = filter_backend().get_ordering(request, queryset, view)
+                break
+
+        if not ordering:
+            ordering = [
+                field for field in queryset.query.order_by if isinstance(field, str)
+            ] or self.ordering
+        if isinstance(ordering, str):
+            ordering = [ordering]
+
+        ordering = [
+            field[: -len("pk")] + "id" if field.lstrip("-") == "pk" else field
+            for field in ordering
+        ]
+        if not any(field.lstrip("-") == "id" for field in ordering):
+            ordering.append("-id" if ordering[-1].startswith("-") else "id")
+
+        return tuple(ordering)
+
+    @staticmethod
+    def reverse_ordering(ordering: tuple[str, ...]) -> tuple[str, ...]:
+        return tuple(
+            field[1:] if field.startswith("-") else f"-{field}" for field in ordering
+        )
+
+    @staticmethod
+    def get_keyset_filter(ordering: tuple[str, ...], position: list[Any]) -> Q:
+        """
+        Builds the rows following the position, "f1 > v1 OR (f1 = v1 AND f2 > v2)
+        OR ...", honouring the direction of every ordering field. Postgres cannot
+        start an index scan at such an OR chain, so it is ANDed with "f1 >= v1",
+        which the (f1, id) index uses as the start of its range.
+        """
+        keyset_filter = Q()
+        for index, field in enumerate(ordering):
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition = Q(**{f"{field.lstrip('-')}__{lookup}": position[index]})
+            for previous_field, value in zip(ordering[:index], position):
+                condition &= Q(**{previous_field.lstrip("-"): value})
+            keyset_filter |= condition
+
+        if len(ordering) > 1:
+            first_field = ordering[0]
+            lookup = "lte" if first_field.startswith("-") else "gte"
+            keyset_filter &= Q(**{f"{first_field.lstrip('-')}__{lookup}": position[0]})
+        return keyset_filter
+
+    def decode_position(self, position: str | None, model: type[Model]) -> list[Any]:
+        """
+        Returns values of the ordering fields, converted to the fields' types, so a
+        cursor of another ordering or with changed values is rejected as invalid.
+        """
+        try:
+            values = json.loads(position)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        for index, field in enumerate(self.ordering):
+            try:
+                model_field = model._meta.get_field(field.lstrip("-"))
+            except FieldDoesNotExist:
+                # Annotations, e.g. the search rank, are checked by the filter
+                continue
+            try:
+                values[index] = model_field.to_python(values[index])
+            except (TypeError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next:
+            return None
+
+        if self.page:
+            position = self._get_position_from_instance(self.page[-1], self.ordering)
+        else:
+            position = self.cursor.position
+
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous:
+            return None
+
+        if self.page:
+            position = self._get_position_from_instance(self.page[0], self.ordering)
+        else:
+            position = self.cursor.position
+
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def _get_position_from_instance(
+        self, instance: Model | dict, ordering: tuple[str, ...]
+    ) -> str:
+        values = []
+        for field in ordering:
+            field_name = field.lstrip("-")
+            if isinstance(instance, dict):
+                values.append(instance[field_name])
+            else:
+                values.append(getattr(instance, field_name))
+
+        return json.dumps(values, cls=DjangoJSONEncoder, separators=(",", ":"))
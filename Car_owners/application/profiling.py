@@ -0,0 +1,277 @@
+import cProfile
+import contextvars
+import datetime
+import io
+import json
+import pstats
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connections
+from django.http import HttpRequest, HttpResponse
+
+
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_QUERY_PARAM = "profile"
+# At most this many requests are profiled per worker process and hour, one at a
+# time, any other request asking for a profile is served as usual
+MAX_PROFILES_PER_HOUR = 20
+# Oldest profiles are removed above this number
+MAX_STORED_PROFILES = 50
+SLOWEST_QUERIES = 5
+TOP_FUNCTIONS = 40
+
+profiling_lock = threading.Lock()
+
+
+class QueryLog:
+    def __init__(self) -> None:
+        # (database alias, sql, params, duration)
+        self.queries: list[tuple[str, str, Any, float]] = []
+
+    def record_query(
+        self, execute: Callable, sql: str, params: Any, many: bool, context: dict
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                (
+                    context["connection"].alias,
+                    sql,
+                    None if many else params,
+                    time.perf_counter() - start,
+                )
+            )
+
+
+# Query log of the request profiled in the current thread or task
+current_query_log = contextvars.ContextVar("current_query_log", default=None)
+
+
+def record_query(
+    execute: Callable, sql: str, params: Any, many: bool, context: dict
+) -> Any:
+    """
+    Execute wrapper installed on every connection, see signals.py, logging
+    queries of the request profiled in the current context.
+    """
+    if (query_log := current_query_log.get()) is None:
+        return execute(sql, params, many, context)
+    return query_log.record_query(execute, sql, params, many, context)
+
+
+def get_profiles_dir() -> Path:
+    return Path(settings.PROFILES_DIR)
+
+
+def get_profile_path(profile_id: uuid.UUID, suffix: str) -> Path:
+    return get_profiles_dir() / f"{profile_id}{suffix}"
+
+
+def is_profiling_requested(request: HttpRequest) -> bool:
+    return (
+        request.META.get(PROFILE_HEADER) == "1"
+        or request.GET.get(PROFILE_QUERY_PARAM) == "1"
+    )
+
+
+def is_staff(request: HttpRequest) -> bool:
+    return request.user.is_staff
+
+
+def take_profiling_slot() -> bool:
+    """
+    Counts profiled requests in the current hour, False when the limit is used up.
+    """
+    key = f"profiles:{int(time.time() // 3600)}"
+    counters = caches["default"]
+    counters.add(key, 0, timeout=60 * 60)
+    return counters.incr(key) <= MAX_PROFILES_PER_HOUR
+
+
+def explain(alias: str, sql: str, params: Any) -> str | None:
+    """
+    Returns the plan of a select statement, which is not run again, so EXPLAIN is
+    safe for any query. Other statements are not explained.
+    """
+    if params is None or not sql.lstrip().upper().startswith("SELECT"):
+        return None
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+            return "\n".join(
+                " ".join(str(column) for column in row) for row in cursor.fetchall()
+            )
+    except DatabaseError as error:
+        return f"EXPLAIN failed: {error}"
+
+
+def get_functions_summary(profiler: cProfile.Profile) -> str:
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_FUNCTIONS)
+    return stream.getvalue()
+
+
+def remove_old_profiles() -> None:
+    summaries = sorted(
+        get_profiles_dir().glob("*.json"), key=lambda path: path.stat().st_mtime
+    )
+    for summary in summaries[:-MAX_STORED_PROFILES]:
+        summary.unlink(missing_ok=True)
+        summary.with_suffix(".pstats").unlink(missing_ok=True)
+
+
+def save_profile(
+    request: HttpRequest,
+    response: HttpResponse,
+    profiler: cProfile.Profile,
+    query_log: QueryLog,
+    duration: float,
+) -> uuid.UUID:
+    profile_id = uuid.uuid4()
+    get_profiles_dir().mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(get_profile_path(profile_id, ".pstats"))
+
+    slowest = sorted(query_log.queries, key=lambda query: query[3], reverse=True)
+    summary = {
+        "id": str(profile_id),
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "method": request.method,
+        "path": request.get_full_path(),
+        "user": request.user.get_username(),
+        "status": response.status_code,
+        "duration_ms": round(duration * 1000, 2),
+        "queries": len(query_log.queries),
+        "db_ms": round(sum(query[3] for query in query_log.queries) * 1000, 2),
+        "slowest_queries": [
+            {
+                "database": alias,
+                "sql": sql,
+                "params": None if params is None else [str(param) for param in params],
+                "duration_ms": round(query_duration * 1000, 2),
+                "explain": explain(alias, sql, params),
+            }
+            for alias, sql, params, query_duration in slowest[:SLOWEST_QUERIES]
+        ],
+        "functions": get_functions_summary(profiler),
+    }
+    get_profile_path(profile_id, ".json").write_text(json.dumps(summary, indent=2))
+    remove_old_profiles()
+    return profile_id
+
+
+def load_profiles() -> list[dict]:
+    """
+    Returns stored profiles' summaries without functions and queries, newest
+    first.
+    """
+    profiles = []
+    for path in get_profiles_dir().glob("*.json"):
+        summary = json.loads(path.read_text())
+        profiles.append(
+            {
+                key: value
+                for key, value in summary.items()
+                if key not in ("functions", "slowest_queries")
+            }
+        )
+    return sorted(profiles, key=lambda summary: summary["created_at"], reverse=True)
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a request with cProfile when a staff user asks for it with the
+    X-Profile: 1 header or the profile=1 query parameter. Function stats, the
+    slowest queries and their plans are stored for download from the profiles
+    endpoints, the profile id is sent in the X-Profile-Id header.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not is_profiling_requested(request) or not is_staff(request):
+            return self.get_response(request)
+        if not profiling_lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            if not take_profiling_slot():
+                return self.get_response(request)
+            return self.profile(request)
+        finally:
+            profiling_lock.release()
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        # The user and the counters are loaded with blocking calls
+        if not is_profiling_requested(request) or not await sync_to_async(is_staff)(
+            request
+        ):
+            return await self.get_response(request)
+        if not profiling_lock.acquire(blocking=False):
+            return await self.get_response(request)
+        try:
+            if not await sync_to_async(take_profiling_slot)():
+                return await self.get_response(request)
+            return await self.aprofile(request)
+        finally:
+            profiling_lock.release()
+
+    def profile(self, request: HttpRequest) -> HttpResponse:
+        # Cached responses would hide the slow part
+        request.skip_response_cache = True
+        query_log = QueryLog()
+        profiler = cProfile.Profile()
+        token = current_query_log.set(query_log)
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+            current_query_log.reset(token)
+        duration = time.perf_counter() - start
+
+        profile_id = save_profile(request, response, profiler, query_log, duration)
+        response["X-Profile-Id"] = str(profile_id)
+        return response
+
+    async def aprofile(self, request: HttpRequest) -> HttpResponse:
+        """
+        Profiles the event loop's thread only, so Python code of queries run by
+        the async ORM in other threads is missing from the function stats. The
+        queries themselves are all logged.
+        """
+        request.skip_response_cache = True
+        query_log = QueryLog()
+        profiler = cProfile.Profile()
+        token = current_query_log.set(query_log)
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiler.disable()
+            current_query_log.reset(token)
+        duration = time.perf_counter() - start
+
+        profile_id = await sync_to_async(save_profile)(
+            request, response, profiler, query_log, duration
+        )
+        response["X-Profile-Id"] = str(profile_id)
+        return response
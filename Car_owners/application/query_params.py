@@ -0,0 +1,90 @@
+import datetime
+import re
+from typing import Callable, Collection
+
+
+# A rule takes a query parameter's value and returns an error message or None
+Rule = Callable[[str], str | None]
+
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def forbidden_characters(pattern: re.Pattern, message: str) -> Rule:
+    def rule(value: str) -> str | None:
+        if pattern.search(value):
+            return message
+
+    return rule
+
+
+def exact_length(length: int, too_long: str, too_short: str) -> Rule:
+    def rule(value: str) -> str | None:
+        if len(value) > length:
+            return too_long
+        elif len(value) < length:
+            return too_short
+
+    return rule
+
+
+def ordering_of(fields: Collection[str], name: str) -> Rule:
+    """
+    Accepts only given fields, ascending or descending with a leading '-'.
+    """
+    choices = one_of(fields, name)
+
+    def rule(value: str) -> str | None:
+        return choices(value.removeprefix("-"))
+
+    return rule
+
+
+def one_of(choices: Collection[str], name: str) -> Rule:
+    """
+    Accepts only given choices, checked when the request comes, so choices may be
+    changed after the rule is created.
+    """
+
+    def rule(value: str) -> str | None:
+        if value not in choices:
+            return f"{name} should be one of the following: {', '.join(choices)}"
+
+    return rule
+
+
+def names_of(choices: Collection[str], name: str) -> Rule:
+    """
+    Accepts a comma separated list of given choices.
+    """
+
+    def rule(value: str) -> str | None:
+        if any(item not in choices for item in value.split(",")):
+            return f"{name} should be a comma separated list of: {', '.join(choices)}"
+
+    return rule
+
+
+def date_not_in_future(format_message: str, future_message: str) -> Rule:
+    def rule(value: str) -> str | None:
+        try:
+            date = datetime.datetime.strptime(value, DATE_FORMAT).date()
+        except ValueError:
+            return format_message
+        if date > datetime.date.today():
+            return future_message
+
+    return rule
+
+
+def get_query_params_errors(
+    query_params: dict[str, str], rules: dict[str, list[Rule]]
+) -> dict[str, str]:
+    """
+    Returns the first broken rule as {parameter: message}, empty when all query
+    parameters are valid. Parameters without rules are not checked.
+    """
+    for key, value in query_params.items():
+        for rule in rules.get(key, []):
+            if message := rule(value):
+                return {key: message}
+    return {}
@@ -0,0 +1,98 @@
+from typing import Any, Mapping
+import msgpack
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# Types orjson and msgpack do not encode the same way as DRF's JSONRenderer, e.g.
+# Decimal, lazy translations or datetimes with "Z", are passed to its encoder
+encode_default = JSONEncoder().default
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson, several times faster than the standard
+    json module on large pages. Output is the same compact UTF-8 JSON. Indented
+    output, asked for with the Accept header, is left to JSONRenderer.
+    """
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: str | None = None,
+        renderer_context: Mapping | None = None,
+    ) -> bytes:
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        content = orjson.dumps(data, default=encode_default, option=ORJSON_OPTIONS)
+        # Escaped by JSONRenderer too, so the output is valid JavaScript
+        if b"\xe2\x80\xa8" in content or b"\xe2\x80\xa9" in content:
+            content = content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return content
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSONParser decoding UTF-8 request bodies with orjson.
+    """
+
+    def parse(
+        self,
+        stream: Any,
+        media_type: str | None = None,
+        parser_context: Mapping | None = None,
+    ) -> Any:
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as error:
+            raise ParseError(f"JSON parse error - {error}")
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renders MessagePack, a binary format smaller than JSON and faster to encode,
+    for clients sending Accept: application/msgpack.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: str | None = None,
+        renderer_context: Mapping | None = None,
+    ) -> bytes:
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=encode_default)
+
+
+class MessagePackParser(BaseParser):
+    """
+    Parses MessagePack request bodies sent with Content-Type: application/msgpack.
+    """
+
+    media_type = "application/msgpack"
+
+    def parse(
+        self,
+        stream: Any,
+        media_type: str | None = None,
+        parser_context: Mapping | None = None,
+    ) -> Any:
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.UnpackException) as error:
+            raise ParseError(f"MessagePack parse error - {error}")
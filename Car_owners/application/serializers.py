@@ -1,57 +1,463 @@
 import collections
 import datetime
-from re import search
-from rest_framework import serializers
+import functools
+import re
+from typing import Any, Callable, Collection, Mapping
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Model, QuerySet
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueValidator
 from .models import Owner, Car
+from .statistics import get_saved_values, mark_saved, update_car_statistics
 
 
-class OwnerSerializer(serializers.ModelSerializer):
+NAME_FORBIDDEN_CHARACTERS = re.compile("[^A-Z-a-zżźćńółęąśŻŹĆĄŚĘŁÓŃ]")
+PHONE_FORBIDDEN_CHARACTERS = re.compile("[^0-9]")
+PHONE_LENGTH = 9
+# Cars changed by one transition request, which locks them all
+MAX_TRANSITION_CARS = 1000
+
+
+def get_owner_errors(data: Mapping[str, Any]) -> dict[str, str]:
+    """
+    Returns the first broken owner rule as {field: message}, empty when data is
+    valid. Fields missing from data are not checked.
+    """
+    error_text = "Field can contain only letters and '-' without whitespaces."
+    phone = data.get("phone", "700700700")
+    if NAME_FORBIDDEN_CHARACTERS.search(data.get("name", "a")):
+        return {"name": error_text}
+    elif NAME_FORBIDDEN_CHARACTERS.search(data.get("surname", "a")):
+        return {"surname": error_text}
+    elif PHONE_FORBIDDEN_CHARACTERS.search(phone):
+        return {"phone": "Phone number can contain only digits"}
+    elif len(phone) < PHONE_LENGTH:
+        return {"phone": "The phone number is too short - 9 digits required"}
+    elif len(phone) > PHONE_LENGTH:
+        return {"phone": "The phone number is too long - 9 digits required"}
+    return {}
+
+
+def get_car_errors(data: Mapping[str, Any]) -> dict[str, str]:
+    """
+    Returns the first broken car rule as {field: message}, empty when data is
+    valid. Fields missing from data are not checked.
+    """
+    if data.get("production_date", datetime.date.today()) > datetime.date.today():
+        return {"production_date": "Production date cannot be from the future."}
+    elif data.get("total_cost", 1) < 0:
+        return {"total_cost": "Total cost cannot be negative."}
+    return {}
+
+
+class SparseFieldsMixin:
+    """
+    Serializer sending only the fields named in the "fields" argument, e.g. picked
+    by the fields and omit query parameters. All fields are sent by default.
+    """
+
+    def __init__(self, *args, fields: Collection[str] | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in [*self.fields]:
+                if name not in fields:
+                    self.fields.pop(name)
+
+
+class BulkUniqueValidator(UniqueValidator):
+    """
+    UniqueValidator checking values against the "taken_values" context, which
+    BulkListSerializer looks up for all items of the list at once.
+    """
+
+    def __call__(self, value: Any, serializer_field: serializers.Field) -> None:
+        taken_values = serializer_field.context["taken_values"][
+            serializer_field.field_name
+        ]
+        instance = serializer_field.parent.instance
+        if value in taken_values and (
+            instance is None or taken_values[value] != instance.pk
+        ):
+            raise serializers.ValidationError(self.message, code="unique")
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    List serializer saving all items with a single bulk_create/bulk_update.
+
+    When an instance queryset is given, every item has to carry the "id" of the
+    object it updates, each id at most once. Validation errors are reported per item, in input order.
+    """
+
+    def to_internal_value(self, data: Any) -> list[dict]:
+        if isinstance(data, list):
+            self.context.update(self.get_bulk_context(data))
+            self.context["taken_values"] = self.get_taken_values(data)
+
+        if self.instance is None or not isinstance(data, list):
+            return super().to_internal_value(data)
+
+        pks = [self.get_item_pk(item) for item in data]
+        instances = self.instance.in_bulk([pk for pk in pks if pk is not None])
+
+        validated_data = []
+        errors = []
+        seen_pks = set()
+        for pk, item in zip(pks, data):
+            if pk not in instances:
+                raw_pk = item.get("id") if isinstance(item, dict) else None
+                errors.append(
+                    {"id": [f'Invalid pk "{raw_pk}" - object does not exist.']}
+                )
+                continue
+            # The same object updated twice would be counted twice, e.g. in the
+            # car statistics
+            if pk in seen_pks:
+                errors.append({"id": [f'Duplicated pk "{pk}" in the list.']})
+                continue
+            seen_pks.add(pk)
+
+            # Let field validators (e.g. unique phone) exclude the updated object
+            self.child.instance = instances[pk]
+            try:
+                validated = self.child.run_validation(item)
+            except serializers.ValidationError as exc:
+                errors.append(exc.detail)
+            else:
+                validated_data.append({**validated, "id": instances[pk]})
+                errors.append({})
+        self.child.instance = None
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        return validated_data
+
+    @staticmethod
+    def get_item_pk(item: Any) -> int | None:
+        try:
+            return int(item["id"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def get_bulk_context(self, data: list) -> dict[str, Any]:
+        """
+        Returns objects shared by all items, looked up once for the whole list.
+        """
+        return {}
+
+    def get_taken_values(self, data: list) -> dict[str, dict[Any, Any]]:
+        """
+        Looks up values of unique fields given in the list that other objects
+        already have, with one query per field instead of one per item. Returns
+        {field: {value: pk}}, checked by the fields' BulkUniqueValidator.
+        """
+        taken_values = {}
+        for name, field in self.child.fields.items():
+            for index, validator in enumerate(field.validators):
+                if type(validator) is UniqueValidator and validator.lookup == "exact":
+                    field.validators[index] = BulkUniqueValidator(
+                        validator.queryset, validator.message
+                    )
+                elif not isinstance(validator, BulkUniqueValidator):
+                    continue
+
+                values = set()
+                for item in data:
+                    try:
+                        values.add(field.to_internal_value(item[name]))
+                    except (KeyError, TypeError, serializers.ValidationError):
+                        continue
+                taken_values[name] = dict(
+                    field.validators[index]
+                    .queryset.filter(**{f"{field.source}__in": values})
+                    .values_list(field.source, "pk")
+                )
+        return taken_values
+
+    def create(self, validated_data: list[dict]) -> list[Model]:
+        model = self.child.Meta.model
+        return model.objects.bulk_create([model(**attrs) for attrs in validated_data])
+
+    def update(self, instance: QuerySet, validated_data: list[dict]) -> list[Model]:
+        model = self.child.Meta.model
+        # bulk_update does not call save(), so auto_now fields are set here
+        auto_now_fields = [
+            field
+            for field in model._meta.concrete_fields
+            if getattr(field, "auto_now", False)
+        ]
+        objects = []
+        updated_fields = set()
+        for attrs in validated_data:
+            obj = attrs.pop("id")
+            for field, value in attrs.items():
+                setattr(obj, field, value)
+            for field in auto_now_fields:
+                field.pre_save(obj, add=False)
+            objects.append(obj)
+            updated_fields.update(attrs)
+
+        if updated_fields:
+            updated_fields.update(field.name for field in auto_now_fields)
+            model.objects.bulk_update(objects, sorted(updated_fields))
+
+        return objects
+
+
+class OwnerListSerializer(BulkListSerializer):
+    def to_internal_value(self, data: Any) -> list[dict]:
+        """
+        Checks that no phone number is repeated within the list.
+        """
+        validated_data = super().to_internal_value(data)
+
+        phones = collections.Counter(
+            attrs["phone"] for attrs in validated_data if attrs.get("phone")
+        )
+        errors = [
+            {"phone": ["Phone number is repeated in the request."]}
+            if phones[attrs.get("phone")] > 1
+            else {}
+            for attrs in validated_data
+        ]
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        return validated_data
+
+
+class OwnerSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Owner
-        fields = ["id", "name", "surname", "phone"]
+        fields = ["id", "name", "surname", "phone", *Owner.AGGREGATE_FIELDS]
+        # Maintained on car changes only
+        read_only_fields = Owner.AGGREGATE_FIELDS
+        list_serializer_class = OwnerListSerializer
 
     def validate(self, data: collections.OrderedDict) -> collections.OrderedDict:
         """
-        Checks if name and surname contain only letters and '-'.
+        Checks if name and surname contain only letters and '-' and phone number
+        has exactly 9 digits.
         """
-
-        error_text = "Field can contain only letters and '-' without whitespaces."
-        if search("[^A-Z-a-zżźćńółęąśŻŹĆĄŚĘŁÓŃ]", data.get("name", "a")):
-            raise serializers.ValidationError({"name": error_text})
-        elif search("[^A-Z-a-zżźćńółęąśŻŹĆĄŚĘŁÓŃ]", data.get("surname", "a")):
-            raise serializers.ValidationError({"surname": error_text})
-        elif search("[^0-9]", data.get("phone", "700700700")):
-            raise serializers.ValidationError(
-                {"phone": "Phone number can contain only digits"}
-            )
-        elif len(data.get("phone", "700700700")) < 9:
-            raise serializers.ValidationError(
-                {"phone": "The phone number is too short - 9 digits required"}
-            )
-        elif len(data.get("phone", "700700700")) > 9:
-            raise serializers.ValidationError(
-                {"phone": "The phone number is too long - 9 digits required"}
-            )
+        if errors := get_owner_errors(data):
+            raise serializers.ValidationError(errors)
         return data
 
 
-class CarSerializer(serializers.ModelSerializer):
+class OwnerPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    def to_internal_value(self, data: Any) -> Owner:
+        """
+        Takes the owner from the "owners" context when CarListSerializer has
+        already fetched all owners of the list.
+        """
+        owners = self.context.get("owners")
+        if owners is None:
+            return super().to_internal_value(data)
+
+        try:
+            if isinstance(data, bool):
+                raise TypeError
+            return owners[int(data)]
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+
+class CarListSerializer(BulkListSerializer):
+    def get_bulk_context(self, data: list) -> dict[str, dict[int, Owner]]:
+        owner_ids = set()
+        for item in data:
+            try:
+                owner_ids.add(int(item["owner"]))
+            except (KeyError, TypeError, ValueError):
+                pass
+
+        return {"owners": Owner.objects.in_bulk(owner_ids)}
+
+    # Bulk writes send no signals, so the car statistics are updated here
+    def create(self, validated_data: list[dict]) -> list[Car]:
+        cars = super().create(validated_data)
+        update_car_statistics(added=[mark_saved(car) for car in cars])
+        return cars
+
+    def update(self, instance: QuerySet, validated_data: list[dict]) -> list[Car]:
+        removed = [get_saved_values(attrs["id"]) for attrs in validated_data]
+        cars = super().update(instance, validated_data)
+        update_car_statistics(removed=removed, added=[mark_saved(car) for car in cars])
+        return cars
+
+
+class CarSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    owner = OwnerPrimaryKeyRelatedField(queryset=Owner.objects.all())
+
     class Meta:
         model = Car
         fields = ["id", "brand", "model", "production_date", "problem_description",
                   "repaired", "total_cost", "owner"]
+        list_serializer_class = CarListSerializer
 
     def validate(self, data: collections.OrderedDict) -> collections.OrderedDict:
         """
         Checks that production date is not from the future and total cost is not
         negative.
         """
-        if data.get("production_date", datetime.date.today()) > datetime.date.today():
+        if errors := get_car_errors(data):
+            raise serializers.ValidationError(errors)
+        return data
+
+
+class CarTransitionSerializer(serializers.Serializer):
+    """
+    Cars given by "ids" or by a "filter" of car list query parameters, and the
+    "repaired" and "total_cost" values set on all of them.
+    """
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=MAX_TRANSITION_CARS,
+    )
+    filter = serializers.DictField(
+        child=serializers.CharField(), required=False, allow_empty=False
+    )
+    # Same fields and rules as in CarSerializer
+    repaired = serializers.BooleanField(required=False)
+    total_cost = serializers.FloatField(required=False)
+
+    def validate(self, data: collections.OrderedDict) -> collections.OrderedDict:
+        """
+        Checks that exactly one way of choosing cars is given, at least one value
+        is set and values follow the car rules.
+        """
+        if ("ids" in data) == ("filter" in data):
             raise serializers.ValidationError(
-                {"production_date": "Production date cannot be from the future."}
+                {"ids": "Give either ids or a filter of cars."}
             )
-        elif data.get("total_cost", 1) < 0:
+        if not self.get_values(data):
             raise serializers.ValidationError(
-                {"total_cost": "Total cost cannot be negative."}
+                {"repaired": "Give repaired or total_cost to set."}
             )
+        if errors := get_car_errors(data):
+            raise serializers.ValidationError(errors)
         return data
+
+    @staticmethod
+    def get_values(data: Mapping[str, Any]) -> dict[str, Any]:
+        return {
+            field: data[field] for field in ["repaired", "total_cost"] if field in data
+        }
+
+
+class OwnerWithCarsSerializer(OwnerSerializer):
+    cars = CarSerializer(source="car_set", many=True, read_only=True)
+
+    class Meta(OwnerSerializer.Meta):
+        fields = OwnerSerializer.Meta.fields + ["cars"]
+
+
+class CarWithOwnerSerializer(CarSerializer):
+    owner_details = OwnerSerializer(source="owner", read_only=True)
+
+    class Meta(CarSerializer.Meta):
+        fields = CarSerializer.Meta.fields + ["owner_details"]
+
+
+# Converters giving the same result as to_representation of the field types
+BUILTIN_CONVERTERS = {
+    serializers.CharField.to_representation: str,
+    serializers.IntegerField.to_representation: int,
+    serializers.FloatField.to_representation: float,
+    serializers.BooleanField.to_representation: bool,
+}
+
+
+def get_converter(field: serializers.Field, model: type[Model]) -> Callable | None:
+    """
+    Returns a function turning a .values() value of the field's source into the
+    field's representation, None when the field cannot be read from .values().
+    """
+    try:
+        model_field = model._meta.get_field(field.source)
+    except FieldDoesNotExist:
+        return None
+    if not model_field.concrete or model_field.many_to_many:
+        return None
+
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        # .values() already returns the related object's pk
+        return None if field.pk_field else lambda value: value
+    if isinstance(field, (serializers.BaseSerializer, serializers.RelatedField)):
+        return None
+
+    to_representation = type(field).to_representation
+    if to_representation in BUILTIN_CONVERTERS:
+        return BUILTIN_CONVERTERS[to_representation]
+    if to_representation is serializers.DateField.to_representation:
+        output_format = getattr(field, "format", api_settings.DATE_FORMAT)
+        if output_format is not None and output_format.lower() == ISO_8601:
+            return datetime.date.isoformat
+    return field.to_representation
+
+
+class ValuesReader:
+    """
+    Read-only fast path of a ModelSerializer. Builds the serializer's exact output
+    straight from .values() rows through converters precomputed once per field,
+    without creating model instances or running the field machinery per row.
+    """
+
+    def __init__(self, fields: list[tuple[str, str, Callable]]) -> None:
+        self.fields = fields
+
+    def get_values(self, queryset: QuerySet, *columns: str) -> QuerySet:
+        # Annotations (e.g. search rank), ordering columns and the pk are kept for
+        # pagination cursors, also when their fields are not sent. Other columns,
+        # e.g. for response validators, are given.
+        ordering = [
+            field.lstrip("-")
+            for field in queryset.query.order_by
+            if isinstance(field, str)
+        ]
+        sources = dict.fromkeys(
+            [
+                *(source for _, source, _ in self.fields),
+                *ordering,
+                queryset.model._meta.pk.name,
+                *queryset.query.annotation_select,
+                *columns,
+            ]
+        )
+        return queryset.values(*sources)
+
+    def to_representation(self, rows: list[dict]) -> list[dict]:
+        return [
+            {
+                name: None if (value := row[source]) is None else convert(value)
+                for name, source, convert in self.fields
+            }
+            for row in rows
+        ]
+
+
+@functools.cache
+def get_values_reader(
+    serializer_class: type, fields: tuple[str, ...] | None = None
+) -> ValuesReader | None:
+    """
+    Returns ValuesReader of the serializer class, limited to the given fields, None
+    when any of its fields (e.g. a nested serializer) cannot be read from .values().
+    """
+    serializer = serializer_class(fields=fields)
+    model = serializer.Meta.model
+    fields = []
+    for field in serializer._readable_fields:
+        converter = get_converter(field, model)
+        if converter is None:
+            return None
+        fields.append((field.field_name, field.source, converter))
+
+    return ValuesReader(fields)
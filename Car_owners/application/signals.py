@@ -0,0 +1,80 @@
+import collections
+from typing import Any
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+from django.db.models import QuerySet
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from . import metrics, profiling
+from .cache import invalidate_model
+from .models import Owner, Car, ArchivedCar, CarStatistics
+from .statistics import (
+    STATISTICS_FIELDS,
+    get_saved_values,
+    mark_saved,
+    update_car_statistics,
+)
+
+
+@receiver(connection_created)
+def install_query_recorders(connection: BaseDatabaseWrapper, **kwargs) -> None:
+    # Installed once per connection, rather than around each request, so queries
+    # run by the async ORM in other threads are recorded too
+    for record_query in (metrics.record_query, profiling.record_query):
+        if record_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(record_query)
+
+
+@receiver([post_save, post_delete], sender=Owner)
+@receiver([post_save, post_delete], sender=Car)
+def invalidate_cached_responses(sender: type[Owner | Car], **kwargs) -> None:
+    invalidate_model(sender)
+
+
+@receiver(pre_save, sender=Car)
+def load_saved_car_values(instance: Car, **kwargs) -> None:
+    # Cars not loaded from the database (e.g. saved with an explicit pk)
+    if not instance._state.adding and not hasattr(instance, "_loaded_values"):
+        instance._loaded_values = (
+            Car.objects.filter(pk=instance.pk).values(*STATISTICS_FIELDS).first() or {}
+        )
+
+
+@receiver(post_save, sender=Car)
+def update_statistics_on_save(instance: Car, created: bool, **kwargs) -> None:
+    removed = [] if created else [get_saved_values(instance)]
+    update_car_statistics(removed=removed, added=[mark_saved(instance)])
+
+
+def is_owner_deletion(origin: Any) -> bool:
+    return isinstance(origin, Owner) or (
+        isinstance(origin, QuerySet) and origin.model is Owner
+    )
+
+
+@receiver(post_delete, sender=Car)
+# Archived cars count too, e.g. when deleted with their owner
+@receiver(post_delete, sender=ArchivedCar)
+def update_statistics_on_delete(instance: Car, origin: Any = None, **kwargs) -> None:
+    values = get_saved_values(instance)
+    if is_owner_deletion(origin):
+        # Cars deleted with their owner leave the counters at once, together
+        # with the owner
+        deleted_cars = origin.__dict__.setdefault(
+            "_deleted_cars", collections.defaultdict(list)
+        )
+        deleted_cars[values["owner_id"]].append(values)
+    else:
+        update_car_statistics(removed=[values])
+
+
+@receiver(post_delete, sender=Owner)
+def delete_owner_statistics(instance: Owner, origin: Any = None, **kwargs) -> None:
+    # Cascaded cars' post_delete signals are sent before the owner's
+    deleted_cars = getattr(origin, "_deleted_cars", {})
+    update_car_statistics(
+        removed=deleted_cars.pop(instance.pk, []), owners_deleted=True
+    )
+    CarStatistics.objects.filter(
+        dimension=CarStatistics.OWNER, key=str(instance.pk)
+    ).delete()
@@ -0,0 +1,202 @@
+import collections
+import math
+from typing import Any, Iterable
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from .models import Owner, Car, ArchivedCar, CarHistory, CarStatistics
+
+# Car fields the statistics depend on
+STATISTICS_FIELDS = ["brand", "owner_id", "repaired", "total_cost"]
+COUNTERS = {
+    "cars_count": Count("pk"),
+    "repaired_count": Count("pk", filter=Q(repaired=True)),
+    "revenue": Sum("total_cost"),
+}
+OWNER_COUNTERS = {
+    "cars_count": Count("pk"),
+    "open_jobs_count": Count("pk", filter=Q(repaired=False)),
+    "lifetime_spend": Sum("total_cost"),
+}
+UPSERT_BATCH_SIZE = 1000
+
+
+def get_car_values(car: Car) -> dict[str, Any]:
+    return {field: getattr(car, field) for field in STATISTICS_FIELDS}
+
+
+def get_saved_values(car: Car) -> dict[str, Any]:
+    """
+    Returns car's values as last saved in the database. Fields not loaded from
+    the database are not saved either, so their current value is used.
+    """
+    loaded_values = getattr(car, "_loaded_values", {})
+    return {
+        field: loaded_values[field] if field in loaded_values else getattr(car, field)
+        for field in STATISTICS_FIELDS
+    }
+
+
+def mark_saved(car: Car) -> dict[str, Any]:
+    """
+    Remembers car's current values as saved and returns them.
+    """
+    values = get_car_values(car)
+    car._loaded_values = {**getattr(car, "_loaded_values", {}), **values}
+    return values
+
+
+def get_statistics_keys(values: dict[str, Any]) -> list[tuple[str, str]]:
+    return [
+        (CarStatistics.TOTAL, ""),
+        (CarStatistics.BRAND, values["brand"]),
+        (CarStatistics.OWNER, str(values["owner_id"])),
+    ]
+
+
+def update_car_statistics(
+    removed: Iterable[dict[str, Any]] = (),
+    added: Iterable[dict[str, Any]] = (),
+    owners_deleted: bool = False,
+) -> None:
+    """
+    Moves removed and added cars' values out of and into the summary counters
+    and owners' aggregates with relative updates, so concurrent writers do not
+    overwrite each other. Rows are updated in a fixed order to avoid deadlocks.
+    Aggregates are skipped when the cars' owners are deleted with them.
+    """
+    deltas = collections.defaultdict(lambda: [0, 0, 0.0])
+    for sign, cars_values in [(-1, removed), (1, added)]:
+        for values in cars_values:
+            for key in get_statistics_keys(values):
+                deltas[key][0] += sign
+                deltas[key][1] += sign * bool(values["repaired"])
+                deltas[key][2] += sign * float(values["total_cost"])
+    rows = [(*key, *delta) for key, delta in sorted(deltas.items()) if any(delta)]
+
+    table = connection.ops.quote_name(CarStatistics._meta.db_table)
+    columns = ["dimension", "key", "cars_count", "repaired_count", "revenue"]
+    counters = ", ".join(
+        f"{column} = {table}.{column} + EXCLUDED.{column}" for column in columns[2:]
+    )
+    with transaction.atomic(savepoint=False), connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = rows[start : start + UPSERT_BATCH_SIZE]
+            values_sql = ", ".join(
+                [f"({', '.join(['%s'] * len(columns))})"] * len(batch)
+            )
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES {values_sql} "
+                f"ON CONFLICT (dimension, key) DO UPDATE SET {counters}",
+                [value for row in batch for value in row],
+            )
+        if not owners_deleted:
+            update_owner_aggregates(
+                (int(key), cars, cars - repaired, revenue)
+                for (dimension, key), (cars, repaired, revenue) in deltas.items()
+                if dimension == CarStatistics.OWNER
+            )
+
+
+def update_owner_aggregates(deltas: Iterable[tuple[int, int, int, float]]) -> None:
+    """
+    Adds (owner id, cars, open jobs, spend) deltas to owners' aggregates, with one
+    UPDATE per batch of owners. Owners' updated_at is set too, so validators of
+    owner responses change with the aggregates.
+    """
+    rows = sorted(delta for delta in deltas if any(delta[1:]))
+    table = connection.ops.quote_name(Owner._meta.db_table)
+    columns = ", ".join(
+        f"{field} = {table}.{field} + deltas.column{index}"
+        for index, field in enumerate(Owner.AGGREGATE_FIELDS, start=2)
+    )
+    updated_at = connection.ops.adapt_datetimefield_value(timezone.now())
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = rows[start : start + UPSERT_BATCH_SIZE]
+            values_sql = ", ".join(["(%s, %s, %s, %s)"] * len(batch))
+            cursor.execute(
+                f"UPDATE {table} SET {columns}, updated_at = %s "
+                f"FROM (VALUES {values_sql}) AS deltas "
+                f"WHERE {table}.id = deltas.column1",
+                [updated_at, *(value for row in batch for value in row)],
+            )
+
+
+def rebuild_car_statistics() -> None:
+    """
+    Recounts all summary counters from the live and archived cars. On Postgres car
+    writes wait until the rebuild is committed, so no change is lost in between.
+    """
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"LOCK TABLE {Car._meta.db_table}, {ArchivedCar._meta.db_table} "
+                    f"IN SHARE MODE"
+                )
+
+        totals = CarHistory.objects.aggregate(**COUNTERS)
+        statistics = [
+            CarStatistics(
+                dimension=CarStatistics.TOTAL,
+                key="",
+                **{**totals, "revenue": totals["revenue"] or 0.0},
+            )
+        ]
+        for dimension, field in [
+            (CarStatistics.BRAND, "brand"),
+            (CarStatistics.OWNER, "owner_id"),
+        ]:
+            for group in (
+                CarHistory.objects.values(field).annotate(**COUNTERS).order_by()
+            ):
+                key = str(group.pop(field))
+                statistics.append(CarStatistics(dimension=dimension, key=key, **group))
+
+        CarStatistics.objects.all().delete()
+        CarStatistics.objects.bulk_create(statistics, batch_size=5000)
+
+
+def reconcile_owner_aggregates(batch_size: int = UPSERT_BATCH_SIZE) -> int:
+    """
+    Recounts owners' aggregates from live and archived cars, one batch of owners
+    at a time, and fixes the drifted ones. Returns the number of fixed owners.
+    Owners of the batch are locked while counted, so concurrent car writes wait
+    and add their changes to the fixed values.
+    """
+    fixed = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            owners = list(
+                Owner.objects.select_for_update()
+                .filter(id__gt=last_id)
+                .order_by("id")[:batch_size]
+            )
+            if not owners:
+                return fixed
+            last_id = owners[-1].id
+
+            counters = {
+                group.pop("owner_id"): group
+                for group in CarHistory.objects.filter(owner__in=owners)
+                .values("owner_id")
+                .annotate(**OWNER_COUNTERS)
+                .order_by()
+            }
+            drifted = []
+            for owner in owners:
+                expected = counters.get(owner.id, {})
+                if all(
+                    math.isclose(getattr(owner, field), expected.get(field, 0))
+                    for field in Owner.AGGREGATE_FIELDS
+                ):
+                    continue
+                for field in Owner.AGGREGATE_FIELDS:
+                    setattr(owner, field, expected.get(field, 0))
+                owner.updated_at = timezone.now()
+                drifted.append(owner)
+
+            Owner.objects.bulk_update(drifted, [*Owner.AGGREGATE_FIELDS, "updated_at"])
+            fixed += len(drifted)
@@ -1,21 +1,15 @@
 from django.urls import path, include
 from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
 from rest_framework import permissions
 from rest_framework.routers import DefaultRouter
 from . import views
+from .async_views import AsyncReadView
+from .openapi import API_INFO
 
 
 # Schema view for swagger
 schema_view = get_schema_view(
-   openapi.Info(
-      title="Workshop’s customers Management",
-      default_version='v1',
-      description="Application for Workshop’s customers Management – allows adding new "
-                  "customers and their’ cars with failure description.",
-      contact=openapi.Contact(email="tobiasz_bernacki@onet.pl"),
-      license=openapi.License(name="GNU License"),
-   ),
+   API_INFO,
    public=True,
    permission_classes=[permissions.AllowAny],
 )
@@ -29,5 +23,56 @@ router.register(r"cars", views.CarViewSet, basename="car")
 # The API URLs are now determined automatically by the router.
 urlpatterns = [
     path("app/", include(router.urls)),
+    path(
+        "app/async/owners/",
+        AsyncReadView.as_view(viewset_class=views.OwnerViewSet, action="list"),
+        name="async-owner-list",
+    ),
+    path(
+        "app/async/owners/<str:pk>/",
+        AsyncReadView.as_view(viewset_class=views.OwnerViewSet, action="retrieve"),
+        name="async-owner-detail",
+    ),
+    path(
+        "app/async/cars/",
+        AsyncReadView.as_view(viewset_class=views.CarViewSet, action="list"),
+        name="async-car-list",
+    ),
+    path(
+        "app/async/cars/unrepaired/",
+        AsyncReadView.as_view(viewset_class=views.CarViewSet, action="unrepaired"),
+        name="async-car-unrepaired",
+    ),
+    path(
+        "app/async/cars/<str:pk>/",
+        AsyncReadView.as_view(viewset_class=views.CarViewSet, action="retrieve"),
+        name="async-car-detail",
+    ),
+    path("app/cache-stats/", views.response_cache_stats, name="cache-stats"),
+    path("app/metrics/", views.metrics, name="metrics"),
+    path("app/profiles/", views.profiles, name="profiles"),
+    path(
+        "app/profiles/<uuid:profile_id>/",
+        views.profile_detail,
+        name="profile-detail",
+    ),
+    path(
+        "app/profiles/<uuid:profile_id>/stats/",
+        views.profile_stats,
+        name="profile-stats",
+    ),
+    path("app/stats/", views.workshop_statistics, name="stats"),
+    path(
+        "openapi.json",
+        views.openapi_schema,
+        {"schema_format": "json"},
+        name="openapi-json",
+    ),
+    path(
+        "openapi.yaml",
+        views.openapi_schema,
+        {"schema_format": "yaml"},
+        name="openapi-yaml",
+    ),
     path('', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
 ]
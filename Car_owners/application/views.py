@@ -1,25 +1,103 @@
 from abc import ABC, abstractmethod
-import datetime
-from typing import Type
+import functools
+import hashlib
+import json
+import uuid
+from typing import Any, Callable, Collection, NamedTuple, Type
+from asgiref.sync import sync_to_async
 import django_filters
 from django_filters.rest_framework import DjangoFilterBackend
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.db.models import Count, Max, Model, Prefetch, QuerySet
+from django.db.models.functions import Now, Upper
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
 from django.utils.decorators import method_decorator
+from django.views.decorators.http import require_safe
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from re import search
 from rest_framework import viewsets, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view
 from rest_framework.request import Request
 from rest_framework.filters import OrderingFilter
 from rest_framework.response import Response
+from .cache import (
+    cache_response,
+    cache_stats,
+    get_not_modified_response,
+    invalidate_model,
+)
+from .db_routers import replica_reads
 from .decortors import swagger_decorator_owner, swagger_decorator_car
-from .models import Owner, Car
-from .serializers import OwnerSerializer, CarSerializer
+from .export import EXPORT_FORMATS
+from .metrics import render_metrics, serialization_timer
+from .models import Owner, Car, CarHistory, CarStatistics
+from .openapi import SCHEMA_FORMATS, load_schema
+from .pagination import COUNT_MODES, KeysetPagination
+from .profiling import get_profile_path, load_profiles
+from .query_params import (
+    Rule,
+    date_not_in_future,
+    exact_length,
+    forbidden_characters,
+    get_query_params_errors,
+    one_of,
+    names_of,
+    ordering_of,
+)
+from .serializers import (
+    OwnerSerializer,
+    CarSerializer,
+    OwnerWithCarsSerializer,
+    CarWithOwnerSerializer,
+    CarTransitionSerializer,
+    ValuesReader,
+    get_values_reader,
+    NAME_FORBIDDEN_CHARACTERS,
+    PHONE_FORBIDDEN_CHARACTERS,
+    PHONE_LENGTH,
+    MAX_TRANSITION_CARS,
+)
+from .statistics import STATISTICS_FIELDS, update_car_statistics
 
 
 request_type = Request
 response_type = Response
 
+MAX_STATISTICS_OWNERS = 100
+VALIDATOR_AGGREGATES = {"last_modified": Max("updated_at"), "count": Count("pk")}
+# Read with every listed row for validators of its page
+VALIDATOR_COLUMNS = ["id", "updated_at"]
+OPENAPI_SCHEMA_MAX_AGE = 60 * 60
+
+
+def get_row_value(row: Model | dict, name: str) -> Any:
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+class Expansion(NamedTuple):
+    serializer_class: Type
+    # Loads the related data of the whole page at once, never per object
+    load_related: Callable[[QuerySet], QuerySet]
+    # Column of the listed rows referencing the embedded rows
+    related_key: str
+    # Related rows embedded for the given keys, used for response validators
+    related_queryset: Callable[[Collection], QuerySet]
+
 
 class OwnerFilter(django_filters.FilterSet):
     name = django_filters.CharFilter(lookup_expr="iexact")
@@ -34,6 +112,7 @@ class CarFilter(django_filters.FilterSet):
     brand = django_filters.CharFilter(lookup_expr="iexact")
     model = django_filters.CharFilter(lookup_expr="iexact")
     problem_description = django_filters.CharFilter(lookup_expr="icontains")
+    search = django_filters.CharFilter(method="filter_search")
 
     class Meta:
         model = Car
@@ -47,6 +126,32 @@ class CarFilter(django_filters.FilterSet):
             "owner",
         ]
 
+    @staticmethod
+    def filter_search(queryset: QuerySet, name: str, value: str) -> QuerySet:
+        """
+        Searches problem description, ranking cars by trigram word similarity.
+        Databases without pg_trgm fall back to matching every word with icontains.
+        """
+        if connections[queryset.db].vendor != "postgresql":
+            for word in value.split():
+                queryset = queryset.filter(problem_description__icontains=word)
+            return queryset
+
+        # Same expression as the trigram index, so the %> operator can use it
+        return (
+            queryset.alias(problem_description_upper=Upper("problem_description"))
+            .filter(problem_description_upper__trigram_word_similar=value)
+            .annotate(
+                search_rank=TrigramWordSimilarity(value, "problem_description_upper")
+            )
+            .order_by("-search_rank")
+        )
+
+
+class CarHistoryFilter(CarFilter):
+    class Meta(CarFilter.Meta):
+        model = CarHistory
+
 
 class BaseViewSet(ABC, viewsets.ModelViewSet):
     def __init__(self, *args, **kwargs) -> None:
@@ -55,35 +160,414 @@ class BaseViewSet(ABC, viewsets.ModelViewSet):
         self.model_class = None
         self.model_class_name = None
         self.filter_backends = [DjangoFilterBackend, OrderingFilter]
+        self.pagination_class = KeysetPagination
+        # Related data embedded on ?expand=<name>
+        self.expansions: dict[str, Expansion] = {}
+        # Models whose changes invalidate cached responses of this viewset
+        self.cache_dependencies = [Owner, Car]
+        # ETag and Last-Modified headers of the current response
+        self.validator_headers = {}
+        # Rules checked for query parameters of the same name
+        self.query_params_rules: dict[str, list[Rule]] = {}
 
-    @abstractmethod
-    def request_validation(self, request: request_type):
-        pass
+    def request_validation(self, request: request_type) -> response_type:
+        """
+        Checks query parameters against query_params_rules. Called before any
+        queryset is built, so invalid requests do not reach the database.
+        """
+        errors = get_query_params_errors(request.query_params, self.query_params_rules)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
 
     @staticmethod
     @abstractmethod
     def get_swagger_parameters():
         pass
 
+    def get_expansion(self) -> str | None:
+        read_actions = ["list", "retrieve", "unrepaired"]
+        if self.request is None or self.action not in read_actions:
+            return None
+        expansion = self.request.query_params.get("expand")
+        return expansion if expansion in self.expansions else None
+
+    def get_sparse_field_choices(self) -> list[str]:
+        """
+        Returns names of all fields which can be sent, including embedded ones.
+        """
+        serializer_classes = [
+            self.serializer_class,
+            *(expansion.serializer_class for expansion in self.expansions.values()),
+        ]
+        return [
+            *dict.fromkeys(
+                name
+                for serializer_class in serializer_classes
+                for name in serializer_class.Meta.fields
+            )
+        ]
+
+    def get_sparse_fields(self) -> tuple[str, ...] | None:
+        """
+        Returns names of the fields sent for the fields and omit query parameters,
+        in the serializer's order, None when all fields are sent.
+        """
+        read_actions = ["list", "retrieve", "unrepaired"]
+        if self.request is None or self.action not in read_actions:
+            return None
+        fields = self.request.query_params.get("fields")
+        omit = self.request.query_params.get("omit")
+        if fields is None and omit is None:
+            return None
+
+        names = self.get_serializer_class().Meta.fields
+        kept = names if fields is None else fields.split(",")
+        omitted = [] if omit is None else omit.split(",")
+        return tuple(name for name in names if name in kept and name not in omitted)
+
+    def get_sparse_columns(self, queryset: QuerySet) -> list[str] | None:
+        """
+        Returns model fields read for the sent fields, None when all fields are
+        sent. Ordering columns, used by pagination cursors, and relations loaded
+        with select_related are always read.
+        """
+        if (field_names := self.get_sparse_fields()) is None:
+            return None
+
+        serializer_fields = self.get_serializer_class()().fields
+        ordering = self.paginator.get_ordering(self.request, queryset, self)
+        related = queryset.query.select_related
+        columns = dict.fromkeys(
+            [
+                *(serializer_fields[name].source for name in field_names),
+                *(field.lstrip("-") for field in ordering),
+                *(related if isinstance(related, dict) else []),
+                *VALIDATOR_COLUMNS,
+            ]
+        )
+        # Reverse relations, e.g. prefetched cars, need no column of their own
+        model_fields = {field.name for field in queryset.model._meta.concrete_fields}
+        return [column for column in columns if column in model_fields]
+
+    def get_serializer_class(self):
+        if expansion := self.get_expansion():
+            return self.expansions[expansion].serializer_class
+        return super().get_serializer_class()
+
+    def get_serializer(self, *args, **kwargs):
+        if (fields := self.get_sparse_fields()) is not None:
+            kwargs.setdefault("fields", fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self) -> QuerySet:
+        queryset = super().get_queryset()
+        if expansion := self.get_expansion():
+            queryset = self.expansions[expansion].load_related(queryset)
+        # Columns of fields which are not sent are never read
+        if (columns := self.get_sparse_columns(queryset)) is not None:
+            queryset = queryset.only(*columns)
+        return queryset
+
+    def get_validator_querysets(self, queryset: QuerySet) -> list[QuerySet]:
+        """
+        Returns querysets whose max(updated_at) and count of rows validate the
+        response: the queryset itself and embedded related rows. The count makes
+        validators change also when rows are deleted.
+        """
+        querysets = [queryset]
+        if expansion := self.get_expansion():
+            expansion = self.expansions[expansion]
+            keys = queryset.values(expansion.related_key)
+            querysets.append(expansion.related_queryset(keys))
+        return querysets
+
+    def get_validator_columns(self) -> list[str]:
+        """
+        Returns columns read with every listed row for validators of its page.
+        """
+        if expansion := self.get_expansion():
+            return [*VALIDATOR_COLUMNS, self.expansions[expansion].related_key]
+        return VALIDATOR_COLUMNS
+
+    def get_related_validator_querysets(self, rows: list) -> list[QuerySet]:
+        """
+        Returns querysets of related rows embedded in the listed rows, limited to
+        these rows' keys, so no other related row is aggregated.
+        """
+        if not (expansion := self.get_expansion()):
+            return []
+        expansion = self.expansions[expansion]
+        keys = {get_row_value(row, expansion.related_key) for row in rows}
+        return [expansion.related_queryset(keys)]
+
+    def get_validator_headers(self, validators: list[dict]) -> dict[str, str]:
+        """
+        Builds ETag and Last-Modified headers from aggregated validators.
+        Last-Modified is sent for a single object with single related rows only:
+        max(updated_at) of a collection stays the same when a row is deleted, so
+        collections are validated by the ETag, which covers the count of rows.
+        """
+        etag_data = [
+            self.request.get_full_path(),
+            self.request.accepted_renderer.format,
+            validators,
+        ]
+        etag_hash = hashlib.sha256(
+            json.dumps(etag_data, cls=DjangoJSONEncoder).encode()
+        ).hexdigest()
+        headers = {"ETag": quote_etag(etag_hash)}
+
+        if self.action != "retrieve" or any(
+            validator["count"] > 1 for validator in validators
+        ):
+            return headers
+        timestamps = [
+            validator["last_modified"]
+            for validator in validators
+            if validator["last_modified"] is not None
+        ]
+        if timestamps:
+            headers["Last-Modified"] = http_date(max(timestamps).timestamp())
+        return headers
+
+    def not_modified_response(self, queryset: QuerySet) -> HttpResponse | None:
+        """
+        Returns 304 response if the client's copy of queryset's data is current,
+        before any object is loaded or serialized.
+        """
+        validators = [
+            qs.aggregate(**VALIDATOR_AGGREGATES)
+            for qs in self.get_validator_querysets(queryset)
+        ]
+        self.validator_headers = self.get_validator_headers(validators)
+        return get_not_modified_response(self.request, self.validator_headers)
+
+    async def anot_modified_response(self, queryset: QuerySet) -> HttpResponse | None:
+        validators = [
+            await qs.aaggregate(**VALIDATOR_AGGREGATES)
+            for qs in self.get_validator_querysets(queryset)
+        ]
+        self.validator_headers = self.get_validator_headers(validators)
+        return get_not_modified_response(self.request, self.validator_headers)
+
+    def get_page_validators(self, rows: list) -> dict[str, Any]:
+        """
+        Returns validators of a list response read from its rows: their ids and
+        max(updated_at), the page's links and the count when one was asked for.
+        Rows outside the page are never aggregated, so deep pages without a count
+        cost a single query.
+        """
+        timestamps = [get_row_value(row, "updated_at") for row in rows]
+        return {
+            "ids": [get_row_value(row, "id") for row in rows],
+            "last_modified": max(timestamps, default=None),
+            "links": [
+                getattr(self.paginator, "has_next", False),
+                getattr(self.paginator, "has_previous", False),
+            ],
+            "count": getattr(self.paginator, "count", None),
+        }
+
+    def not_modified_list_response(self, rows: list) -> HttpResponse | None:
+        """
+        Returns 304 response if the client's copy of the listed rows is current,
+        before they are serialized.
+        """
+        validators = [self.get_page_validators(rows)]
+        for related_queryset in self.get_related_validator_querysets(rows):
+            validators.append(related_queryset.aggregate(**VALIDATOR_AGGREGATES))
+        self.validator_headers = self.get_validator_headers(validators)
+        return get_not_modified_response(self.request, self.validator_headers)
+
+    async def anot_modified_list_response(self, rows: list) -> HttpResponse | None:
+        validators = [self.get_page_validators(rows)]
+        for related_queryset in self.get_related_validator_querysets(rows):
+            validators.append(await related_queryset.aaggregate(**VALIDATOR_AGGREGATES))
+        self.validator_headers = self.get_validator_headers(validators)
+        return get_not_modified_response(self.request, self.validator_headers)
+
+    def get_values_reader(self) -> ValuesReader | None:
+        return get_values_reader(self.get_serializer_class(), self.get_sparse_fields())
+
+    def get_list_data(
+        self, objects: list, values_reader: ValuesReader | None
+    ) -> list[dict]:
+        with serialization_timer():
+            if values_reader is not None:
+                return values_reader.to_representation(objects)
+            return self.get_serializer(objects, many=True).data
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        # Rendered as JSON or MessagePack, picked by the Accept header
+        patch_vary_headers(response, ["Accept"])
+        if response.status_code == status.HTTP_200_OK:
+            for header, value in self.validator_headers.items():
+                response.headers.setdefault(header, value)
+        return response
+
+    @replica_reads()
+    @cache_response
     def list(self, request: request_type, *args, **kwargs) -> response_type:
+        # Additional request validation
+        if response := self.request_validation(request):
+            return response
+
         queryset = self.filter_queryset(self.get_queryset())
-        page = self.paginate_queryset(queryset)
 
+        # Read-only rows are built from .values() when the serializer allows it
+        values_reader = self.get_values_reader()
+        rows_queryset = queryset
+        if values_reader is not None:
+            rows_queryset = values_reader.get_values(
+                queryset, *self.get_validator_columns()
+            )
+
+        page = self.paginate_queryset(rows_queryset)
+        rows = page if page is not None else list(rows_queryset)
+        if response := self.not_modified_list_response(rows):
+            return response
+
+        if page is not None:
+            # Additional custom response, when no object found
+            if not page:
+                return Response(f"There is no {self.model_class_name} with given data")
+
+            return self.get_paginated_response(self.get_list_data(page, values_reader))
+
+        data = self.get_list_data(rows, values_reader)
+
+        # Additional custom response, when no object found
+        if not data:
+            return Response(f"There is no {self.model_class_name} with given data")
+
+        return Response(data)
+
+    @replica_reads()
+    @cache_response
+    def retrieve(self, request: request_type, *args, **kwargs) -> response_type:
         # Additional request validation
         if response := self.request_validation(request):
             return response
 
-        if page:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (TypeError, ValueError):
+            # Invalid lookup value, the 404 response is left to get_object
+            queryset = None
+        if queryset is not None and (response := self.not_modified_response(queryset)):
+            return response
+
+        instance = self.get_object()
+        with serialization_timer():
+            data = self.get_serializer(instance).data
+        return Response(data)
 
-        serializer = self.get_serializer(queryset, many=True)
+    async def afilter_queryset(self, queryset: QuerySet) -> QuerySet:
+        # Filter forms may query the database, e.g. to validate owner's id
+        return await sync_to_async(self.filter_queryset)(queryset)
+
+    async def alist_queryset(
+        self, queryset: QuerySet, empty_message: bool = True
+    ) -> response_type:
+        """
+        Async variant of the list response of a filtered queryset, reading rows with
+        the async ORM.
+        """
+        values_reader = self.get_values_reader()
+        rows_queryset = queryset
+        if values_reader is not None:
+            rows_queryset = values_reader.get_values(
+                queryset, *self.get_validator_columns()
+            )
+
+        page = await self.paginator.apaginate_queryset(
+            rows_queryset, self.request, self
+        )
+        # Related objects are loaded with the rows, so serializers do not query
+        rows = page if page is not None else [obj async for obj in rows_queryset]
+        if response := await self.anot_modified_list_response(rows):
+            return response
+
+        if page is not None:
+            # Additional custom response, when no object found
+            if not page and empty_message:
+                return Response(f"There is no {self.model_class_name} with given data")
+
+            return self.get_paginated_response(self.get_list_data(page, values_reader))
+
+        data = self.get_list_data(rows, values_reader)
 
         # Additional custom response, when no object found
-        if not serializer.data:
+        if not data and empty_message:
             return Response(f"There is no {self.model_class_name} with given data")
 
-        return Response(serializer.data)
+        return Response(data)
+
+    @cache_response
+    async def alist(self, request: request_type, *args, **kwargs) -> response_type:
+        # Additional request validation
+        if response := self.request_validation(request):
+            return response
+
+        return await self.alist_queryset(
+            await self.afilter_queryset(self.get_queryset())
+        )
+
+    @cache_response
+    async def aretrieve(self, request: request_type, *args, **kwargs) -> response_type:
+        # Additional request validation
+        if response := self.request_validation(request):
+            return response
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = await self.afilter_queryset(self.get_queryset())
+        try:
+            queryset = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (TypeError, ValueError):
+            raise Http404
+        if response := await self.anot_modified_response(queryset):
+            return response
+
+        try:
+            instance = await queryset.aget()
+        except self.model_class.DoesNotExist:
+            raise Http404
+        with serialization_timer():
+            data = self.get_serializer(instance).data
+        return Response(data)
+
+    @action(detail=False, methods=["post", "patch"], name="bulk")
+    def bulk(self, request: request_type, *args, **kwargs) -> response_type:
+        """
+        Endpoint creating (POST) or partially updating (PATCH) a list of objects in
+        one transaction. Objects to update are given by their "id".
+        """
+        if request.method == "PATCH":
+            serializer = self.get_serializer(
+                self.get_queryset(), data=request.data, many=True, partial=True
+            )
+            success_status = status.HTTP_200_OK
+        else:
+            serializer = self.get_serializer(data=request.data, many=True)
+            success_status = status.HTTP_201_CREATED
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            serializer.save()
+            # Bulk writes do not send post_save signals
+            invalidate_model(self.model_class)
+
+        with serialization_timer():
+            data = serializer.data
+        return Response(data, status=success_status)
 
 
 @method_decorator(name="retrieve", decorator=swagger_decorator_owner)
@@ -97,47 +581,45 @@ class OwnerViewSet(BaseViewSet):
         self.queryset = Owner.objects.all()
         self.serializer_class = OwnerSerializer
         self.filterset_class = OwnerFilter
-        self.ordering_fields = ["name", "surname"]
+        self.ordering_fields = ["name", "surname", *Owner.AGGREGATE_FIELDS]
+        self.expansions = {
+            "cars": Expansion(
+                serializer_class=OwnerWithCarsSerializer,
+                load_related=lambda queryset: queryset.prefetch_related(
+                    Prefetch("car_set", queryset=Car.objects.order_by("id"))
+                ),
+                related_key="id",
+                related_queryset=lambda keys: Car.objects.filter(owner__in=keys),
+            ),
+        }
         self.model_class = Owner
         self.model_class_name = self.model_class._meta.object_name
-
-    def request_validation(self, request: request_type) -> response_type:
-        for key, value in request.query_params.items():
-            if key == "phone":
-                if search("[^0-9]", value):
-                    return Response(
-                        {"phone": "Phone number can contain only digits"},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-                elif len(value) > 9:
-                    return Response(
-                        {"phone": "Phone number is too long"},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-                elif len(value) < 9:
-                    return Response(
-                        {"phone": "Phone number is too short"},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-            elif key == "name" or key == "surname":
-                if search("[^A-Z-a-zżźćńółęąśŻŹĆĄŚĘŁÓŃ]", value):
-                    return Response(
-                        {
-                            f"{key}": f"{key} can contain only letters and '-' without "
-                            f"whitespaces"
-                        },
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-            elif key == "ordering":
-                if value not in self.ordering_fields:
-                    ord_fields_string = ", ".join(self.ordering_fields)
-                    return Response(
-                        {
-                            "ordering": f"Ordering should be one of the following: "
-                            f"{ord_fields_string}"
-                        },
-                        status=status.HTTP_400_BAD_REQUEST,
+        self.query_params_rules = {
+            "phone": [
+                forbidden_characters(
+                    PHONE_FORBIDDEN_CHARACTERS, "Phone number can contain only digits"
+                ),
+                exact_length(
+                    PHONE_LENGTH,
+                    too_long="Phone number is too long",
+                    too_short="Phone number is too short",
+                ),
+            ],
+            **{
+                key: [
+                    forbidden_characters(
+                        NAME_FORBIDDEN_CHARACTERS,
+                        f"{key} can contain only letters and '-' without whitespaces",
                     )
+                ]
+                for key in ["name", "surname"]
+            },
+            "expand": [one_of(self.expansions, "Expand")],
+            "ordering": [ordering_of(self.ordering_fields, "Ordering")],
+            "count": [one_of(COUNT_MODES, "Count")],
+            "fields": [names_of(self.get_sparse_field_choices(), "Fields")],
+            "omit": [names_of(self.get_sparse_field_choices(), "Omit")],
+        }
 
     @staticmethod
     def get_swagger_parameters() -> dict[str, list[openapi.Parameter]]:
@@ -146,6 +628,9 @@ class OwnerViewSet(BaseViewSet):
             "name": "Owner's name",
             "surname": "Owner's surname",
             "phone": "Owner's phone number - 9 digits",
+            "expand": "Embed related objects - 'cars'",
+            "fields": "Comma separated fields to send, all by default",
+            "omit": "Comma separated fields not to send",
         }
         manual_parameters_list = []
         for parameter_name, description in swagger_parameters_dict.items():
@@ -183,39 +668,52 @@ class CarViewSet(BaseViewSet):
         self.queryset = Car.objects.all()
         self.serializer_class = CarSerializer
         self.ordering_fields = ["brand", "model", "production_date"]
+        self.export_chunk_size = 2000
+        self.expansions = {
+            "owner": Expansion(
+                serializer_class=CarWithOwnerSerializer,
+                load_related=lambda queryset: queryset.select_related("owner"),
+                related_key="owner_id",
+                related_queryset=lambda keys: Owner.objects.filter(pk__in=keys),
+            ),
+        }
         self.model_class = Car
         self.model_class_name = self.model_class._meta.object_name
+        self.query_params_rules = {
+            "production_date": [
+                date_not_in_future(
+                    "Date should be in YYYY-MM-DD format.",
+                    "Production date cannot be from the future.",
+                )
+            ],
+            "expand": [one_of(self.expansions, "Expand")],
+            "ordering": [ordering_of(self.ordering_fields, "Ordering")],
+            "count": [one_of(COUNT_MODES, "Count")],
+            "include_archived": [one_of(["true", "false"], "Include archived")],
+            "fields": [names_of(self.get_sparse_field_choices(), "Fields")],
+            "omit": [names_of(self.get_sparse_field_choices(), "Omit")],
+        }
+
+    def includes_archived(self) -> bool:
+        """
+        Archived cars are read on request only, by actions looking up history.
+        """
+        return (
+            self.request is not None
+            and self.action in ["list", "retrieve", "export"]
+            and self.request.query_params.get("include_archived") == "true"
+        )
+
+    def get_queryset(self) -> QuerySet:
+        if self.includes_archived():
+            # Same columns as cars, so filters, ordering and serializers still apply
+            self.queryset = CarHistory.objects.all()
+        return super().get_queryset()
 
     @property
     def filterset_class(self) -> Type[CarFilter] | None:
-        if self.action == "list":
-            return CarFilter
-
-    def request_validation(self, request: request_type) -> response_type:
-        for key, value in request.query_params.items():
-            if key == "production_date":
-                production_date_as_date_object = datetime.datetime.strptime(
-                    value, "%Y-%m-%d"
-                ).date()
-
-                if production_date_as_date_object > datetime.date.today():
-                    return Response(
-                        {
-                            "production_date": "Production date cannot be from the "
-                            "future."
-                        },
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-            elif key == "ordering":
-                if value not in self.ordering_fields:
-                    ord_fields_string = ", ".join(self.ordering_fields)
-                    return Response(
-                        {
-                            "ordering": f"Ordering should be one of the following: "
-                            f"{ord_fields_string}"
-                        },
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
+        if self.action in ["list", "export"]:
+            return CarHistoryFilter if self.includes_archived() else CarFilter
 
     @staticmethod
     def get_swagger_parameters() -> dict[str, list[openapi.Parameter]]:
@@ -225,14 +723,20 @@ class CarViewSet(BaseViewSet):
             "model": "Car's model",
             "production_date": "Car's production date in YYYY-MM-DD format",
             "problem_description": "Car's problem description",
+            "search": "Words searched in car's problem description, best matches "
+            "first",
             "repaired": "Car's repair status",
             "owner": "Car owner's unique id number",
+            "expand": "Embed related objects - 'owner'",
+            "include_archived": "Include archived old repaired cars",
+            "fields": "Comma separated fields to send, all by default",
+            "omit": "Comma separated fields not to send",
         }
         manual_parameters_list = []
         for parameter_name, description in swagger_parameters_dict.items():
             if parameter_name in ["id", "owner"]:
                 field_type = openapi.TYPE_INTEGER
-            elif parameter_name == "repaired":
+            elif parameter_name in ["repaired", "include_archived"]:
                 field_type = openapi.TYPE_BOOLEAN
             else:
                 field_type = openapi.TYPE_STRING
@@ -255,6 +759,8 @@ class CarViewSet(BaseViewSet):
         return super().list(request, *args, **kwargs)
 
     @action(detail=False, name="unrepaired")
+    @replica_reads()
+    @cache_response
     def unrepaired(self, request, *args, **kwargs):
         """
         Endpoint listed all unrepaired cars.
@@ -263,7 +769,314 @@ class CarViewSet(BaseViewSet):
         if response := self.request_validation(request):
             return response
 
-        queryset = self.filter_queryset(Car.objects.filter(repaired=False))
-        serializer = self.get_serializer(queryset, many=True)
+        queryset = self.filter_queryset(self.get_queryset().filter(repaired=False))
+
+        values_reader = self.get_values_reader()
+        rows_queryset = queryset
+        if values_reader is not None:
+            rows_queryset = values_reader.get_values(
+                queryset, *self.get_validator_columns()
+            )
+
+        page = self.paginate_queryset(rows_queryset)
+        rows = page if page is not None else list(rows_queryset)
+        if response := self.not_modified_list_response(rows):
+            return response
+
+        if page is not None:
+            return self.get_paginated_response(self.get_list_data(page, values_reader))
+
+        return Response(self.get_list_data(rows, values_reader))
+
+    @cache_response
+    async def aunrepaired(
+        self, request: request_type, *args, **kwargs
+    ) -> response_type:
+        # Additional request validation
+        if response := self.request_validation(request):
+            return response
+
+        queryset = await self.afilter_queryset(
+            self.get_queryset().filter(repaired=False)
+        )
+        return await self.alist_queryset(queryset, empty_message=False)
+
+    @swagger_auto_schema(
+        manual_parameters=get_swagger_parameters()["manual_parameters"]
+        + [
+            openapi.Parameter(
+                "output",
+                in_=openapi.IN_QUERY,
+                description="Export file format",
+                type=openapi.TYPE_STRING,
+                enum=[*EXPORT_FORMATS],
+                default="csv",
+            )
+        ]
+    )
+    @action(detail=False, name="export")
+    def export(self, request: request_type, *args, **kwargs) -> StreamingHttpResponse:
+        """
+        Endpoint streaming all cars matching given filters as CSV or NDJSON.
+        """
+        # Additional request validation
+        if response := self.request_validation(request):
+            return response
+
+        export_format = request.query_params.get("output", "csv")
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {
+                    "output": f"Output should be one of the following: "
+                    f"{', '.join(EXPORT_FORMATS)}"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if not queryset.query.order_by:
+            queryset = queryset.order_by("id")
+
+        # Rows come in chunks from a server-side cursor, so memory stays flat
+        fields = self.serializer_class.Meta.fields
+        rows = queryset.values_list(*fields).iterator(chunk_size=self.export_chunk_size)
+        stream, content_type = EXPORT_FORMATS[export_format]
+
+        response = StreamingHttpResponse(
+            stream(fields, rows), content_type=content_type
+        )
+        response["Content-Disposition"] = f'attachment; filename="cars.{export_format}"'
+        return response
+
+    @swagger_auto_schema(
+        request_body=CarTransitionSerializer,
+        responses={status.HTTP_200_OK: CarSerializer(many=True)},
+    )
+    @action(detail=False, methods=["post"], name="transition")
+    def transition(self, request: request_type, *args, **kwargs) -> response_type:
+        """
+        Endpoint setting repaired and/or total cost of many cars, given by ids or
+        by a filter, with one UPDATE in a transaction. Returns the changed cars.
+        """
+        serializer = CarTransitionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        values = serializer.get_values(serializer.validated_data)
+
+        if "ids" in serializer.validated_data:
+            ids = set(serializer.validated_data["ids"])
+            queryset = self.get_queryset().filter(id__in=ids)
+        else:
+            ids = None
+            filterset = CarFilter(
+                data=serializer.validated_data["filter"], queryset=self.get_queryset()
+            )
+            if errors := self.get_filter_errors(filterset):
+                return Response({"filter": errors}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = filterset.qs
+
+        values_reader = get_values_reader(self.serializer_class)
+        sources = [source for _, source, _ in values_reader.fields]
+        columns = dict.fromkeys(["id", *sources, *STATISTICS_FIELDS])
+        with transaction.atomic():
+            # Old values are read under lock, so statistics move by exact deltas
+            old_rows = [
+                *queryset.select_for_update()
+                .order_by("id")
+                .values(*columns)[: MAX_TRANSITION_CARS + 1]
+            ]
+            if ids is not None and len(old_rows) < len(ids):
+                missing = sorted(ids - {row["id"] for row in old_rows})
+                return Response(
+                    {"ids": f"Cars do not exist: {', '.join(map(str, missing))}"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if len(old_rows) > MAX_TRANSITION_CARS:
+                return Response(
+                    {
+                        "filter": f"Filter matches more than {MAX_TRANSITION_CARS} "
+                        f"cars, narrow it down."
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            new_rows = [{**row, **values} for row in old_rows]
+            if old_rows:
+                Car.objects.filter(id__in=[row["id"] for row in old_rows]).update(
+                    **values, updated_at=Now()
+                )
+                # Updates do not send post_save signals
+                update_car_statistics(removed=old_rows, added=new_rows)
+                invalidate_model(self.model_class)
+
+        return Response(self.get_list_data(new_rows, values_reader))
+
+    def get_filter_errors(self, filterset: CarFilter) -> dict | str:
+        """
+        Checks filters given in a request body like car list query parameters.
+        Unknown filters are rejected, so a typo never selects all cars.
+        """
+        if unknown := sorted(set(filterset.data) - set(filterset.filters)):
+            return f"Unknown filters: {', '.join(unknown)}"
+        if errors := get_query_params_errors(filterset.data, self.query_params_rules):
+            return errors
+        if not filterset.is_valid():
+            return filterset.errors
+        return {}
+
+
+@api_view(["GET"])
+def response_cache_stats(request: request_type) -> response_type:
+    """
+    Endpoint showing response cache hits and misses of the current worker process.
+    """
+    requests_number = cache_stats["hits"] + cache_stats["misses"]
+    return Response(
+        {
+            "hits": cache_stats["hits"],
+            "misses": cache_stats["misses"],
+            "hit_ratio": (
+                cache_stats["hits"] / requests_number if requests_number else 0
+            ),
+        }
+    )
+
+
+@require_safe
+def metrics(request: HttpRequest) -> HttpResponse:
+    """
+    Serves request metrics of the current worker process in the Prometheus text
+    format.
+    """
+    return HttpResponse(
+        render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def staff_only(view: Callable) -> Callable:
+    """
+    Answers 403 to anyone but logged in staff users.
+    """
+
+    @functools.wraps(view)
+    def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        if not request.user.is_staff:
+            return JsonResponse(
+                {"detail": "Only staff users can access profiles."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+@require_safe
+@staff_only
+def profiles(request: HttpRequest) -> HttpResponse:
+    """
+    Lists stored request profiles of the current worker process, newest first.
+    """
+    return JsonResponse(load_profiles(), safe=False)
+
+
+@require_safe
+@staff_only
+def profile_detail(request: HttpRequest, profile_id: uuid.UUID) -> HttpResponse:
+    """
+    Serves a profile's summary: the slowest functions, queries and their plans.
+    """
+    path = get_profile_path(profile_id, ".json")
+    if not path.exists():
+        raise Http404
+    return HttpResponse(path.read_bytes(), content_type="application/json")
+
+
+@require_safe
+@staff_only
+def profile_stats(request: HttpRequest, profile_id: uuid.UUID) -> HttpResponse:
+    """
+    Serves a profile's raw cProfile stats, readable with pstats or snakeviz.
+    """
+    path = get_profile_path(profile_id, ".pstats")
+    if not path.exists():
+        raise Http404
+    return FileResponse(
+        path.open("rb"), as_attachment=True, filename=f"{profile_id}.pstats"
+    )
+
+
+def get_statistics_data(statistics: CarStatistics) -> dict[str, int | float]:
+    return {
+        "cars": statistics.cars_count,
+        "repaired": statistics.repaired_count,
+        "unrepaired": statistics.cars_count - statistics.repaired_count,
+        "revenue": round(statistics.revenue, 2),
+    }
+
+
+@swagger_auto_schema(
+    method="get",
+    manual_parameters=[
+        openapi.Parameter(
+            "owners",
+            in_=openapi.IN_QUERY,
+            description="Number of owners with most cars to show, 10 by default",
+            type=openapi.TYPE_INTEGER,
+        )
+    ],
+)
+@api_view(["GET"])
+@replica_reads()
+def workshop_statistics(request: request_type) -> response_type:
+    """
+    Endpoint showing revenue and repaired/unrepaired cars in total, per brand and
+    for owners with most cars. Counters are read from the summary table, which is
+    updated on every car change, so no car is scanned.
+    """
+    owners_number = request.query_params.get("owners", "10")
+    if not owners_number.isdigit() or int(owners_number) > MAX_STATISTICS_OWNERS:
+        return Response(
+            {"owners": f"Owners should be a number from 0 to {MAX_STATISTICS_OWNERS}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    total = CarStatistics(dimension=CarStatistics.TOTAL)
+    brands = []
+    for statistics in CarStatistics.objects.filter(
+        dimension__in=[CarStatistics.TOTAL, CarStatistics.BRAND], cars_count__gt=0
+    ).order_by("-cars_count", "key"):
+        if statistics.dimension == CarStatistics.TOTAL:
+            total = statistics
+        else:
+            brands.append({"brand": statistics.key, **get_statistics_data(statistics)})
+
+    owners = CarStatistics.objects.filter(
+        dimension=CarStatistics.OWNER, cars_count__gt=0
+    ).order_by("-cars_count", "key")[: int(owners_number)]
+
+    return Response(
+        {
+            **get_statistics_data(total),
+            "brands": brands,
+            "owners": [
+                {"owner": int(statistics.key), **get_statistics_data(statistics)}
+                for statistics in owners
+            ],
+        }
+    )
+
 
-        return Response(serializer.data)
+@require_safe
+def openapi_schema(request: HttpRequest, schema_format: str) -> HttpResponse:
+    """
+    Serves the OpenAPI schema prebuilt by the generate_openapi_schema command from
+    memory, with validators and cache headers letting clients reuse their copy.
+    """
+    content, etag = load_schema(schema_format)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        _, content_type = SCHEMA_FORMATS[schema_format]
+        response = HttpResponse(content, content_type=content_type)
+    response["ETag"] = etag
+    patch_cache_control(response, public=True, max_age=OPENAPI_SCHEMA_MAX_AGE)
+    return response
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 
 
@@ -25,6 +26,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "application",
     "rest_framework",
     "drf_yasg",
@@ -32,11 +34,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the whole request
+    "application.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    # After authentication, only staff users can ask for profiles
+    "application.profiling.ProfilingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -73,6 +79,47 @@ DATABASES = {
     }
 }
 
+# Optional read replica for list, retrieve and reporting reads, see DATABASE_ROUTERS
+if os.getenv("POSTGRES_REPLICA_HOST") or os.getenv("POSTGRES_REPLICA_NAME"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": os.getenv("POSTGRES_REPLICA_NAME", DATABASES["default"]["NAME"]),
+        "HOST": os.getenv("POSTGRES_REPLICA_HOST", DATABASES["default"]["HOST"]),
+        "PORT": os.getenv("POSTGRES_REPLICA_PORT", DATABASES["default"]["PORT"]),
+        # Tests read the rows written to the test database of primary
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["application.db_routers.ReplicaRouter"]
+# Seconds after a write during which cached responses are built from primary
+REPLICA_MAX_LAG = float(os.getenv("POSTGRES_REPLICA_MAX_LAG", "5"))
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Serialized list/retrieve responses, least recently used entries are culled
+    "api_responses": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "api-responses",
+        "TIMEOUT": 600,
+        "OPTIONS": {"MAX_ENTRIES": 2000, "CULL_FREQUENCY": 10},
+    },
+    # Per-model data versions, shared by all workers so none serves stale entries
+    "api_versions": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv(
+            "API_CACHE_VERSIONS_DIR",
+            os.path.join(tempfile.gettempdir(), "car_owners_api_versions"),
+        ),
+        "TIMEOUT": None,
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -120,3 +167,27 @@ SECURE_SSL_REDIRECT = False
 
 # Manage static files while DEBUG=False
 STATIC_ROOT = os.path.join(BASE_DIR, "static")
+
+# OpenAPI schema prebuilt with the generate_openapi_schema command
+OPENAPI_SCHEMA_DIR = BASE_DIR / "openapi"
+# Request profiles taken by the profiling middleware
+PROFILES_DIR = os.getenv(
+    "PROFILES_DIR", os.path.join(tempfile.gettempdir(), "car_owners_profiles")
+)
+SWAGGER_SETTINGS = {
+    "SPEC_URL": "openapi-json",
+}
+REST_FRAMEWORK = {
+    # orjson by default, MessagePack on Accept: application/msgpack
+    "DEFAULT_RENDERER_CLASSES": [
+        "application.renderers.ORJSONRenderer",
+        "application.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "application.renderers.ORJSONParser",
+        "application.renderers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
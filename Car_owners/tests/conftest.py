@@ -1,9 +1,16 @@
 import datetime
 import pytest
+from django.core.cache import caches
 from rest_framework.test import APIClient
 from application.models import Owner, Car
 
 
+@pytest.fixture(autouse=True)
+def clear_response_cache() -> None:
+    # Test transactions are rolled back without signals, keep responses from leaking
+    caches["api_responses"].clear()
+
+
 @pytest.fixture
 def valid_owner_data() -> Owner:
     owner_data = {"name": "Andrzej", "surname": "Starczyk", "phone": "123456789"}
@@ -0,0 +1,172 @@
+import datetime
+import io
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from application.models import Car, ArchivedCar, CarStatistics
+from tests.test_statistics import get_aggregates, get_statistics
+
+
+@pytest.fixture
+def old_repaired_cars(valid_car_serializer_data: dict) -> list[Car]:
+    cars = [
+        Car.objects.create(
+            **{**valid_car_serializer_data, "brand": brand, "repaired": True}
+        )
+        for brand in ["Ford", "Skoda", "Opel"]
+    ]
+    # queryset.update() keeps the given updated_at
+    Car.objects.filter(pk__in=[car.pk for car in cars]).update(
+        updated_at=timezone.now() - datetime.timedelta(days=400)
+    )
+    return cars
+
+
+def archive(*args: str) -> str:
+    stdout = io.StringIO()
+    call_command("archive_repaired_cars", *args, stdout=stdout)
+    return stdout.getvalue()
+
+
+class TestsArchiveRepairedCars:
+    @pytest.mark.django_db
+    def test_old_repaired_cars_archived(
+        self,
+        valid_car_model_data: Car,
+        valid_car_serializer_data: dict,
+        old_repaired_cars: list[Car],
+    ) -> None:
+        recent_repaired_car = Car.objects.create(
+            **{**valid_car_serializer_data, "repaired": True}
+        )
+        statistics = get_statistics()
+        aggregates = get_aggregates(valid_car_model_data.owner)
+        output = archive("--batch-size=2")
+
+        assert "Archived 3 repaired cars" in output
+        assert "2 cars archived" in output
+        assert set(Car.objects.values_list("id", flat=True)) == {
+            valid_car_model_data.id,
+            recent_repaired_car.id,
+        }
+        archived_cars = ArchivedCar.objects.order_by("id")
+        assert [car.id for car in archived_cars] == [
+            car.id for car in old_repaired_cars
+        ]
+        assert archived_cars[0].updated_at < timezone.now() - datetime.timedelta(
+            days=365
+        )
+        # Archived cars still count
+        assert get_statistics() == statistics
+        assert get_aggregates(valid_car_model_data.owner) == aggregates
+
+    @pytest.mark.django_db
+    def test_nothing_to_archive(self, valid_car_model_data: Car) -> None:
+        assert "Archived 0 repaired cars" in archive("--older-than-days=0")
+        assert Car.objects.count() == 1
+
+    @pytest.mark.django_db
+    def test_rebuilt_counters_include_archived_cars(
+        self, valid_car_model_data: Car, old_repaired_cars: list[Car]
+    ) -> None:
+        archive()
+        statistics = get_statistics()
+        CarStatistics.objects.all().delete()
+        call_command("rebuild_car_statistics", stdout=io.StringIO())
+        stdout = io.StringIO()
+        call_command("reconcile_owner_aggregates", stdout=stdout)
+
+        assert get_statistics() == statistics
+        assert "Fixed aggregates of 0 owners" in stdout.getvalue()
+
+    @pytest.mark.django_db
+    def test_owner_deletion_removes_archived_cars(
+        self, valid_car_model_data: Car, old_repaired_cars: list[Car]
+    ) -> None:
+        archive()
+        valid_car_model_data.owner.delete()
+
+        assert not ArchivedCar.objects.exists()
+        assert get_statistics() == {}
+
+
+class TestsIncludeArchived:
+    @pytest.mark.django_db
+    def test_list_includes_archived_on_request(
+        self,
+        api_client: APIClient,
+        valid_car_model_data: Car,
+        old_repaired_cars: list[Car],
+    ) -> None:
+        archive()
+        response_live = api_client.get("/app/cars/", format="json")
+        response_all = api_client.get(
+            "/app/cars/",
+            data={"include_archived": "true", "ordering": "brand"},
+            format="json",
+        )
+        response_filtered = api_client.get(
+            "/app/cars/",
+            data={"include_archived": "true", "brand": "skoda"},
+            format="json",
+        )
+
+        assert [car["id"] for car in response_live.data["results"]] == [
+            valid_car_model_data.id
+        ]
+        assert [car["brand"] for car in response_all.data["results"]] == [
+            "Ford",
+            "Ford",
+            "Opel",
+            "Skoda",
+        ]
+        assert [car["id"] for car in response_filtered.data["results"]] == [
+            old_repaired_cars[1].id
+        ]
+
+    @pytest.mark.django_db
+    def test_retrieve_archived_car(
+        self, api_client: APIClient, old_repaired_cars: list[Car]
+    ) -> None:
+        archive()
+        car_id = old_repaired_cars[0].id
+        response_live = api_client.get(f"/app/cars/{car_id}/", format="json")
+        response_archived = api_client.get(
+            f"/app/cars/{car_id}/",
+            data={"include_archived": "true", "expand": "owner"},
+            format="json",
+        )
+        response_async = api_client.get(
+            f"/app/async/cars/{car_id}/", data={"include_archived": "true"}
+        )
+
+        assert response_live.status_code == status.HTTP_404_NOT_FOUND
+        assert response_archived.status_code == status.HTTP_200_OK
+        assert response_archived.data["brand"] == "Ford"
+        assert response_archived.data["owner_details"]["name"] == "Andrzej"
+        assert response_async.status_code == status.HTTP_200_OK
+        assert response_async.json()["id"] == car_id
+
+    @pytest.mark.django_db
+    def test_export_includes_archived(
+        self, api_client: APIClient, old_repaired_cars: list[Car]
+    ) -> None:
+        archive()
+        response_export = api_client.get(
+            "/app/cars/export/", data={"include_archived": "true", "output": "ndjson"}
+        )
+
+        assert len(b"".join(response_export.streaming_content).splitlines()) == 3
+
+    @pytest.mark.django_db
+    def test_invalid_include_archived(self, api_client: APIClient) -> None:
+        response_get_cars = api_client.get(
+            "/app/cars/", data={"include_archived": "yes"}, format="json"
+        )
+
+        assert response_get_cars.status_code == status.HTTP_400_BAD_REQUEST
+        assert response_get_cars.data["include_archived"] == (
+            "Include archived should be one of the following: true, false"
+        )
@@ -0,0 +1,146 @@
+import io
+import pytest
+from django.core.management import CommandError, call_command
+from django.test import Client
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.test import APIClient
+from application.models import Car
+from application.views import CarViewSet
+
+
+class TestsAsyncViews:
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "owners/",
+            "owners/?expand=cars",
+            "cars/?brand=ford&ordering=model",
+            "cars/?expand=owner&page_size=1",
+            "cars/?page_size=1&count=exact",
+            "cars/unrepaired/",
+        ],
+    )
+    @pytest.mark.django_db
+    def test_list_same_as_sync_views(
+        self,
+        api_client: APIClient,
+        valid_car_model_data: Car,
+        valid_new_car_view_data: dict[str, str | int],
+        path: str,
+    ) -> None:
+        api_client.post("/app/cars/", data=valid_new_car_view_data, format="json")
+        response_sync = api_client.get(f"/app/{path}", HTTP_ACCEPT="application/json")
+        response_async = api_client.get(f"/app/async/{path}")
+
+        assert response_async.status_code == status.HTTP_200_OK
+        assert response_async["Content-Type"] == "application/json"
+        # Links of the paginated response differ by the /async prefix only
+        assert response_async.content.replace(b"/async", b"") == response_sync.content
+
+    @pytest.mark.django_db
+    def test_retrieve(self, api_client: APIClient, valid_car_model_data: Car) -> None:
+        car_id = valid_car_model_data.id
+        response_sync = api_client.get(
+            f"/app/cars/{car_id}/", data={"expand": "owner"}, format="json"
+        )
+        response_async = api_client.get(
+            f"/app/async/cars/{car_id}/", data={"expand": "owner"}
+        )
+
+        assert response_async.status_code == status.HTTP_200_OK
+        assert response_async.json() == response_sync.json()
+
+    @pytest.mark.parametrize("car_id", ["0", "abc"])
+    @pytest.mark.django_db
+    def test_retrieve_not_found(self, api_client: APIClient, car_id: str) -> None:
+        response_async = api_client.get(f"/app/async/cars/{car_id}/")
+
+        assert response_async.status_code == status.HTTP_404_NOT_FOUND
+        assert response_async.json() == {"detail": "Not found."}
+
+    @pytest.mark.django_db
+    def test_invalid_query_params(self, api_client: APIClient) -> None:
+        response_async = api_client.get(
+            "/app/async/owners/", data={"phone": "12a456789"}
+        )
+
+        assert response_async.status_code == status.HTTP_400_BAD_REQUEST
+        assert response_async.json() == {
+            "phone": "Phone number can contain only digits"
+        }
+
+    @pytest.mark.django_db
+    def test_not_modified(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        response_async = api_client.get("/app/async/cars/unrepaired/")
+        response_not_modified = api_client.get(
+            "/app/async/cars/unrepaired/", HTTP_IF_NONE_MATCH=response_async["ETag"]
+        )
+
+        assert response_not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+    @pytest.mark.django_db
+    def test_repeated_list_served_from_cache(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        response_miss = api_client.get("/app/async/cars/")
+        response_hit = api_client.get("/app/async/cars/")
+        response_not_modified = api_client.get(
+            "/app/async/cars/", HTTP_IF_NONE_MATCH=response_miss["ETag"]
+        )
+
+        assert response_miss["X-Cache"] == "MISS"
+        assert response_hit["X-Cache"] == "HIT"
+        assert response_hit.content == response_miss.content
+        assert response_hit["ETag"] == response_miss["ETag"]
+        assert response_not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+    @pytest.mark.django_db
+    def test_permissions_checked(
+        self, api_client: APIClient, valid_car_model_data: Car, monkeypatch
+    ) -> None:
+        monkeypatch.setattr(CarViewSet, "permission_classes", [IsAdminUser])
+        response_sync = api_client.get("/app/cars/", HTTP_ACCEPT="application/json")
+        response_async = api_client.get("/app/async/cars/")
+
+        assert response_async.status_code == status.HTTP_403_FORBIDDEN
+        assert response_async.json() == response_sync.json()
+
+    @pytest.mark.django_db
+    def test_authenticated_user(
+        self, admin_client: Client, valid_car_model_data: Car, monkeypatch
+    ) -> None:
+        monkeypatch.setattr(CarViewSet, "permission_classes", [IsAdminUser])
+        response_async = admin_client.get(f"/app/async/cars/{valid_car_model_data.id}/")
+
+        assert response_async.status_code == status.HTTP_200_OK
+
+
+class TestsBenchmarkAsyncViews:
+    @pytest.mark.django_db(transaction=True)
+    def test_benchmark_reports_both_servers(self, live_server) -> None:
+        # The live server is WSGI, async views run there through async_to_sync
+        stdout = io.StringIO()
+        call_command(
+            "benchmark_async_views",
+            wsgi_url=live_server.url,
+            asgi_url=live_server.url,
+            requests=10,
+            concurrency=2,
+            stdout=stdout,
+        )
+
+        assert [line.split()[0] for line in stdout.getvalue().splitlines()] == [
+            "WSGI",
+            "ASGI",
+        ]
+
+    def test_benchmark_unreachable_server(self) -> None:
+        with pytest.raises(CommandError, match="WSGI server is not reachable"):
+            call_command(
+                "benchmark_async_views",
+                wsgi_url="http://localhost:1",
+                stdout=io.StringIO(),
+            )
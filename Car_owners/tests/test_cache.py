@@ -0,0 +1,143 @@
+import pytest
+from django.db import transaction
+from rest_framework import status
+from rest_framework.test import APIClient
+from application import cache, db_routers
+from application.cache import cache_stats
+from application.db_routers import ReplicaRouter
+from application.models import Owner, Car
+
+
+class TestsResponseCache:
+    @pytest.mark.django_db
+    def test_repeated_list_served_from_cache(
+        self,
+        api_client: APIClient,
+        valid_car_model_data: Car,
+        django_assert_num_queries,
+    ) -> None:
+        response_miss = api_client.get("/app/cars/", data={"brand": "ford"})
+        with django_assert_num_queries(0):
+            response_hit = api_client.get("/app/cars/", data={"brand": "ford"})
+
+        assert response_miss["X-Cache"] == "MISS"
+        assert response_hit["X-Cache"] == "HIT"
+        assert response_hit.data == response_miss.data
+
+    @pytest.mark.django_db
+    def test_query_params_are_normalized(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        api_client.get("/app/cars/?brand=ford&model=focus")
+        response_same_params = api_client.get("/app/cars/?model=focus&brand=ford")
+        response_other_params = api_client.get("/app/cars/?brand=skoda")
+
+        assert response_same_params["X-Cache"] == "HIT"
+        assert response_other_params["X-Cache"] == "MISS"
+
+    @pytest.mark.django_db
+    def test_update_invalidates_list_and_retrieve(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        car_id = valid_car_model_data.id
+        api_client.get("/app/cars/")
+        api_client.get(f"/app/cars/{car_id}/")
+        api_client.patch(f"/app/cars/{car_id}/", data={"model": "Kuga"}, format="json")
+        response_get_cars = api_client.get("/app/cars/")
+        response_get_car = api_client.get(f"/app/cars/{car_id}/")
+
+        assert response_get_cars["X-Cache"] == "MISS"
+        assert response_get_cars.data["results"][0]["model"] == "Kuga"
+        assert response_get_car["X-Cache"] == "MISS"
+        assert response_get_car.data["model"] == "Kuga"
+
+    @pytest.mark.django_db
+    def test_related_model_change_invalidates(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        owner_id = valid_car_model_data.owner_id
+        api_client.get(f"/app/owners/{owner_id}/", data={"expand": "cars"})
+        valid_car_model_data.delete()
+        response_get_owner = api_client.get(
+            f"/app/owners/{owner_id}/", data={"expand": "cars"}
+        )
+
+        assert response_get_owner["X-Cache"] == "MISS"
+        assert response_get_owner.data["cars"] == []
+
+    @pytest.mark.django_db
+    def test_version_bumped_again_on_commit(
+        self,
+        api_client: APIClient,
+        valid_owner_model_data: Owner,
+        django_capture_on_commit_callbacks,
+    ) -> None:
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                valid_owner_model_data.name = "Adam"
+                valid_owner_model_data.save()
+                # Response cached from data read before the commit
+                api_client.get("/app/owners/")
+
+        response_get_owners = api_client.get("/app/owners/")
+        assert response_get_owners["X-Cache"] == "MISS"
+
+    @pytest.mark.django_db
+    def test_bulk_create_invalidates(
+        self,
+        api_client: APIClient,
+        valid_car_view_data: dict[str, str | int],
+        django_capture_on_commit_callbacks,
+    ) -> None:
+        api_client.get("/app/cars/")
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post(
+                "/app/cars/bulk/", data=[valid_car_view_data], format="json"
+            )
+        response_get_cars = api_client.get("/app/cars/")
+
+        assert response_get_cars["X-Cache"] == "MISS"
+        assert len(response_get_cars.data["results"]) == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_cached_responses_read_from_primary_after_write(
+        self,
+        api_client: APIClient,
+        valid_owner_model_data: Owner,
+        monkeypatch: pytest.MonkeyPatch,
+        settings,
+    ) -> None:
+        monkeypatch.setattr(cache, "replica_configured", lambda: True)
+        monkeypatch.setattr(db_routers, "replica_configured", lambda: True)
+        read_databases = []
+        db_for_read = ReplicaRouter.db_for_read
+
+        def record_db_for_read(router: ReplicaRouter, model, **hints) -> str:
+            # Test databases have no replica, reads are only recorded
+            read_databases.append(db_for_read(router, model, **hints))
+            return "default"
+
+        monkeypatch.setattr(ReplicaRouter, "db_for_read", record_db_for_read)
+        settings.REPLICA_MAX_LAG = 60
+        valid_owner_model_data.save()
+        api_client.get("/app/owners/")
+        read_after_write = read_databases.copy()
+        settings.REPLICA_MAX_LAG = 0
+        read_databases.clear()
+        api_client.get("/app/owners/", data={"page_size": 1})
+
+        assert set(read_after_write) == {"default"}
+        assert set(read_databases) == {"replica"}
+
+    @pytest.mark.django_db
+    def test_cache_stats(
+        self, api_client: APIClient, valid_owner_model_data: Owner
+    ) -> None:
+        hits, misses = cache_stats["hits"], cache_stats["misses"]
+        api_client.get("/app/owners/")
+        api_client.get("/app/owners/")
+        response_stats = api_client.get("/app/cache-stats/")
+
+        assert response_stats.status_code == status.HTTP_200_OK
+        assert response_stats.data["hits"] == hits + 1
+        assert response_stats.data["misses"] == misses + 1
@@ -0,0 +1,244 @@
+import datetime
+import io
+import json
+from pathlib import Path
+import pytest
+from django.core.management import CommandError, call_command
+from application.models import Owner, Car, CarStatistics
+
+
+@pytest.fixture
+def workshop_rows() -> list[dict[str, str]]:
+    return [
+        {
+            "name": "Andrzej",
+            "surname": "Nowak",
+            "phone": "123456789",
+            "brand": "Ford",
+            "model": "Focus",
+            "production_date": "2020-05-01",
+            "problem_description": "Weak breaks",
+            "repaired": "true",
+            "total_cost": "290.5",
+        },
+        {
+            "name": "Tadeusz",
+            "surname": "Madej",
+            "phone": "789456789",
+            "brand": "Skoda",
+            "model": "Superb",
+            "production_date": "2021-01-20",
+            "problem_description": "",
+            "repaired": "false",
+            "total_cost": "0",
+        },
+        {
+            "name": "Tadeusz",
+            "surname": "Madej",
+            "phone": "789456789",
+            "brand": "Skoda",
+            "model": "Octavia",
+            "production_date": "2019-03-10",
+            "problem_description": "Engine start problem",
+            "repaired": "false",
+            "total_cost": "100",
+        },
+        {
+            "name": "Jan2",
+            "surname": "Kowalski",
+            "phone": "111222333",
+            "brand": "Fiat",
+            "model": "Panda",
+            "production_date": "2019-03-10",
+            "problem_description": "",
+            "repaired": "false",
+            "total_cost": "0",
+        },
+    ]
+
+
+def write_csv(path: Path, rows: list[dict[str, str]]) -> Path:
+    lines = [",".join(rows[0])] + [",".join(row.values()) for row in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+class TestsImportWorkshopData:
+    @pytest.mark.django_db
+    def test_import_csv(
+        self,
+        tmp_path: Path,
+        workshop_rows: list[dict[str, str]],
+        valid_owner_model_data: Owner,
+    ) -> None:
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command(
+            "import_workshop_data",
+            write_csv(tmp_path / "workshop.csv", workshop_rows),
+            batch_size=2,
+            stdout=stdout,
+            stderr=stderr,
+        )
+        valid_owner_model_data.refresh_from_db()
+
+        # Existing owner with the same phone is updated, not duplicated
+        assert valid_owner_model_data.surname == "Nowak"
+        assert Owner.objects.count() == 2
+        assert Car.objects.filter(owner__phone="789456789").count() == 2
+        assert Car.objects.get(model="Focus").repaired is True
+        assert Car.objects.get(model="Superb").problem_description == ""
+        assert "Row 4 rejected" in stderr.getvalue()
+        assert "Imported 3 of 4 rows" in stdout.getvalue()
+        assert "rows/s" in stdout.getvalue()
+        # Bulk inserts are added to the car statistics
+        assert CarStatistics.objects.get(dimension="total").cars_count == 3
+
+    @pytest.mark.django_db
+    def test_import_new_owner(
+        self, tmp_path: Path, workshop_rows: list[dict[str, str]]
+    ) -> None:
+        call_command(
+            "import_workshop_data",
+            write_csv(tmp_path / "workshop.csv", workshop_rows[1:3]),
+            stdout=io.StringIO(),
+        )
+        owner = Owner.objects.get(phone="789456789")
+
+        assert (owner.cars_count, owner.open_jobs_count, owner.lifetime_spend) == (
+            2,
+            2,
+            100,
+        )
+
+    @pytest.mark.django_db
+    def test_import_ndjson(
+        self, tmp_path: Path, workshop_rows: list[dict[str, str]]
+    ) -> None:
+        path = tmp_path / "workshop.ndjson"
+        path.write_text("\n".join(json.dumps(row) for row in workshop_rows[:2]))
+        call_command("import_workshop_data", path, stdout=io.StringIO())
+
+        assert Car.objects.get(model="Focus").production_date == datetime.date(
+            2020, 5, 1
+        )
+        assert Car.objects.get(model="Superb").total_cost == 0
+
+    @pytest.mark.django_db
+    def test_import_rejects_future_production_date(
+        self, tmp_path: Path, workshop_rows: list[dict[str, str]]
+    ) -> None:
+        future_date = datetime.date.today() + datetime.timedelta(days=1)
+        rows = [{**workshop_rows[0], "production_date": future_date.isoformat()}]
+        stderr = io.StringIO()
+        call_command(
+            "import_workshop_data",
+            write_csv(tmp_path / "workshop.csv", rows),
+            stdout=io.StringIO(),
+            stderr=stderr,
+        )
+
+        assert not Car.objects.exists()
+        assert "Production date cannot be from the future." in stderr.getvalue()
+
+
+class TestsGenerateWorkshopData:
+    @pytest.mark.django_db
+    def test_generate_skewed_dataset(self) -> None:
+        stdout = io.StringIO()
+        call_command(
+            "generate_workshop_data",
+            owners=50,
+            cars=1000,
+            batch_size=300,
+            stdout=stdout,
+        )
+        brands = CarStatistics.objects.filter(dimension="brand").order_by("-cars_count")
+
+        assert Owner.objects.count() == 50
+        assert CarStatistics.objects.get(dimension="total").cars_count == 1000
+        assert brands[0].cars_count > 3 * brands.last().cars_count
+        assert not Car.objects.filter(production_date__gt=datetime.date.today())
+        assert "Generated 50 owners and 1000 cars" in stdout.getvalue()
+
+    @pytest.mark.django_db
+    def test_same_seed_updates_same_owners(self) -> None:
+        for _ in range(2):
+            call_command(
+                "generate_workshop_data", owners=10, cars=10, stdout=io.StringIO()
+            )
+
+        assert Owner.objects.count() == 10
+        assert Car.objects.count() == 20
+
+
+class TestsBenchmarkApi:
+    @pytest.mark.django_db
+    def test_benchmark_writes_results(self, tmp_path: Path) -> None:
+        call_command(
+            "generate_workshop_data", owners=10, cars=100, stdout=io.StringIO()
+        )
+        stdout = io.StringIO()
+        call_command(
+            "benchmark_api",
+            requests=3,
+            output=tmp_path / "first.json",
+            stdout=io.StringIO(),
+        )
+        call_command(
+            "benchmark_api",
+            requests=3,
+            output=tmp_path / "second.json",
+            baseline=tmp_path / "first.json",
+            stdout=stdout,
+        )
+        results = json.loads((tmp_path / "second.json").read_text())
+
+        assert results["dataset"] == {"owners": 10, "cars": 100}
+        assert set(results["endpoints"]) == {
+            "owners_filtered",
+            "cars_filtered",
+            "cars_ordered",
+            "cars_unrepaired",
+            "owner_retrieve",
+            "car_retrieve",
+            "car_create",
+        }
+        assert results["endpoints"]["cars_unrepaired"]["rows"] > 0
+        assert results["endpoints"]["car_create"]["errors"] == 0
+        assert "vs baseline" in stdout.getvalue()
+        # Created cars are removed after the run
+        assert Car.objects.count() == 100
+
+    @pytest.mark.django_db
+    def test_benchmark_without_data(self, tmp_path: Path) -> None:
+        with pytest.raises(CommandError, match="No cars to benchmark"):
+            call_command("benchmark_api", output=tmp_path / "results.json")
+
+
+class TestsBenchmarkRenderers:
+    @pytest.mark.django_db
+    def test_benchmark_writes_results(self, tmp_path: Path) -> None:
+        call_command(
+            "generate_workshop_data", owners=10, cars=100, stdout=io.StringIO()
+        )
+        stdout = io.StringIO()
+        call_command(
+            "benchmark_renderers",
+            rows=50,
+            rounds=2,
+            output=tmp_path / "results.json",
+            stdout=stdout,
+        )
+        results = json.loads((tmp_path / "results.json").read_text())
+        sizes = {name: codec["bytes"] for name, codec in results["codecs"].items()}
+
+        assert results["rows"] == 50
+        assert set(sizes) == {"json", "orjson", "msgpack"}
+        assert sizes["orjson"] == sizes["json"]
+        assert sizes["msgpack"] < sizes["json"]
+        assert "vs json" in stdout.getvalue()
+
+    @pytest.mark.django_db
+    def test_benchmark_without_data(self, tmp_path: Path) -> None:
+        with pytest.raises(CommandError, match="No cars to render"):
+            call_command("benchmark_renderers", output=tmp_path / "results.json")
@@ -0,0 +1,139 @@
+import pytest
+from django.core.cache import caches
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APIClient
+from application.cache import RESPONSE_CACHE_ALIAS
+from application.models import Owner, Car
+from application.serializers import CarSerializer
+
+
+def fail_serialization(*args, **kwargs) -> None:
+    raise AssertionError("Serializer should not run for a 304 response")
+
+
+class TestsConditionalGet:
+    @pytest.mark.django_db
+    def test_if_none_match_returns_304_before_serialization(
+        self,
+        api_client: APIClient,
+        valid_car_model_data: Car,
+        django_assert_num_queries,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        response_get_cars = api_client.get("/app/cars/unrepaired/")
+        caches[RESPONSE_CACHE_ALIAS].clear()
+        monkeypatch.setattr(CarSerializer, "to_representation", fail_serialization)
+        # Validators are computed with a single aggregate query
+        with django_assert_num_queries(1):
+            response_not_modified = api_client.get(
+                "/app/cars/unrepaired/",
+                HTTP_IF_NONE_MATCH=response_get_cars["ETag"],
+            )
+
+        assert response_get_cars.status_code == status.HTTP_200_OK
+        assert response_not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response_not_modified["ETag"] == response_get_cars["ETag"]
+        assert not response_not_modified.content
+
+    @pytest.mark.django_db
+    def test_cached_response_returns_304_without_queries(
+        self,
+        api_client: APIClient,
+        valid_car_model_data: Car,
+        django_assert_num_queries,
+    ) -> None:
+        response_get_cars = api_client.get("/app/cars/")
+        with django_assert_num_queries(0):
+            response_not_modified = api_client.get(
+                "/app/cars/", HTTP_IF_NONE_MATCH=response_get_cars["ETag"]
+            )
+
+        assert response_not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+    @pytest.mark.django_db
+    def test_if_modified_since_returns_304(
+        self, api_client: APIClient, valid_owner_model_data: Owner
+    ) -> None:
+        owner_id = valid_owner_model_data.id
+        response_get_owner = api_client.get(f"/app/owners/{owner_id}/")
+        response_not_modified = api_client.get(
+            f"/app/owners/{owner_id}/",
+            HTTP_IF_MODIFIED_SINCE=response_get_owner["Last-Modified"],
+        )
+
+        assert response_get_owner.status_code == status.HTTP_200_OK
+        assert response_not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+    @pytest.mark.django_db
+    def test_changed_data_returns_200(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        response_get_cars = api_client.get("/app/cars/unrepaired/")
+        valid_car_model_data.model = "Kuga"
+        valid_car_model_data.save()
+        response_get_updated_cars = api_client.get(
+            "/app/cars/unrepaired/", HTTP_IF_NONE_MATCH=response_get_cars["ETag"]
+        )
+
+        assert response_get_updated_cars.status_code == status.HTTP_200_OK
+        assert response_get_updated_cars["ETag"] != response_get_cars["ETag"]
+        assert response_get_updated_cars.data["results"][0]["model"] == "Kuga"
+
+    @pytest.mark.django_db
+    def test_deleted_object_changes_etag(
+        self,
+        api_client: APIClient,
+        valid_car_model_data: Car,
+        valid_car_serializer_data: dict,
+    ) -> None:
+        Car.objects.create(**valid_car_serializer_data)
+        response_get_cars = api_client.get("/app/cars/")
+        # Deletion does not change max(updated_at) of the remaining cars
+        Car.objects.filter(pk=valid_car_model_data.pk).delete()
+        caches[RESPONSE_CACHE_ALIAS].clear()
+        response_get_remaining_cars = api_client.get(
+            "/app/cars/", HTTP_IF_NONE_MATCH=response_get_cars["ETag"]
+        )
+
+        assert response_get_remaining_cars.status_code == status.HTTP_200_OK
+
+    @pytest.mark.django_db
+    def test_deleted_object_not_hidden_by_if_modified_since(
+        self,
+        api_client: APIClient,
+        valid_car_model_data: Car,
+        valid_car_serializer_data: dict,
+    ) -> None:
+        newer_car = Car.objects.create(**valid_car_serializer_data)
+        response_get_cars = api_client.get("/app/cars/unrepaired/")
+        Car.objects.filter(pk=valid_car_model_data.pk).delete()
+        # The client's copy is as new as the remaining car
+        response_get_remaining_cars = api_client.get(
+            "/app/cars/unrepaired/",
+            HTTP_IF_MODIFIED_SINCE=http_date(newer_car.updated_at.timestamp() + 1),
+        )
+
+        # Collections are validated by the ETag only
+        assert "Last-Modified" not in response_get_cars
+        assert response_get_remaining_cars.status_code == status.HTTP_200_OK
+        assert len(response_get_remaining_cars.data["results"]) == 1
+
+    @pytest.mark.django_db
+    def test_expanded_related_change_returns_200(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        owner_id = valid_car_model_data.owner_id
+        url = f"/app/owners/{owner_id}/"
+        response_get_owner = api_client.get(url, data={"expand": "cars"})
+        response_get_owner_without_cars = api_client.get(url)
+        valid_car_model_data.model = "Kuga"
+        valid_car_model_data.save()
+        caches[RESPONSE_CACHE_ALIAS].clear()
+        response_get_updated_owner = api_client.get(
+            url, data={"expand": "cars"}, HTTP_IF_NONE_MATCH=response_get_owner["ETag"]
+        )
+
+        assert response_get_owner["ETag"] != response_get_owner_without_cars["ETag"]
+        assert response_get_updated_owner.status_code == status.HTTP_200_OK
+        assert response_get_updated_owner.data["cars"][0]["model"] == "Kuga"
@@ -0,0 +1,87 @@
+import pytest
+from django.conf import settings
+from django.db import connections
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+from application import db_routers
+from application.db_routers import ReplicaRouter, replica_reads
+from application.models import Owner, Car
+
+
+@pytest.fixture
+def replica(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(db_routers, "replica_configured", lambda: True)
+
+
+class TestsReplicaRouter:
+    def test_reads_go_to_primary_without_replica(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(db_routers, "replica_configured", lambda: False)
+        with replica_reads():
+            assert Car.objects.all().db == "default"
+
+    def test_reads_go_to_replica_only_inside_block(self, replica: None) -> None:
+        assert Car.objects.all().db == "default"
+        with replica_reads():
+            assert Car.objects.all().db == "replica"
+            assert Owner.objects.all().db == "replica"
+        assert Car.objects.all().db == "default"
+
+    def test_reads_after_write_stick_to_primary(self, replica: None) -> None:
+        with replica_reads():
+            assert ReplicaRouter().db_for_write(Car) == "default"
+            assert Car.objects.all().db == "default"
+
+        # Pinning ends with the block, e.g. the next request
+        with replica_reads():
+            assert Car.objects.all().db == "replica"
+
+    def test_migrations_only_on_primary(self) -> None:
+        assert ReplicaRouter().allow_migrate("default", "application")
+        assert not ReplicaRouter().allow_migrate("replica", "application")
+
+    @pytest.mark.django_db
+    def test_reads_inside_transaction_go_to_primary(self, replica: None) -> None:
+        # Test transaction is open on primary
+        with replica_reads():
+            assert Car.objects.all().db == "default"
+
+
+@pytest.mark.skipif(
+    "replica" not in settings.DATABASES,
+    reason="Set POSTGRES_REPLICA_NAME to test with a second database",
+)
+class TestsReplicaDatabase:
+    # The replica mirrors the test database of primary, so where the data was read
+    # from shows in queries of each connection. The test client resets them at
+    # the start of every request.
+    @pytest.mark.django_db(transaction=True, databases=["default", "replica"])
+    # Rows of the fixtures were just written, which would pin reads to primary
+    @override_settings(REPLICA_MAX_LAG=0)
+    def test_list_and_retrieve_read_from_replica(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        for path in ["/app/cars/", f"/app/cars/{valid_car_model_data.id}/"]:
+            with CaptureQueriesContext(
+                connections["default"]
+            ) as primary_context, CaptureQueriesContext(
+                connections["replica"]
+            ) as replica_context:
+                response = api_client.get(path, format="json")
+
+            assert response.status_code == 200
+            assert replica_context.captured_queries
+            assert not primary_context.captured_queries
+
+    @pytest.mark.django_db(transaction=True, databases=["default", "replica"])
+    def test_writes_go_to_primary(
+        self, api_client: APIClient, valid_new_car_view_data: dict[str, str | int]
+    ) -> None:
+        with CaptureQueriesContext(connections["replica"]) as replica_context:
+            response_post = api_client.post(
+                "/app/cars/", data=valid_new_car_view_data, format="json"
+            )
+
+        assert Car.objects.filter(id=response_post.data["id"]).exists()
+        assert not replica_context.captured_queries
@@ -0,0 +1,123 @@
+import re
+import pytest
+from django.db import connection
+from django.db.models import QuerySet
+from application.models import Owner, Car
+from application.pagination import KeysetPagination
+from application.views import OwnerFilter, CarFilter
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != "postgresql",
+    reason="Expression and partial index plans are checked on Postgres only",
+)
+
+
+def explain_without_seqscan(queryset: QuerySet) -> str:
+    # Tiny test tables are always cheaper to scan, so make the planner show whether
+    # an index can serve the query at all.
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    return queryset.explain()
+
+
+# Indexes Django created for the unique phone and the owner foreign key
+OWNER_PHONE_INDEXES = {
+    "application_owner_phone_key",
+    "application_owner_phone_a3bc4cb7_like",
+}
+CAR_OWNER_INDEXES = {"car_owner_repaired_idx", "application_car_owner_id_b8fed2a2"}
+
+
+def assert_uses_index(plan: str, index_names: set[str]) -> None:
+    assert any(re.search(rf"\b{name}\b", plan) for name in index_names), plan
+
+
+@pytest.mark.parametrize(
+    ("filter_data", "ordering", "index_names"),
+    [
+        ({"name": "andrzej"}, None, {"owner_name_upper_idx"}),
+        ({"surname": "starczyk"}, None, {"owner_surname_upper_idx"}),
+        (
+            {"name": "andrzej", "surname": "starczyk"},
+            None,
+            {"owner_name_upper_idx", "owner_surname_upper_idx"},
+        ),
+        ({"phone": "123456789"}, None, OWNER_PHONE_INDEXES),
+        ({}, "name", {"owner_name_id_idx"}),
+        ({}, "surname", {"owner_surname_id_idx"}),
+    ],
+)
+@pytest.mark.django_db
+def test_owner_filter_uses_index(
+    valid_owner_model_data: Owner,
+    filter_data: dict[str, str],
+    ordering: str | None,
+    index_names: set[str],
+) -> None:
+    owner_filter = OwnerFilter(filter_data, queryset=Owner.objects.all())
+    assert owner_filter.is_valid()
+    queryset = owner_filter.qs
+    if ordering:
+        queryset = queryset.order_by(ordering, "id")
+
+    assert_uses_index(explain_without_seqscan(queryset), index_names)
+
+
+@pytest.mark.parametrize(
+    ("filter_data", "ordering", "index_names"),
+    [
+        ({"brand": "ford"}, None, {"car_brand_upper_idx"}),
+        ({"model": "focus"}, None, {"car_model_upper_idx"}),
+        (
+            {"brand": "ford", "model": "focus"},
+            None,
+            {"car_brand_upper_idx", "car_model_upper_idx"},
+        ),
+        ({"production_date": "2023-01-01"}, None, {"car_production_date_id_idx"}),
+        ({"problem_description": "breaks"}, None, {"car_problem_trgm_idx"}),
+        ({"search": "weak breaks"}, None, {"car_problem_trgm_idx"}),
+        ({"repaired": "false"}, None, {"car_unrepaired_idx"}),
+        ({"owner": None}, None, CAR_OWNER_INDEXES),
+        ({"owner": None, "repaired": "true"}, None, {"car_owner_repaired_idx"}),
+        ({}, "brand", {"car_brand_id_idx"}),
+        ({}, "model", {"car_model_id_idx"}),
+        ({}, "production_date", {"car_production_date_id_idx"}),
+    ],
+)
+@pytest.mark.django_db
+def test_car_filter_uses_index(
+    valid_car_model_data: Car,
+    filter_data: dict[str, str],
+    ordering: str | None,
+    index_names: set[str],
+) -> None:
+    if "owner" in filter_data:
+        filter_data = {**filter_data, "owner": str(valid_car_model_data.owner_id)}
+    car_filter = CarFilter(filter_data, queryset=Car.objects.all())
+    assert car_filter.is_valid()
+    queryset = car_filter.qs
+    if ordering:
+        queryset = queryset.order_by(ordering, "id")
+
+    assert_uses_index(explain_without_seqscan(queryset), index_names)
+
+
+@pytest.mark.django_db
+def test_unrepaired_uses_partial_index(valid_car_model_data: Car) -> None:
+    queryset = Car.objects.filter(repaired=False).order_by("id")
+
+    assert_uses_index(explain_without_seqscan(queryset), {"car_unrepaired_idx"})
+
+
+@pytest.mark.parametrize("ordering", [("brand", "id"), ("-brand", "-id")])
+@pytest.mark.django_db
+def test_keyset_page_starts_index_scan_at_cursor(
+    valid_car_model_data: Car, ordering: tuple[str, str]
+) -> None:
+    keyset_filter = KeysetPagination.get_keyset_filter(ordering, ["Ford", 10])
+    queryset = Car.objects.filter(keyset_filter).order_by(*ordering)
+
+    plan = explain_without_seqscan(queryset)
+    assert_uses_index(plan, {"car_brand_id_idx"})
+    assert "Index Cond" in plan
+    assert "'Ford'" in plan
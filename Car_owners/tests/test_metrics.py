@@ -0,0 +1,127 @@
+import io
+import re
+from pathlib import Path
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.management import call_command
+from django.http import HttpRequest, HttpResponse
+from django.test import Client, RequestFactory
+from application.metrics import Histogram, MetricsMiddleware, render_metrics
+from application.models import Car
+
+
+def get_metric(name: str, route: str, method: str = "GET") -> float:
+    pattern = rf'^{name}{{route="{route}",method="{method}"}} (\S+)$'
+    match = re.search(pattern, render_metrics(), re.MULTILINE)
+    return float(match.group(1)) if match else 0
+
+
+class TestsMetricsMiddleware:
+    @pytest.mark.django_db
+    def test_server_timing_header(
+        self,
+        admin_client: Client,
+        valid_car_model_data: Car,
+        django_assert_num_queries,
+    ) -> None:
+        # The session, the user and the cars page
+        with django_assert_num_queries(3):
+            response_get_cars = admin_client.get("/app/cars/")
+
+        timings = dict(
+            re.findall(r"(\w+);dur=([\d.]+)", response_get_cars["Server-Timing"])
+        )
+        assert set(timings) == {"total", "db", "serialization"}
+        assert float(timings["total"]) >= float(timings["db"]) > 0
+        assert float(timings["serialization"]) > 0
+        assert 'desc="3 queries"' in response_get_cars["Server-Timing"]
+
+    @pytest.mark.django_db
+    def test_server_timing_only_for_staff(
+        self, client: Client, django_user_model, valid_car_model_data: Car
+    ) -> None:
+        user = django_user_model.objects.create_user(username="user", password="x")
+        response_anonymous = client.get("/app/cars/")
+        client.force_login(user)
+        response_user = client.get("/app/cars/")
+
+        assert "Server-Timing" not in response_anonymous
+        assert "Server-Timing" not in response_user
+
+    @pytest.mark.django_db
+    def test_requests_aggregated_per_route(
+        self, client: Client, valid_car_model_data: Car
+    ) -> None:
+        requests_count = get_metric("http_request_duration_seconds_count", "car-list")
+        queries_sum = get_metric("http_request_db_queries_sum", "car-list")
+        for _ in range(2):
+            client.get("/app/cars/")
+        client.get(f"/app/cars/{valid_car_model_data.id}/")
+        response_get_metrics = client.get("/app/metrics/")
+
+        assert response_get_metrics.status_code == 200
+        assert response_get_metrics["Content-Type"].startswith("text/plain")
+        assert get_metric("http_request_duration_seconds_count", "car-list") == (
+            requests_count + 2
+        )
+        # The second response comes from the response cache
+        assert get_metric("http_request_db_queries_sum", "car-list") == (
+            queries_sum + 1
+        )
+        assert get_metric("http_request_duration_seconds_count", "car-detail") >= 1
+
+    @pytest.mark.django_db
+    def test_async_request(self, admin_user, valid_car_model_data: Car) -> None:
+        async def get_response(request: HttpRequest) -> HttpResponse:
+            return HttpResponse(await Car.objects.acount())
+
+        middleware = MetricsMiddleware(get_response)
+        request = RequestFactory().get("/app/cars/")
+        request.user = admin_user
+        response = async_to_sync(middleware)(request)
+
+        assert iscoroutinefunction(middleware)
+        assert response.content == b"1"
+        assert 'desc="1 queries"' in response["Server-Timing"]
+
+    def test_unmatched_route(self, client: Client) -> None:
+        requests_count = get_metric("http_request_duration_seconds_count", "unmatched")
+        client.get("/missing/")
+
+        assert get_metric("http_request_duration_seconds_count", "unmatched") == (
+            requests_count + 1
+        )
+
+
+class TestsHistogram:
+    def test_cumulative_buckets(self) -> None:
+        histogram = Histogram("test_seconds", "Test.", (0.1, 1))
+        for value in [0.05, 0.1, 0.5, 3]:
+            histogram.observe(("car-list", "GET"), value)
+
+        assert histogram.render() == [
+            "# HELP test_seconds Test.",
+            "# TYPE test_seconds histogram",
+            'test_seconds_bucket{route="car-list",method="GET",le="0.1"} 2',
+            'test_seconds_bucket{route="car-list",method="GET",le="1"} 3',
+            'test_seconds_bucket{route="car-list",method="GET",le="+Inf"} 4',
+            'test_seconds_sum{route="car-list",method="GET"} 3.65',
+            'test_seconds_count{route="car-list",method="GET"} 4',
+        ]
+
+
+class TestsBenchmarkMetricsOverhead:
+    @pytest.mark.django_db
+    def test_benchmark_without_metrics(
+        self, tmp_path: Path, valid_car_model_data: Car
+    ) -> None:
+        call_command(
+            "benchmark_api",
+            requests=2,
+            scenarios=["car_retrieve"],
+            without_metrics=True,
+            output=tmp_path / "results.json",
+            stdout=io.StringIO(),
+        )
+
+        assert '"metrics": false' in (tmp_path / "results.json").read_text()
@@ -0,0 +1,74 @@
+import io
+from pathlib import Path
+import pytest
+from django.core.management import CommandError, call_command
+from django.test import Client
+from pytest_django.fixtures import SettingsWrapper
+from application import openapi
+from application.checks import check_openapi_schema
+
+
+@pytest.fixture
+def fresh_schema_cache() -> None:
+    openapi.load_schema.cache_clear()
+    yield
+    openapi.load_schema.cache_clear()
+
+
+class TestsOpenAPISchema:
+    def test_prebuilt_schema_is_up_to_date(self) -> None:
+        # Fails when API changes are not followed by generate_openapi_schema
+        call_command("generate_openapi_schema", check=True, stdout=io.StringIO())
+
+    @pytest.mark.parametrize("schema_format", ["json", "yaml"])
+    def test_schema_served_from_prebuilt_file(
+        self,
+        client: Client,
+        fresh_schema_cache: None,
+        monkeypatch: pytest.MonkeyPatch,
+        schema_format: str,
+    ) -> None:
+        def fail_generation(*args, **kwargs) -> None:
+            raise AssertionError("Schema should not be generated on requests")
+
+        monkeypatch.setattr(openapi, "generate_schema", fail_generation)
+        response_get_schema = client.get(f"/openapi.{schema_format}")
+
+        assert response_get_schema.status_code == 200
+        assert response_get_schema.content == (
+            openapi.get_schema_path(schema_format).read_bytes()
+        )
+        assert response_get_schema["Cache-Control"] == "public, max-age=3600"
+        assert response_get_schema["ETag"]
+
+    def test_unchanged_schema_returns_304(
+        self, client: Client, fresh_schema_cache: None
+    ) -> None:
+        response_get_schema = client.get("/openapi.json")
+        response_not_modified = client.get(
+            "/openapi.json", HTTP_IF_NONE_MATCH=response_get_schema["ETag"]
+        )
+
+        assert response_not_modified.status_code == 304
+        assert response_not_modified["ETag"] == response_get_schema["ETag"]
+
+    def test_stale_schema_is_flagged(
+        self, settings: SettingsWrapper, tmp_path: Path
+    ) -> None:
+        settings.OPENAPI_SCHEMA_DIR = tmp_path
+        (tmp_path / "schema.json").write_text('{"swagger": "2.0"}')
+
+        with pytest.raises(CommandError, match="OpenAPI schema is stale"):
+            call_command("generate_openapi_schema", check=True, stdout=io.StringIO())
+        assert [warning.id for warning in check_openapi_schema(None)] == [
+            "application.W001",
+            "application.W001",
+        ]
+
+    def test_generate_schema_files(
+        self, settings: SettingsWrapper, tmp_path: Path
+    ) -> None:
+        settings.OPENAPI_SCHEMA_DIR = tmp_path / "openapi"
+        call_command("generate_openapi_schema", stdout=io.StringIO())
+
+        assert openapi.get_stale_schema_paths() == []
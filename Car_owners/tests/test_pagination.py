@@ -0,0 +1,243 @@
+import base64
+import datetime
+from urllib.parse import urlencode
+import pytest
+from django.db import connection
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from application import pagination
+from application.models import Owner, Car
+
+
+@pytest.fixture
+def same_brand_cars(valid_owner_model_data: Owner) -> list[Car]:
+    cars = [
+        Car.objects.create(
+            brand="Ford",
+            model=model,
+            production_date=datetime.date(2020, 1, 1),
+            repaired=index % 2 == 0,
+            owner=valid_owner_model_data,
+        )
+        for index, model in enumerate(["Focus", "Mondeo", "Fiesta", "Kuga", "Puma"])
+    ]
+    return cars
+
+
+def collect_pages(
+    api_client: APIClient, url: str, data: dict[str, str | int], direction: str
+) -> list[dict]:
+    pages = []
+    response = api_client.get(url, data=data, format="json")
+    while True:
+        assert response.status_code == status.HTTP_200_OK
+        pages.append(response.data)
+        if not response.data[direction]:
+            return pages
+        response = api_client.get(response.data[direction], format="json")
+
+
+class TestsKeysetPagination:
+    @pytest.mark.parametrize("ordering", ["brand", "model", "production_date"])
+    @pytest.mark.django_db
+    def test_pages_cover_all_cars_once(
+        self, api_client: APIClient, same_brand_cars: list[Car], ordering: str
+    ) -> None:
+        pages = collect_pages(
+            api_client, "/app/cars/", {"ordering": ordering, "page_size": 2}, "next"
+        )
+        ids = [car["id"] for page in pages for car in page["results"]]
+        expected = sorted(
+            same_brand_cars, key=lambda car: (getattr(car, ordering), car.id)
+        )
+
+        assert len(pages) == 3
+        assert ids == [car.id for car in expected]
+
+    @pytest.mark.django_db
+    def test_previous_link_walks_back(
+        self, api_client: APIClient, same_brand_cars: list[Car]
+    ) -> None:
+        last_page = collect_pages(
+            api_client, "/app/cars/", {"ordering": "brand", "page_size": 2}, "next"
+        )[-1]
+        response = api_client.get(last_page["previous"], format="json")
+        pages = [response.data] + collect_pages(
+            api_client, response.data["previous"], {}, "previous"
+        )
+        ids = [car["id"] for page in reversed(pages) for car in page["results"]]
+
+        assert last_page["next"] is None
+        assert ids == [car.id for car in same_brand_cars[:4]]
+
+    @pytest.mark.django_db
+    def test_owners_ordering(
+        self, api_client: APIClient, valid_owner_model_data: Owner
+    ) -> None:
+        Owner.objects.create(name="Adam", surname="Zawada", phone="111222333")
+        Owner.objects.create(name="Zenon", surname="Adamczyk", phone="444555666")
+        pages = collect_pages(
+            api_client, "/app/owners/", {"ordering": "surname", "page_size": 1}, "next"
+        )
+        surnames = [owner["surname"] for page in pages for owner in page["results"]]
+
+        assert surnames == ["Adamczyk", "Starczyk", "Zawada"]
+
+    @pytest.mark.django_db
+    def test_unrepaired_is_paginated(
+        self, api_client: APIClient, same_brand_cars: list[Car]
+    ) -> None:
+        pages = collect_pages(
+            api_client, "/app/cars/unrepaired/", {"page_size": 1}, "next"
+        )
+        ids = [car["id"] for page in pages for car in page["results"]]
+
+        assert ids == [car.id for car in same_brand_cars if not car.repaired]
+
+    @pytest.mark.django_db
+    def test_cursor_of_other_ordering(
+        self, api_client: APIClient, same_brand_cars: list[Car]
+    ) -> None:
+        response_first_page = api_client.get(
+            "/app/cars/", data={"ordering": "brand", "page_size": 2}, format="json"
+        )
+        next_link = response_first_page.data["next"].replace(
+            "ordering=brand", "ordering=production_date"
+        )
+        response = api_client.get(next_link, format="json")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.django_db
+    def test_cursor_with_invalid_value(self, api_client: APIClient) -> None:
+        cursor = base64.b64encode(urlencode({"p": '["x"]'}).encode()).decode()
+        response = api_client.get("/app/cars/", data={"cursor": cursor}, format="json")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.django_db
+    def test_invalid_cursor(self, api_client: APIClient) -> None:
+        response = api_client.get(
+            "/app/cars/", data={"cursor": "not-a-cursor"}, format="json"
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestsPaginationCount:
+    @pytest.mark.django_db
+    def test_no_count_by_default(
+        self, api_client: APIClient, same_brand_cars: list[Car]
+    ) -> None:
+        response = api_client.get("/app/cars/", data={"page_size": 2}, format="json")
+
+        assert "count" not in response.data
+        assert response.data["next"] is not None
+
+    @pytest.mark.django_db
+    def test_page_without_count_reads_page_only(
+        self,
+        api_client: APIClient,
+        same_brand_cars: list[Car],
+        django_assert_num_queries,
+    ) -> None:
+        response_first_page = api_client.get(
+            "/app/cars/", data={"page_size": 2}, format="json"
+        )
+        # Validators come from the page's rows, no other row is aggregated
+        with django_assert_num_queries(1) as context:
+            response = api_client.get(response_first_page.data["next"], format="json")
+        page_sql = context.captured_queries[0]["sql"]
+        response_not_modified = api_client.get(
+            response_first_page.data["next"], HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+
+        assert "COUNT" not in page_sql.upper()
+        assert "LIMIT 3" in page_sql
+        assert response_not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+    @pytest.mark.django_db
+    def test_exact_count(
+        self,
+        api_client: APIClient,
+        same_brand_cars: list[Car],
+        django_assert_num_queries,
+    ) -> None:
+        with django_assert_num_queries(2):
+            response = api_client.get(
+                "/app/cars/unrepaired/",
+                data={"page_size": 1, "count": "exact"},
+                format="json",
+            )
+
+        assert response.data["count"] == 2
+        assert response.data["count_estimated"] is False
+        assert len(response.data["results"]) == 1
+
+    @pytest.mark.django_db
+    def test_estimated_count_through_api(
+        self,
+        api_client: APIClient,
+        same_brand_cars: list[Car],
+        monkeypatch,
+        django_assert_num_queries,
+    ) -> None:
+        monkeypatch.setattr(pagination, "get_estimated_count", lambda queryset: 50_000)
+        # Only the page is read, rows are not counted
+        with django_assert_num_queries(1):
+            response = api_client.get(
+                "/app/cars/unrepaired/",
+                data={"page_size": 1, "count": "estimated"},
+                format="json",
+            )
+
+        assert response.data["count"] == 50_000
+        assert response.data["count_estimated"] is True
+        assert len(response.data["results"]) == 1
+
+    @pytest.mark.django_db
+    def test_invalid_count_mode(self, api_client: APIClient) -> None:
+        response = api_client.get("/app/cars/", data={"count": "all"}, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "count" in response.data
+
+    @pytest.mark.parametrize(
+        "estimate, expected_count, estimated",
+        [(None, 5, False), (50, 5, False), (50_000, 50_000, True)],
+        ids=["no estimate", "small estimate", "large estimate"],
+    )
+    @pytest.mark.django_db
+    def test_estimated_count(
+        self,
+        same_brand_cars: list[Car],
+        monkeypatch,
+        estimate: int | None,
+        expected_count: int,
+        estimated: bool,
+    ) -> None:
+        monkeypatch.setattr(
+            pagination, "get_estimated_count", lambda queryset: estimate
+        )
+        paginator = pagination.KeysetPagination()
+        request = Request(APIRequestFactory().get("/app/cars/", {"count": "estimated"}))
+
+        assert paginator.get_count(Car.objects.all(), request) == expected_count
+        assert paginator.count_estimated is estimated
+
+    @pytest.mark.skipif(
+        connection.vendor != "postgresql", reason="Planner estimates need Postgres"
+    )
+    @pytest.mark.django_db
+    def test_planner_estimate(self, same_brand_cars: list[Car]) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Car._meta.db_table}")
+
+        assert pagination.get_estimated_count(Car.objects.all()) == 5
+        assert pagination.get_estimated_count(Car.objects.filter(brand="Ford")) > 0
+
+    @pytest.mark.skipif(
+        connection.vendor == "postgresql", reason="Postgres has planner estimates"
+    )
+    def test_no_estimate_on_other_databases(self) -> None:
+        assert pagination.get_estimated_count(Car.objects.all()) is None
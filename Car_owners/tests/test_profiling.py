@@ -0,0 +1,181 @@
+import json
+import pstats
+import uuid
+from pathlib import Path
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.cache import caches
+from django.http import HttpRequest, HttpResponse
+from django.test import Client, RequestFactory
+from application import profiling
+from application.models import Car
+
+
+@pytest.fixture(autouse=True)
+def profiles_dir(settings, tmp_path: Path) -> Path:
+    settings.PROFILES_DIR = tmp_path
+    # Hourly profile counters
+    caches["default"].clear()
+    return tmp_path
+
+
+class TestsProfilingMiddleware:
+    @pytest.mark.django_db
+    def test_staff_request_profiled(
+        self, admin_client: Client, valid_car_model_data: Car, profiles_dir: Path
+    ) -> None:
+        response_get_cars = admin_client.get(
+            "/app/cars/?brand=ford", HTTP_X_PROFILE="1"
+        )
+
+        assert response_get_cars.status_code == 200
+        assert len(response_get_cars.json()["results"]) == 1
+        profile_id = response_get_cars["X-Profile-Id"]
+        assert (profiles_dir / f"{profile_id}.pstats").exists()
+        summary = admin_client.get(f"/app/profiles/{profile_id}/").json()
+        assert summary["path"] == "/app/cars/?brand=ford"
+        assert summary["status"] == 200
+        assert summary["queries"] >= 1
+        assert summary["duration_ms"] >= summary["db_ms"] > 0
+        assert "application_car" in summary["slowest_queries"][0]["sql"]
+        assert all(query["explain"] for query in summary["slowest_queries"])
+        assert "list" in summary["functions"]
+
+    @pytest.mark.django_db
+    def test_query_flag(self, admin_client: Client, valid_car_model_data: Car) -> None:
+        response_get_cars = admin_client.get("/app/cars/?profile=1")
+
+        assert response_get_cars.status_code == 200
+        assert "X-Profile-Id" in response_get_cars
+
+    @pytest.mark.django_db
+    def test_response_cache_bypassed(
+        self, admin_client: Client, valid_car_model_data: Car
+    ) -> None:
+        admin_client.get("/app/cars/", HTTP_X_PROFILE="1")
+        admin_client.get("/app/cars/")
+        response_get_cars = admin_client.get("/app/cars/", HTTP_X_PROFILE="1")
+        summary = admin_client.get(
+            f"/app/profiles/{response_get_cars['X-Profile-Id']}/"
+        ).json()
+
+        assert "X-Cache" not in response_get_cars
+        assert "application_car" in summary["slowest_queries"][0]["sql"]
+
+    @pytest.mark.parametrize(
+        "headers", [{}, {"HTTP_X_PROFILE": "0"}], ids=["no flag", "flag off"]
+    )
+    @pytest.mark.django_db
+    def test_not_requested(self, admin_client: Client, headers: dict) -> None:
+        response_get_cars = admin_client.get("/app/cars/", **headers)
+
+        assert response_get_cars.status_code == 200
+        assert "X-Profile-Id" not in response_get_cars
+
+    @pytest.mark.django_db
+    def test_non_staff_not_profiled(
+        self, client: Client, django_user_model, profiles_dir: Path
+    ) -> None:
+        user = django_user_model.objects.create_user("mechanic", password="secret")
+        client.force_login(user)
+        response_get_cars = client.get("/app/cars/?profile=1", HTTP_X_PROFILE="1")
+
+        assert response_get_cars.status_code == 200
+        assert "X-Profile-Id" not in response_get_cars
+        assert not [*profiles_dir.iterdir()]
+
+    @pytest.mark.django_db
+    def test_hourly_limit(self, admin_client: Client, monkeypatch) -> None:
+        monkeypatch.setattr(profiling, "MAX_PROFILES_PER_HOUR", 2)
+        responses = [
+            admin_client.get("/app/cars/", HTTP_X_PROFILE="1") for _ in range(3)
+        ]
+
+        assert ["X-Profile-Id" in response for response in responses] == [
+            True,
+            True,
+            False,
+        ]
+        assert all(response.status_code == 200 for response in responses)
+
+    @pytest.mark.django_db
+    def test_one_profile_at_a_time(self, admin_client: Client) -> None:
+        with profiling.profiling_lock:
+            response_get_cars = admin_client.get("/app/cars/", HTTP_X_PROFILE="1")
+
+        assert response_get_cars.status_code == 200
+        assert "X-Profile-Id" not in response_get_cars
+
+    @pytest.mark.django_db
+    def test_async_request_profiled(
+        self, admin_user, valid_car_model_data: Car, profiles_dir: Path
+    ) -> None:
+        async def get_response(request: HttpRequest) -> HttpResponse:
+            return HttpResponse(await Car.objects.acount())
+
+        middleware = profiling.ProfilingMiddleware(get_response)
+        request = RequestFactory().get("/app/cars/", HTTP_X_PROFILE="1")
+        request.user = admin_user
+        response = async_to_sync(middleware)(request)
+
+        assert iscoroutinefunction(middleware)
+        profile_id = response["X-Profile-Id"]
+        summary = json.loads((profiles_dir / f"{profile_id}.json").read_text())
+        assert summary["queries"] == 1
+        assert "COUNT" in summary["slowest_queries"][0]["sql"]
+
+    @pytest.mark.django_db
+    def test_old_profiles_removed(
+        self, admin_client: Client, monkeypatch, profiles_dir: Path
+    ) -> None:
+        monkeypatch.setattr(profiling, "MAX_STORED_PROFILES", 2)
+        for _ in range(3):
+            admin_client.get("/app/cars/", HTTP_X_PROFILE="1")
+
+        assert len([*profiles_dir.glob("*.json")]) == 2
+        assert len([*profiles_dir.glob("*.pstats")]) == 2
+
+
+class TestsProfilesEndpoints:
+    @pytest.mark.django_db
+    def test_list_and_download(self, admin_client: Client, tmp_path: Path) -> None:
+        profile_ids = [
+            admin_client.get(path, HTTP_X_PROFILE="1")["X-Profile-Id"]
+            for path in ["/app/owners/", "/app/cars/"]
+        ]
+        response_get_profiles = admin_client.get("/app/profiles/")
+        response_get_stats = admin_client.get(f"/app/profiles/{profile_ids[1]}/stats/")
+        stats_path = tmp_path / "downloaded.pstats"
+        stats_path.write_bytes(b"".join(response_get_stats.streaming_content))
+
+        assert response_get_profiles.status_code == 200
+        assert [profile["id"] for profile in response_get_profiles.json()] == [
+            *reversed(profile_ids)
+        ]
+        assert "functions" not in response_get_profiles.json()[0]
+        assert response_get_stats.status_code == 200
+        assert "attachment" in response_get_stats["Content-Disposition"]
+        assert pstats.Stats(str(stats_path)).total_calls > 0
+
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "/app/profiles/",
+            f"/app/profiles/{uuid.uuid4()}/",
+            f"/app/profiles/{uuid.uuid4()}/stats/",
+        ],
+    )
+    @pytest.mark.django_db
+    def test_forbidden_for_anonymous(self, client: Client, path: str) -> None:
+        response_get_profile = client.get(path)
+
+        assert response_get_profile.status_code == 403
+
+    @pytest.mark.parametrize("suffix", ["", "stats/"])
+    @pytest.mark.django_db
+    def test_missing_profile(self, admin_client: Client, suffix: str) -> None:
+        response_get_profile = admin_client.get(
+            f"/app/profiles/{uuid.uuid4()}/{suffix}"
+        )
+
+        assert response_get_profile.status_code == 404
@@ -0,0 +1,284 @@
+import contextlib
+import cProfile
+import datetime
+import json
+import math
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Iterator, NamedTuple
+import pytest
+from django.db import connection
+from django.db.models import Model
+from django.db.models.sql.constants import GET_ITERATOR_CHUNK_SIZE
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver
+from application import urls
+from application.models import Owner, Car
+from application.profiling import get_profile_path
+
+
+class Rows(NamedTuple):
+    owners: list[Owner]
+    cars: list[Car]
+
+
+class Budget(NamedTuple):
+    # Name of the URL in application/urls.py
+    url_name: str
+    method: str
+    path: str
+    max_queries: int
+    # Request body built for the rows, e.g. one item per row for bulk endpoints
+    data: Callable[[Rows], Any] | None = None
+    # Queries repeated per chunk of rows, Django deletes collected rows by chunks
+    chunked_queries: int = 0
+    # Batches of a bulk write of the rows, one query each. Databases limiting the
+    # number of query parameters, e.g. SQLite, split large writes.
+    bulk_batches: Callable[[Rows], int] | None = None
+    # Sent by a logged in staff user, whose session and user are loaded first
+    staff: bool = False
+
+
+NEW_OWNER = {"name": "Tadeusz", "surname": "Madej", "phone": "789456789"}
+
+
+def get_create_batches(model: type[Model], rows_number: int) -> int:
+    fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+    batch_size = connection.ops.bulk_batch_size(fields, [None] * rows_number)
+    return math.ceil(rows_number / batch_size)
+
+
+def get_update_batches(fields: list[str], rows_number: int) -> int:
+    # bulk_update sends the pk twice per row, in CASE WHEN and in WHERE
+    batch_size = connection.ops.bulk_batch_size(
+        ["pk", "pk", *fields], [None] * rows_number
+    )
+    return math.ceil(rows_number / batch_size)
+
+
+def get_new_car_data(owner: Owner) -> dict[str, Any]:
+    return {
+        "brand": "Skoda",
+        "model": "Superb",
+        "production_date": "2023-05-20",
+        "problem_description": "Engine start problem",
+        "repaired": False,
+        "total_cost": 100,
+        "owner": owner.id,
+    }
+
+
+# Maximum number of queries per request, the same for 1 and for 500 rows except
+# for chunked queries and bulk batches. Paths are formatted with the first owner's
+# and car's ids and a stored profile's id.
+BUDGETS = [
+    Budget("owner-list", "get", "/app/owners/?page_size=500", 2),
+    Budget("owner-list", "get", "/app/owners/?page_size=500&expand=cars", 4),
+    Budget("owner-list", "get", "/app/owners/?page_size=500&ordering=surname", 2),
+    Budget("owner-list", "get", "/app/owners/?surname=nowak", 2),
+    Budget("owner-list", "post", "/app/owners/", 2, lambda rows: NEW_OWNER),
+    Budget("owner-detail", "get", "/app/owners/{owner_id}/", 2),
+    Budget("owner-detail", "get", "/app/owners/{owner_id}/?expand=cars", 4),
+    Budget("owner-detail", "get", "/app/owners/{owner_id}/?fields=id,cars", 2),
+    Budget("owner-detail", "patch", "/app/owners/{owner_id}/", 2, lambda rows: {}),
+    Budget("owner-detail", "delete", "/app/owners/{owner_id}/", 7, chunked_queries=1),
+    Budget(
+        "owner-bulk",
+        "post",
+        "/app/owners/bulk/",
+        4,
+        lambda rows: [
+            {**NEW_OWNER, "phone": f"{600000000 + index}"}
+            for index, _ in enumerate(rows.owners)
+        ],
+        bulk_batches=lambda rows: get_create_batches(Owner, len(rows.owners)),
+    ),
+    Budget(
+        "owner-bulk",
+        "patch",
+        "/app/owners/bulk/",
+        4,
+        lambda rows: [{"id": owner.id, "name": "Jan"} for owner in rows.owners],
+        bulk_batches=lambda rows: get_update_batches(
+            ["name", "updated_at"], len(rows.owners)
+        ),
+    ),
+    Budget("car-list", "get", "/app/cars/?page_size=500", 2),
+    Budget("car-list", "get", "/app/cars/?page_size=500&expand=owner", 3),
+    Budget("car-list", "get", "/app/cars/?page_size=500&ordering=brand", 2),
+    Budget("car-list", "get", "/app/cars/?brand=ford&page_size=500", 2),
+    Budget("car-list", "get", "/app/cars/?search=breaks&page_size=500", 2),
+    Budget("car-list", "get", "/app/cars/?include_archived=true&expand=owner", 3),
+    Budget("car-list", "get", "/app/cars/?fields=id,brand&page_size=500", 2),
+    Budget("car-list", "get", "/app/cars/?omit=owner_details&expand=owner", 3),
+    Budget(
+        "car-list",
+        "post",
+        "/app/cars/",
+        4,
+        lambda rows: get_new_car_data(rows.owners[0]),
+    ),
+    Budget("car-detail", "get", "/app/cars/{car_id}/", 2),
+    Budget("car-detail", "get", "/app/cars/{car_id}/?expand=owner", 3),
+    Budget("car-detail", "get", "/app/cars/{car_id}/?include_archived=true", 2),
+    Budget("car-detail", "patch", "/app/cars/{car_id}/", 2, lambda rows: {}),
+    Budget("car-detail", "delete", "/app/cars/{car_id}/", 4),
+    Budget("car-unrepaired", "get", "/app/cars/unrepaired/?page_size=500", 2),
+    Budget("car-export", "get", "/app/cars/export/", 1),
+    Budget("car-export", "get", "/app/cars/export/?output=ndjson", 1),
+    Budget(
+        "car-bulk",
+        "post",
+        "/app/cars/bulk/",
+        6,
+        lambda rows: [get_new_car_data(owner) for owner in rows.owners],
+        bulk_batches=lambda rows: get_create_batches(Car, len(rows.owners)),
+    ),
+    Budget(
+        "car-bulk",
+        "patch",
+        "/app/cars/bulk/",
+        6,
+        lambda rows: [{"id": car.id, "repaired": True} for car in rows.cars],
+        bulk_batches=lambda rows: get_update_batches(
+            ["repaired", "updated_at"], len(rows.cars)
+        ),
+    ),
+    Budget(
+        "car-transition",
+        "post",
+        "/app/cars/transition/",
+        6,
+        lambda rows: {"ids": [car.id for car in rows.cars], "repaired": True},
+    ),
+    Budget(
+        "car-transition",
+        "post",
+        "/app/cars/transition/",
+        6,
+        lambda rows: {"filter": {"brand": "ford"}, "total_cost": 150},
+    ),
+    Budget("api-root", "get", "/app/", 0),
+    Budget("async-owner-list", "get", "/app/async/owners/?page_size=500", 2),
+    Budget("async-owner-detail", "get", "/app/async/owners/{owner_id}/", 2),
+    Budget("async-car-list", "get", "/app/async/cars/?expand=owner&page_size=500", 3),
+    Budget("async-car-unrepaired", "get", "/app/async/cars/unrepaired/", 2),
+    Budget("async-car-detail", "get", "/app/async/cars/{car_id}/", 2),
+    Budget("cache-stats", "get", "/app/cache-stats/", 0),
+    Budget("metrics", "get", "/app/metrics/", 0),
+    Budget("profiles", "get", "/app/profiles/", 2, staff=True),
+    Budget("profile-detail", "get", "/app/profiles/{profile_id}/", 2, staff=True),
+    Budget("profile-stats", "get", "/app/profiles/{profile_id}/stats/", 2, staff=True),
+    Budget("stats", "get", "/app/stats/", 2),
+    Budget("openapi-json", "get", "/openapi.json", 0),
+    Budget("openapi-yaml", "get", "/openapi.yaml", 0),
+    Budget("schema-swagger-ui", "get", "/", 0),
+]
+
+
+def get_url_names(patterns: list[URLPattern | URLResolver]) -> set[str]:
+    names = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            names |= get_url_names(pattern.url_patterns)
+        elif pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+@contextlib.contextmanager
+def query_budget(max_queries: int, label: str) -> Iterator[CaptureQueriesContext]:
+    """
+    Fails when more than max_queries queries are run inside the block, printing
+    all of them, so the repeated one is easy to spot.
+    """
+    with CaptureQueriesContext(connection) as context:
+        yield context
+    if len(context) > max_queries:
+        queries = "\n".join(
+            f"{number}. {query['sql']}"
+            for number, query in enumerate(context.captured_queries, start=1)
+        )
+        pytest.fail(
+            f"{label} ran {len(context)} queries, budget is {max_queries}:\n{queries}",
+            pytrace=False,
+        )
+
+
+@pytest.fixture(params=[1, 500], ids=lambda rows_number: f"{rows_number}_rows")
+def rows(request: pytest.FixtureRequest) -> Rows:
+    owners = Owner.objects.bulk_create(
+        Owner(name="Andrzej", surname="Nowak", phone=f"{500000000 + index}")
+        for index in range(request.param)
+    )
+    # All cars belong to the first owner, so nested and cascaded rows grow too
+    cars = Car.objects.bulk_create(
+        Car(
+            brand="Ford",
+            model="Focus",
+            production_date=datetime.date(2020, 5, 1),
+            problem_description="Weak breaks",
+            owner=owners[0],
+        )
+        for _ in owners
+    )
+    return Rows(owners, cars)
+
+
+@pytest.fixture
+def profile_id(settings, tmp_path: Path) -> uuid.UUID:
+    settings.PROFILES_DIR = tmp_path
+    profile_id = uuid.uuid4()
+    cProfile.Profile().dump_stats(get_profile_path(profile_id, ".pstats"))
+    get_profile_path(profile_id, ".json").write_text(
+        json.dumps({"id": str(profile_id), "created_at": "2023-05-20T12:00:00"})
+    )
+    return profile_id
+
+
+class TestsQueryBudgets:
+    @pytest.mark.parametrize(
+        "budget", BUDGETS, ids=lambda budget: f"{budget.method} {budget.path}"
+    )
+    @pytest.mark.django_db
+    def test_endpoint_within_budget(
+        self,
+        request: pytest.FixtureRequest,
+        rows: Rows,
+        profile_id: uuid.UUID,
+        budget: Budget,
+    ) -> None:
+        client = request.getfixturevalue("admin_client" if budget.staff else "client")
+        path = budget.path.format(
+            owner_id=rows.owners[0].id, car_id=rows.cars[0].id, profile_id=profile_id
+        )
+        data = budget.data(rows) if budget.data else None
+        chunks_number = math.ceil(len(rows.cars) / GET_ITERATOR_CHUNK_SIZE)
+        max_queries = budget.max_queries + budget.chunked_queries * (chunks_number - 1)
+        if budget.bulk_batches:
+            max_queries += budget.bulk_batches(rows) - 1
+
+        with query_budget(max_queries, f"{budget.method.upper()} {path}"):
+            response = getattr(client, budget.method)(
+                path, data=data, content_type="application/json"
+            )
+            if response.streaming:
+                b"".join(response.streaming_content)
+
+        assert response.status_code < 400, response.content
+
+    @pytest.mark.parametrize("model, max_queries", [("owner", 5), ("car", 6)])
+    @pytest.mark.django_db
+    def test_admin_changelist_within_budget(
+        self, admin_client: Client, rows: Rows, model: str, max_queries: int
+    ) -> None:
+        with query_budget(max_queries, f"{model} admin changelist"):
+            response = admin_client.get(f"/admin/application/{model}/")
+
+        assert response.status_code == 200
+
+    def test_every_endpoint_has_budget(self) -> None:
+        assert get_url_names(urls.urlpatterns) == {
+            budget.url_name for budget in BUDGETS
+        }
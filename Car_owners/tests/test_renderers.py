@@ -0,0 +1,97 @@
+import datetime
+import decimal
+import io
+import msgpack
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from application.models import Car
+from application.renderers import (
+    MessagePackParser,
+    MessagePackRenderer,
+    ORJSONParser,
+    ORJSONRenderer,
+)
+
+MSGPACK = "application/msgpack"
+
+
+class TestsORJSONRenderer:
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"results": [{"id": 1, "brand": "Škoda", "total_cost": 290.6}]},
+            {"cost": decimal.Decimal("10.50"), "message": gettext_lazy("Not found")},
+            {"updated_at": datetime.datetime(2023, 5, 20, 12, 0, 0, 123456)},
+            {"text": "line separator"},
+            [],
+        ],
+        ids=["page", "decimal and lazy text", "datetime", "line separator", "empty"],
+    )
+    def test_same_output_as_json_renderer(self, data: dict | list) -> None:
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_indent_requested(self) -> None:
+        content = ORJSONRenderer().render({"id": 1}, "application/json; indent=4", {})
+
+        assert content == b'{\n    "id": 1\n}'
+
+    def test_parser(self) -> None:
+        assert ORJSONParser().parse(io.BytesIO(b'{"brand": "Ford"}')) == {
+            "brand": "Ford"
+        }
+        with pytest.raises(ParseError, match="JSON parse error"):
+            ORJSONParser().parse(io.BytesIO(b'{"brand": '))
+
+
+class TestsMessagePack:
+    def test_round_trip(self) -> None:
+        data = {
+            "results": [{"id": 1, "repaired": False, "total_cost": 290.6}],
+            "cost": decimal.Decimal("10.50"),
+        }
+        content = MessagePackRenderer().render(data)
+
+        assert MessagePackParser().parse(io.BytesIO(content)) == {
+            **data,
+            "cost": 10.5,
+        }
+
+    def test_invalid_body(self) -> None:
+        with pytest.raises(ParseError, match="MessagePack parse error"):
+            MessagePackParser().parse(io.BytesIO(b"\xc1"))
+
+    @pytest.mark.django_db
+    def test_negotiated_by_accept(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        response_json = api_client.get("/app/cars/")
+        response_msgpack = api_client.get("/app/cars/", HTTP_ACCEPT=MSGPACK)
+        response_async = api_client.get("/app/async/cars/", HTTP_ACCEPT=MSGPACK)
+
+        assert response_json["Content-Type"] == "application/json"
+        assert response_msgpack.status_code == status.HTTP_200_OK
+        assert response_msgpack["Content-Type"] == MSGPACK
+        assert msgpack.unpackb(response_msgpack.content) == response_json.json()
+        assert response_async["Content-Type"] == MSGPACK
+        assert msgpack.unpackb(response_async.content) == response_json.json()
+        # Each format is validated by its own ETag
+        assert response_msgpack["ETag"] != response_json["ETag"]
+
+    @pytest.mark.django_db
+    def test_create_from_msgpack_body(
+        self, api_client: APIClient, valid_car_view_data: dict[str, str | int]
+    ) -> None:
+        response_create_car = api_client.post(
+            "/app/cars/",
+            data=msgpack.packb(valid_car_view_data),
+            content_type=MSGPACK,
+            HTTP_ACCEPT=MSGPACK,
+        )
+
+        assert response_create_car.status_code == status.HTTP_201_CREATED
+        assert msgpack.unpackb(response_create_car.content)["brand"] == "Ford"
+        assert Car.objects.get().model == valid_car_view_data["model"]
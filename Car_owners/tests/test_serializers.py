@@ -2,7 +2,13 @@ import datetime
 import pytest
 from rest_framework import serializers
 from application.models import Owner, Car
-from application.serializers import OwnerSerializer, CarSerializer
+from application.serializers import (
+    OwnerSerializer,
+    CarSerializer,
+    OwnerWithCarsSerializer,
+    CarWithOwnerSerializer,
+    get_values_reader,
+)
 
 
 @pytest.mark.django_db
@@ -97,3 +103,20 @@ def test_car_serializer_validate_function_error_with_message(
     with pytest.raises(serializers.ValidationError, match=error_message):
         car_serializer = CarSerializer(data=car_serializer_data)
         car_serializer.validate(car_serializer_data)
+
+
+@pytest.mark.django_db
+def test_values_reader_matches_serializer(valid_car_model_data: Car) -> None:
+    values_reader = get_values_reader(CarSerializer)
+    rows = values_reader.get_values(Car.objects.all())
+
+    assert values_reader.to_representation(rows) == [
+        CarSerializer(valid_car_model_data).data
+    ]
+
+
+@pytest.mark.parametrize(
+    "serializer_class", [OwnerWithCarsSerializer, CarWithOwnerSerializer]
+)
+def test_values_reader_rejects_nested_serializers(serializer_class: type) -> None:
+    assert get_values_reader(serializer_class) is None
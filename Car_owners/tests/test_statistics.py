@@ -0,0 +1,308 @@
+import io
+import pytest
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APIClient
+from application.models import Owner, Car, CarStatistics
+
+
+def get_statistics() -> dict[tuple[str, str], tuple[int, int, float]]:
+    return {
+        (statistics.dimension, statistics.key): (
+            statistics.cars_count,
+            statistics.repaired_count,
+            round(statistics.revenue, 2),
+        )
+        for statistics in CarStatistics.objects.filter(cars_count__gt=0)
+    }
+
+
+class TestsCarStatistics:
+    @pytest.mark.django_db
+    def test_counters_follow_car_changes(
+        self, valid_car_model_data: Car, valid_new_owner_data: dict
+    ) -> None:
+        owner_id = str(valid_car_model_data.owner_id)
+        assert get_statistics() == {
+            ("total", ""): (1, 0, 290.6),
+            ("brand", "Ford"): (1, 0, 290.6),
+            ("owner", owner_id): (1, 0, 290.6),
+        }
+
+        new_owner = Owner.objects.create(**valid_new_owner_data)
+        car = Car.objects.get(pk=valid_car_model_data.pk)
+        car.brand = "Skoda"
+        car.repaired = True
+        car.total_cost = 100
+        car.owner = new_owner
+        car.save()
+        assert get_statistics() == {
+            ("total", ""): (1, 1, 100),
+            ("brand", "Skoda"): (1, 1, 100),
+            ("owner", str(new_owner.id)): (1, 1, 100),
+        }
+
+        car.delete()
+        assert get_statistics() == {}
+
+    @pytest.mark.django_db
+    def test_saving_twice_counts_once(self, valid_car_model_data: Car) -> None:
+        valid_car_model_data.total_cost = 300
+        valid_car_model_data.save()
+        valid_car_model_data.save()
+
+        assert get_statistics()[("total", "")] == (1, 0, 300)
+
+    @pytest.mark.django_db
+    def test_owner_deletion_removes_owner_row(self, valid_car_model_data: Car) -> None:
+        valid_car_model_data.owner.delete()
+
+        assert not CarStatistics.objects.filter(dimension="owner").exists()
+        assert get_statistics() == {}
+
+    @pytest.mark.django_db
+    def test_owner_deletion_removes_cascaded_cars(
+        self,
+        valid_car_model_data: Car,
+        valid_car_serializer_data: dict,
+        valid_new_owner_data: dict,
+    ) -> None:
+        Car.objects.create(**valid_car_serializer_data)
+        other_owner = Owner.objects.create(**valid_new_owner_data)
+        Car.objects.create(**{**valid_car_serializer_data, "owner": other_owner})
+        valid_car_model_data.owner.delete()
+
+        assert get_statistics() == {
+            ("total", ""): (1, 0, 290.6),
+            ("brand", "Ford"): (1, 0, 290.6),
+            ("owner", str(other_owner.id)): (1, 0, 290.6),
+        }
+
+    @pytest.mark.django_db
+    def test_bulk_endpoints_update_counters(
+        self,
+        api_client: APIClient,
+        valid_car_view_data: dict[str, str | int],
+        valid_new_car_view_data: dict[str, str | int],
+    ) -> None:
+        response_post = api_client.post(
+            "/app/cars/bulk/",
+            data=[valid_car_view_data, valid_new_car_view_data],
+            format="json",
+        )
+        car_id = response_post.data[0]["id"]
+        api_client.patch(
+            "/app/cars/bulk/",
+            data=[{"id": car_id, "repaired": True, "total_cost": 400}],
+            format="json",
+        )
+
+        assert get_statistics()[("total", "")] == (2, 2, 1300.3)
+        assert get_statistics()[("brand", "Ford")] == (1, 1, 400)
+
+    @pytest.mark.django_db
+    def test_rebuild_matches_incremental_counters(
+        self,
+        valid_car_model_data: Car,
+        valid_car_serializer_data: dict,
+    ) -> None:
+        Car.objects.create(**{**valid_car_serializer_data, "repaired": True})
+        incremental_statistics = get_statistics()
+        CarStatistics.objects.all().delete()
+        call_command("rebuild_car_statistics", stdout=io.StringIO())
+
+        assert get_statistics() == incremental_statistics
+
+    @pytest.mark.django_db
+    def test_statistics_endpoint(
+        self,
+        api_client: APIClient,
+        valid_car_model_data: Car,
+        valid_car_serializer_data: dict,
+        django_assert_num_queries,
+    ) -> None:
+        Car.objects.create(
+            **{
+                **valid_car_serializer_data,
+                "brand": "Skoda",
+                "repaired": True,
+                "total_cost": 100,
+            }
+        )
+        # Summary rows only, no matter how many cars there are
+        with django_assert_num_queries(2):
+            response_get_stats = api_client.get("/app/stats/", data={"owners": 5})
+
+        assert response_get_stats.status_code == status.HTTP_200_OK
+        assert response_get_stats.data == {
+            "cars": 2,
+            "repaired": 1,
+            "unrepaired": 1,
+            "revenue": 390.6,
+            "brands": [
+                {
+                    "brand": "Ford",
+                    "cars": 1,
+                    "repaired": 0,
+                    "unrepaired": 1,
+                    "revenue": 290.6,
+                },
+                {
+                    "brand": "Skoda",
+                    "cars": 1,
+                    "repaired": 1,
+                    "unrepaired": 0,
+                    "revenue": 100,
+                },
+            ],
+            "owners": [
+                {
+                    "owner": valid_car_model_data.owner_id,
+                    "cars": 2,
+                    "repaired": 1,
+                    "unrepaired": 1,
+                    "revenue": 390.6,
+                }
+            ],
+        }
+
+    @pytest.mark.django_db
+    def test_statistics_endpoint_invalid_owners(self, api_client: APIClient) -> None:
+        response_get_stats = api_client.get("/app/stats/", data={"owners": "all"})
+
+        assert response_get_stats.status_code == status.HTTP_400_BAD_REQUEST
+        assert response_get_stats.data["owners"] == (
+            "Owners should be a number from 0 to 100"
+        )
+
+
+def get_aggregates(owner: Owner) -> tuple[int, int, float]:
+    owner.refresh_from_db()
+    return owner.cars_count, owner.open_jobs_count, round(owner.lifetime_spend, 2)
+
+
+class TestsOwnerAggregates:
+    @pytest.mark.django_db
+    def test_aggregates_follow_car_changes(
+        self, valid_car_model_data: Car, valid_new_owner_data: dict
+    ) -> None:
+        owner = valid_car_model_data.owner
+        assert get_aggregates(owner) == (1, 1, 290.6)
+
+        car = Car.objects.get(pk=valid_car_model_data.pk)
+        car.repaired = True
+        car.total_cost = 100
+        car.save()
+        assert get_aggregates(owner) == (1, 0, 100)
+
+        new_owner = Owner.objects.create(**valid_new_owner_data)
+        car.owner = new_owner
+        car.save()
+        assert get_aggregates(owner) == (0, 0, 0)
+        assert get_aggregates(new_owner) == (1, 0, 100)
+
+        car.delete()
+        assert get_aggregates(new_owner) == (0, 0, 0)
+
+    @pytest.mark.django_db
+    def test_owner_save_keeps_aggregates(
+        self, valid_owner_model_data: Owner, valid_car_serializer_data: dict
+    ) -> None:
+        Car.objects.create(**valid_car_serializer_data)
+        # A copy loaded before the car was added
+        valid_owner_model_data.name = "Jan"
+        valid_owner_model_data.save()
+
+        assert get_aggregates(valid_owner_model_data) == (1, 1, 290.6)
+        assert valid_owner_model_data.name == "Jan"
+
+    @pytest.mark.django_db
+    def test_bulk_endpoints_update_aggregates(
+        self,
+        api_client: APIClient,
+        valid_owner_model_data: Owner,
+        valid_car_view_data: dict[str, str | int],
+    ) -> None:
+        response_post = api_client.post(
+            "/app/cars/bulk/", data=[valid_car_view_data] * 3, format="json"
+        )
+        api_client.patch(
+            "/app/cars/bulk/",
+            data=[{"id": response_post.data[0]["id"], "repaired": True}],
+            format="json",
+        )
+
+        assert get_aggregates(valid_owner_model_data) == (3, 2, 1152.6)
+
+    @pytest.mark.django_db
+    def test_bulk_update_repeated_id_rejected(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        owner = valid_car_model_data.owner
+        statistics = get_statistics()
+        aggregates = get_aggregates(owner)
+        response_patch = api_client.patch(
+            "/app/cars/bulk/",
+            data=[
+                {"id": valid_car_model_data.id, "repaired": True, "total_cost": 50},
+                {"id": valid_car_model_data.id, "total_cost": 70},
+            ],
+            format="json",
+        )
+
+        assert response_patch.status_code == status.HTTP_400_BAD_REQUEST
+        assert response_patch.data[0] == {}
+        assert "id" in response_patch.data[1]
+        assert get_statistics() == statistics
+        assert get_aggregates(owner) == aggregates
+
+    @pytest.mark.django_db
+    def test_owners_ordered_by_aggregates(
+        self,
+        api_client: APIClient,
+        valid_car_model_data: Car,
+        valid_new_owner_data: dict,
+    ) -> None:
+        new_owner = Owner.objects.create(**valid_new_owner_data)
+        response_get_owners = api_client.get(
+            "/app/owners/", data={"ordering": "-cars_count"}, format="json"
+        )
+
+        assert response_get_owners.status_code == status.HTTP_200_OK
+        assert [
+            (owner["id"], owner["cars_count"], owner["lifetime_spend"])
+            for owner in response_get_owners.data["results"]
+        ] == [(valid_car_model_data.owner_id, 1, 290.6), (new_owner.id, 0, 0.0)]
+
+    @pytest.mark.django_db
+    def test_aggregates_are_read_only(
+        self, api_client: APIClient, valid_owner_model_data: Owner
+    ) -> None:
+        response_patch = api_client.patch(
+            f"/app/owners/{valid_owner_model_data.id}/",
+            data={"cars_count": 100},
+            format="json",
+        )
+
+        assert response_patch.data["cars_count"] == 0
+        assert get_aggregates(valid_owner_model_data) == (0, 0, 0)
+
+    @pytest.mark.django_db
+    def test_reconcile_fixes_drift(
+        self,
+        valid_car_model_data: Car,
+        valid_car_serializer_data: dict,
+        valid_new_owner_data: dict,
+    ) -> None:
+        owner = valid_car_model_data.owner
+        other_owner = Owner.objects.create(**valid_new_owner_data)
+        Car.objects.create(**{**valid_car_serializer_data, "owner": other_owner})
+        # queryset.update() sends no signals
+        Car.objects.filter(owner=owner).update(repaired=True, total_cost=50)
+        Owner.objects.filter(pk=other_owner.pk).update(cars_count=7)
+        stdout = io.StringIO()
+        call_command("reconcile_owner_aggregates", "--batch-size=1", stdout=stdout)
+
+        assert "Fixed aggregates of 2 owners" in stdout.getvalue()
+        assert get_aggregates(owner) == (1, 0, 50)
+        assert get_aggregates(other_owner) == (1, 1, 290.6)
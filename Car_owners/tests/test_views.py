@@ -1,10 +1,14 @@
 import datetime
+import json
 import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APIClient
 from application.models import Owner, Car
 from application.serializers import OwnerSerializer, CarSerializer
-from application.views import OwnerViewSet, CarViewSet
+from application.views import BaseViewSet, OwnerViewSet, CarViewSet
 
 
 class TestsOwnerViews:
@@ -185,6 +189,10 @@ class TestsCarViews:
                 {"production_date": datetime.date.today() + datetime.timedelta(days=1)},
                 "Production date cannot be from the future.",
             ),
+            (
+                {"production_date": "01.01.2020"},
+                "Date should be in YYYY-MM-DD format.",
+            ),
             (
                 {"ordering": "invalid ordering"},
                 f"Ordering should be one of the following: {', '.join(CarViewSet().ordering_fields)}",
@@ -205,6 +213,29 @@ class TestsCarViews:
         assert response_get_car_invalid_data.status_code == status.HTTP_400_BAD_REQUEST
         assert response_get_car_invalid_data.data[key] == expected_message
 
+    @pytest.mark.parametrize(
+        ("url", "data"),
+        [
+            ("/app/owners/", {"phone": "123"}),
+            ("/app/owners/", {"ordering": "phone"}),
+            ("/app/owners/1/", {"expand": "owner"}),
+            ("/app/cars/", {"production_date": "2020-13-01"}),
+            ("/app/cars/unrepaired/", {"ordering": "owner"}),
+            ("/app/cars/export/", {"production_date": "tomorrow"}),
+        ],
+    )
+    @pytest.mark.django_db
+    def test_invalid_query_params_without_queries(
+        self,
+        api_client: APIClient,
+        django_assert_num_queries,
+        url: str,
+        data: dict[str, str],
+    ) -> None:
+        with django_assert_num_queries(0):
+            response_get = api_client.get(url, data=data)
+        assert response_get.status_code == status.HTTP_400_BAD_REQUEST
+
     @pytest.mark.django_db
     def test_car_not_exist(
         self,
@@ -251,3 +282,668 @@ class TestsCommon:
             response_get_model.data
             == f"There is no {model_str.title()} with given data"
         )
+
+
+class TestsCarSearch:
+    @pytest.mark.django_db
+    def test_search_problem_description(
+        self, api_client: APIClient, valid_owner_model_data: Owner
+    ) -> None:
+        matching_car = Car.objects.create(
+            brand="Ford",
+            model="Focus",
+            production_date=datetime.date(2020, 1, 1),
+            problem_description="Weak breaks",
+            owner=valid_owner_model_data,
+        )
+        Car.objects.create(
+            brand="Skoda",
+            model="Superb",
+            production_date=datetime.date(2020, 1, 1),
+            problem_description="Engine start problem",
+            owner=valid_owner_model_data,
+        )
+        response_search_car = api_client.get(
+            "/app/cars/", data={"search": "breaks"}, format="json"
+        )
+        assert response_search_car.status_code == status.HTTP_200_OK
+        assert [car["id"] for car in response_search_car.data["results"]] == [
+            matching_car.id
+        ]
+
+    @pytest.mark.skipif(
+        connection.vendor != "postgresql", reason="Ranking requires pg_trgm"
+    )
+    @pytest.mark.django_db
+    def test_search_results_ranked(
+        self, api_client: APIClient, valid_owner_model_data: Owner
+    ) -> None:
+        partial_match = Car.objects.create(
+            brand="Ford",
+            model="Focus",
+            production_date=datetime.date(2020, 1, 1),
+            problem_description="Brake pads worn",
+            owner=valid_owner_model_data,
+        )
+        exact_match = Car.objects.create(
+            brand="Ford",
+            model="Mondeo",
+            production_date=datetime.date(2020, 1, 1),
+            problem_description="Brakes squeal",
+            owner=valid_owner_model_data,
+        )
+        response_search_car = api_client.get(
+            "/app/cars/", data={"search": "brakes"}, format="json"
+        )
+        assert [car["id"] for car in response_search_car.data["results"]] == [
+            exact_match.id,
+            partial_match.id,
+        ]
+
+
+class TestsBulkViews:
+    @pytest.mark.django_db
+    def test_bulk_create_cars(
+        self,
+        api_client: APIClient,
+        valid_car_view_data: dict[str, str | int],
+        valid_new_car_view_data: dict[str, str | int],
+        django_assert_max_num_queries,
+    ) -> None:
+        cars_data = [valid_car_view_data, valid_new_car_view_data] * 5
+        # One owners lookup, one INSERT, one car statistics upsert and one owner
+        # aggregates update regardless of the number of cars
+        with django_assert_max_num_queries(6):
+            response_create_cars = api_client.post(
+                "/app/cars/bulk/", data=cars_data, format="json"
+            )
+        assert response_create_cars.status_code == status.HTTP_201_CREATED
+        assert len(response_create_cars.data) == len(cars_data)
+        assert Car.objects.count() == len(cars_data)
+
+    @pytest.mark.django_db
+    def test_bulk_create_cars_errors_per_item(
+        self, api_client: APIClient, valid_car_view_data: dict[str, str | int]
+    ) -> None:
+        cars_data = [
+            valid_car_view_data,
+            {**valid_car_view_data, "total_cost": -1},
+            {**valid_car_view_data, "owner": valid_car_view_data["owner"] + 1},
+        ]
+        response_create_cars = api_client.post(
+            "/app/cars/bulk/", data=cars_data, format="json"
+        )
+        assert response_create_cars.status_code == status.HTTP_400_BAD_REQUEST
+        assert response_create_cars.data[0] == {}
+        assert response_create_cars.data[1]["total_cost"] == [
+            "Total cost cannot be negative."
+        ]
+        assert "owner" in response_create_cars.data[2]
+        assert not Car.objects.exists()
+
+    @pytest.mark.django_db
+    def test_bulk_update_cars(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        response_update_cars = api_client.patch(
+            "/app/cars/bulk/",
+            data=[{"id": valid_car_model_data.id, "repaired": True}],
+            format="json",
+        )
+        valid_car_model_data.refresh_from_db()
+        assert response_update_cars.status_code == status.HTTP_200_OK
+        assert response_update_cars.data[0]["repaired"] is True
+        assert valid_car_model_data.repaired is True
+
+    @pytest.mark.django_db
+    def test_bulk_update_unknown_id(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        response_update_cars = api_client.patch(
+            "/app/cars/bulk/",
+            data=[
+                {"id": valid_car_model_data.id, "repaired": True},
+                {"id": valid_car_model_data.id + 1, "repaired": True},
+            ],
+            format="json",
+        )
+        assert response_update_cars.status_code == status.HTTP_400_BAD_REQUEST
+        assert response_update_cars.data[0] == {}
+        assert "id" in response_update_cars.data[1]
+
+    @pytest.mark.django_db
+    def test_bulk_create_owners(
+        self,
+        api_client: APIClient,
+        valid_owner_data: dict[str, str],
+        valid_new_owner_data: dict[str, str],
+    ) -> None:
+        response_create_owners = api_client.post(
+            "/app/owners/bulk/",
+            data=[valid_owner_data, valid_new_owner_data],
+            format="json",
+        )
+        assert response_create_owners.status_code == status.HTTP_201_CREATED
+        assert [owner["phone"] for owner in response_create_owners.data] == [
+            valid_owner_data["phone"],
+            valid_new_owner_data["phone"],
+        ]
+
+    @pytest.mark.django_db
+    def test_bulk_create_owners_repeated_phone(
+        self, api_client: APIClient, valid_owner_data: dict[str, str]
+    ) -> None:
+        response_create_owners = api_client.post(
+            "/app/owners/bulk/",
+            data=[valid_owner_data, valid_owner_data],
+            format="json",
+        )
+        assert response_create_owners.status_code == status.HTTP_400_BAD_REQUEST
+        assert response_create_owners.data[1]["phone"] == [
+            "Phone number is repeated in the request."
+        ]
+
+    @pytest.mark.django_db
+    def test_bulk_create_owners_taken_phone(
+        self,
+        api_client: APIClient,
+        valid_owner_model_data: Owner,
+        valid_owner_data: dict[str, str],
+        valid_new_owner_data: dict[str, str],
+    ) -> None:
+        response_create_owners = api_client.post(
+            "/app/owners/bulk/",
+            data=[valid_new_owner_data, valid_owner_data],
+            format="json",
+        )
+        assert response_create_owners.status_code == status.HTTP_400_BAD_REQUEST
+        assert response_create_owners.data[0] == {}
+        assert response_create_owners.data[1]["phone"] == [
+            "owner with this phone already exists."
+        ]
+
+    @pytest.mark.django_db
+    def test_bulk_update_owner_keeps_own_phone(
+        self, api_client: APIClient, valid_owner_model_data: Owner
+    ) -> None:
+        response_update_owners = api_client.patch(
+            "/app/owners/bulk/",
+            data=[
+                {
+                    "id": valid_owner_model_data.id,
+                    "name": "Adam",
+                    "phone": valid_owner_model_data.phone,
+                }
+            ],
+            format="json",
+        )
+        assert response_update_owners.status_code == status.HTTP_200_OK
+        assert response_update_owners.data[0]["name"] == "Adam"
+
+
+class TestsCarTransition:
+    @pytest.mark.django_db
+    def test_transition_by_ids(
+        self,
+        api_client: APIClient,
+        valid_car_model_data: Car,
+        valid_car_serializer_data: dict,
+    ) -> None:
+        other_car = Car.objects.create(**{**valid_car_serializer_data, "brand": "Opel"})
+        response_transition = api_client.post(
+            "/app/cars/transition/",
+            data={
+                "ids": [other_car.id, valid_car_model_data.id],
+                "repaired": True,
+                "total_cost": 500,
+            },
+            format="json",
+        )
+        owner = valid_car_model_data.owner
+        owner.refresh_from_db()
+
+        assert response_transition.status_code == status.HTTP_200_OK
+        assert response_transition.data == [
+            {
+                **CarSerializer(car).data,
+                "repaired": True,
+                "total_cost": 500.0,
+            }
+            for car in [valid_car_model_data, other_car]
+        ]
+        assert [*Car.objects.values_list("repaired", "total_cost")] == [
+            (True, 500.0),
+            (True, 500.0),
+        ]
+        assert Car.objects.filter(updated_at__gt=other_car.updated_at).count() == 2
+        assert (owner.cars_count, owner.open_jobs_count, owner.lifetime_spend) == (
+            2,
+            0,
+            1000.0,
+        )
+
+    @pytest.mark.django_db
+    def test_transition_by_filter(
+        self,
+        api_client: APIClient,
+        valid_car_model_data: Car,
+        valid_car_serializer_data: dict,
+    ) -> None:
+        other_car = Car.objects.create(**{**valid_car_serializer_data, "brand": "Opel"})
+        response_transition = api_client.post(
+            "/app/cars/transition/",
+            data={"filter": {"brand": "opel", "repaired": "false"}, "repaired": True},
+            format="json",
+        )
+
+        assert response_transition.status_code == status.HTTP_200_OK
+        assert [car["id"] for car in response_transition.data] == [other_car.id]
+        assert [*Car.objects.order_by("id").values_list("repaired", flat=True)] == [
+            False,
+            True,
+        ]
+
+    @pytest.mark.django_db
+    def test_transition_nothing_matched(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        response_transition = api_client.post(
+            "/app/cars/transition/",
+            data={"filter": {"brand": "opel"}, "repaired": True},
+            format="json",
+        )
+
+        assert response_transition.status_code == status.HTTP_200_OK
+        assert response_transition.data == []
+
+    @pytest.mark.parametrize(
+        "data, field, message",
+        [
+            ({"repaired": True}, "ids", "Give either ids or a filter of cars."),
+            (
+                {"ids": [1], "filter": {"brand": "ford"}, "repaired": True},
+                "ids",
+                "Give either ids or a filter of cars.",
+            ),
+            ({"ids": [1]}, "repaired", "Give repaired or total_cost to set."),
+            (
+                {"ids": [1], "total_cost": -1},
+                "total_cost",
+                "Total cost cannot be negative.",
+            ),
+            (
+                {"filter": {"colour": "red"}, "repaired": True},
+                "filter",
+                "Unknown filters: colour",
+            ),
+        ],
+        ids=["no cars", "ids and filter", "no values", "negative cost", "typo"],
+    )
+    @pytest.mark.django_db
+    def test_invalid_transition(
+        self,
+        api_client: APIClient,
+        valid_car_model_data: Car,
+        data: dict,
+        field: str,
+        message: str,
+    ) -> None:
+        response_transition = api_client.post(
+            "/app/cars/transition/", data=data, format="json"
+        )
+        valid_car_model_data.refresh_from_db()
+
+        assert response_transition.status_code == status.HTTP_400_BAD_REQUEST
+        assert message in str(response_transition.data[field])
+        assert valid_car_model_data.repaired is False
+
+    @pytest.mark.django_db
+    def test_transition_unknown_id(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        response_transition = api_client.post(
+            "/app/cars/transition/",
+            data={"ids": [valid_car_model_data.id + 1], "repaired": True},
+            format="json",
+        )
+
+        assert response_transition.status_code == status.HTTP_400_BAD_REQUEST
+        assert response_transition.data["ids"] == (
+            f"Cars do not exist: {valid_car_model_data.id + 1}"
+        )
+
+    @pytest.mark.django_db
+    def test_transition_too_many_cars(
+        self, api_client: APIClient, valid_car_model_data: Car, monkeypatch
+    ) -> None:
+        monkeypatch.setattr("application.views.MAX_TRANSITION_CARS", 0)
+        response_transition = api_client.post(
+            "/app/cars/transition/",
+            data={"filter": {"brand": "ford"}, "repaired": True},
+            format="json",
+        )
+        valid_car_model_data.refresh_from_db()
+
+        assert response_transition.status_code == status.HTTP_400_BAD_REQUEST
+        assert "narrow it down" in response_transition.data["filter"]
+        assert valid_car_model_data.repaired is False
+
+
+class TestsCarExport:
+    @pytest.mark.django_db
+    def test_export_csv(self, api_client: APIClient, valid_car_model_data: Car) -> None:
+        response_export = api_client.get("/app/cars/export/")
+        lines = b"".join(response_export.streaming_content).decode().splitlines()
+        assert response_export.status_code == status.HTTP_200_OK
+        assert response_export["Content-Type"] == "text/csv"
+        assert lines[0] == ",".join(CarSerializer.Meta.fields)
+        assert lines[1].startswith(f"{valid_car_model_data.id},Ford,Focus,")
+        assert len(lines) == 2
+
+    @pytest.mark.django_db
+    def test_export_ndjson_matches_serializer(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        response_export = api_client.get("/app/cars/export/", data={"output": "ndjson"})
+        lines = b"".join(response_export.streaming_content).decode().splitlines()
+        assert response_export["Content-Type"] == "application/x-ndjson"
+        assert [json.loads(line) for line in lines] == [
+            CarSerializer(valid_car_model_data).data
+        ]
+
+    @pytest.mark.django_db
+    def test_export_applies_filters(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        response_export = api_client.get(
+            "/app/cars/export/", data={"brand": "skoda", "output": "ndjson"}
+        )
+        assert b"".join(response_export.streaming_content) == b""
+
+    @pytest.mark.django_db
+    def test_export_invalid_output(self, api_client: APIClient) -> None:
+        response_export = api_client.get("/app/cars/export/", data={"output": "xml"})
+        assert response_export.status_code == status.HTTP_400_BAD_REQUEST
+        assert response_export.data["output"] == (
+            "Output should be one of the following: csv, ndjson"
+        )
+
+
+class TestsExpandViews:
+    @pytest.mark.parametrize("owners_number", [1, 5])
+    @pytest.mark.django_db
+    def test_owners_with_cars_constant_queries(
+        self,
+        api_client: APIClient,
+        django_assert_num_queries,
+        owners_number: int,
+    ) -> None:
+        for index in range(owners_number):
+            owner = Owner.objects.create(
+                name="Adam", surname="Knafel", phone=f"{index:09d}"
+            )
+            for model in ["Focus", "Mondeo"]:
+                Car.objects.create(
+                    brand="Ford",
+                    model=model,
+                    production_date=datetime.date(2020, 1, 1),
+                    owner=owner,
+                )
+
+        # The owners page, all of their cars and validators of the embedded cars
+        with django_assert_num_queries(3):
+            response_get_owners = api_client.get(
+                "/app/owners/", data={"expand": "cars"}, format="json"
+            )
+        assert len(response_get_owners.data["results"]) == owners_number
+        assert all(
+            [
+                [car["model"] for car in owner["cars"]] == ["Focus", "Mondeo"]
+                for owner in response_get_owners.data["results"]
+            ]
+        )
+
+    @pytest.mark.django_db
+    def test_embedded_validators_limited_to_page(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        Owner.objects.create(name="Adam", surname="Knafel", phone="987654321")
+        with CaptureQueriesContext(connection) as context:
+            response_get_owners = api_client.get(
+                "/app/owners/",
+                data={"expand": "cars", "page_size": 1},
+                format="json",
+            )
+        assert response_get_owners.status_code == status.HTTP_200_OK
+        validators_sql = context.captured_queries[-1]["sql"]
+        # Only cars of the listed owner, not of every owner matching the filters
+        assert f'"owner_id" IN ({valid_car_model_data.owner_id})' in validators_sql
+        assert "application_owner" not in validators_sql
+
+    @pytest.mark.django_db
+    def test_get_owner_with_cars(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        owner_id = valid_car_model_data.owner_id
+        response_get_owner = api_client.get(
+            f"/app/owners/{owner_id}/", data={"expand": "cars"}, format="json"
+        )
+        assert response_get_owner.data["cars"] == [
+            CarSerializer(valid_car_model_data).data
+        ]
+
+    @pytest.mark.django_db
+    def test_cars_with_owner_joined_query(
+        self,
+        api_client: APIClient,
+        valid_car_model_data: Car,
+        valid_new_car_view_data: dict[str, str | int],
+        django_assert_num_queries,
+    ) -> None:
+        api_client.post("/app/cars/", data=valid_new_car_view_data, format="json")
+        # The cars page joined with owners, then validators of the embedded owners
+        with django_assert_num_queries(2):
+            response_get_cars = api_client.get(
+                "/app/cars/", data={"expand": "owner"}, format="json"
+            )
+        # Aggregates were updated in the database since the owner was loaded
+        valid_car_model_data.owner.refresh_from_db()
+        assert [car["owner_details"] for car in response_get_cars.data["results"]] == [
+            OwnerSerializer(valid_car_model_data.owner).data
+        ] * 2
+
+    @pytest.mark.django_db
+    def test_invalid_expand(self, api_client: APIClient) -> None:
+        response_get_owners = api_client.get(
+            "/app/owners/", data={"expand": "owner"}, format="json"
+        )
+        assert response_get_owners.status_code == status.HTTP_400_BAD_REQUEST
+        assert response_get_owners.data["expand"] == (
+            "Expand should be one of the following: cars"
+        )
+
+
+class TestsValuesFastPath:
+    def get_serializer_path_content(
+        self, api_client: APIClient, monkeypatch: pytest.MonkeyPatch, url: str
+    ) -> bytes:
+        caches["api_responses"].clear()
+        with monkeypatch.context() as patch:
+            patch.setattr(BaseViewSet, "get_values_reader", lambda view: None)
+            return api_client.get(url).content
+
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "/app/owners/",
+            "/app/owners/?ordering=surname&page_size=1",
+            "/app/cars/",
+            "/app/cars/?ordering=production_date&page_size=1",
+            "/app/cars/?search=breaks",
+            "/app/cars/unrepaired/",
+        ],
+    )
+    @pytest.mark.django_db
+    def test_output_identical_to_serializers(
+        self,
+        api_client: APIClient,
+        valid_car_model_data: Car,
+        valid_new_car_view_data: dict[str, str | int],
+        monkeypatch: pytest.MonkeyPatch,
+        url: str,
+    ) -> None:
+        api_client.post("/app/cars/", data=valid_new_car_view_data, format="json")
+        Car.objects.create(
+            brand="Fiat",
+            model="Panda",
+            production_date=datetime.date(2019, 3, 10),
+            total_cost=12,
+            owner=valid_car_model_data.owner,
+        )
+
+        response_get = api_client.get(url)
+        assert response_get.status_code == status.HTTP_200_OK
+        assert response_get.content == self.get_serializer_path_content(
+            api_client, monkeypatch, url
+        )
+
+    @pytest.mark.django_db
+    def test_serializers_not_used(
+        self,
+        api_client: APIClient,
+        valid_car_model_data: Car,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        def fail_representation(*args, **kwargs) -> None:
+            raise AssertionError("Serializer should not run on the fast path")
+
+        monkeypatch.setattr(CarSerializer, "to_representation", fail_representation)
+        response_get_cars = api_client.get("/app/cars/unrepaired/")
+
+        assert response_get_cars.data["results"][0]["id"] == valid_car_model_data.id
+
+    @pytest.mark.django_db
+    def test_expanded_list_uses_serializers(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        response_get_owners = api_client.get("/app/owners/", data={"expand": "cars"})
+
+        assert response_get_owners.data["results"][0]["cars"] == [
+            CarSerializer(valid_car_model_data).data
+        ]
+
+
+class TestsSparseFieldsets:
+    @staticmethod
+    def get_selected_sql(context: CaptureQueriesContext, table: str) -> str:
+        return "\n".join(
+            query["sql"].split(" FROM ")[0]
+            for query in context.captured_queries
+            if query["sql"].startswith("SELECT") and f'FROM "{table}"' in query["sql"]
+        )
+
+    @pytest.mark.django_db
+    def test_list_only_given_fields(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        with CaptureQueriesContext(connection) as context:
+            response_get_cars = api_client.get(
+                "/app/cars/", data={"fields": "id,brand,model,repaired"}, format="json"
+            )
+        selected_sql = self.get_selected_sql(context, "application_car")
+
+        assert response_get_cars.status_code == status.HTTP_200_OK
+        assert response_get_cars.data["results"] == [
+            {
+                "id": valid_car_model_data.id,
+                "brand": "Ford",
+                "model": "Focus",
+                "repaired": False,
+            }
+        ]
+        assert '"brand"' in selected_sql
+        assert '"problem_description"' not in selected_sql
+
+    @pytest.mark.django_db
+    def test_retrieve_without_omitted_fields(
+        self, api_client: APIClient, valid_owner_model_data: Owner
+    ) -> None:
+        with CaptureQueriesContext(connection) as context:
+            response_get_owner = api_client.get(
+                f"/app/owners/{valid_owner_model_data.id}/",
+                data={"omit": "phone,lifetime_spend"},
+                format="json",
+            )
+        selected_sql = self.get_selected_sql(context, "application_owner")
+
+        assert response_get_owner.status_code == status.HTTP_200_OK
+        assert [*response_get_owner.data] == [
+            "id",
+            "name",
+            "surname",
+            "cars_count",
+            "open_jobs_count",
+        ]
+        assert '"phone"' not in selected_sql
+        assert '"lifetime_spend"' not in selected_sql
+
+    @pytest.mark.django_db
+    def test_expanded_fields(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        response_get_car = api_client.get(
+            f"/app/cars/{valid_car_model_data.id}/",
+            data={"expand": "owner", "fields": "brand,owner_details"},
+            format="json",
+        )
+        response_get_cars = api_client.get(
+            "/app/cars/",
+            data={"expand": "owner", "omit": "owner_details"},
+            format="json",
+        )
+
+        assert [*response_get_car.data] == ["brand", "owner_details"]
+        assert response_get_car.data["owner_details"]["name"] == "Andrzej"
+        assert "owner_details" not in response_get_cars.data["results"][0]
+        assert "problem_description" in response_get_cars.data["results"][0]
+
+    @pytest.mark.django_db
+    def test_pagination_by_field_not_sent(
+        self,
+        api_client: APIClient,
+        valid_car_model_data: Car,
+        valid_car_serializer_data: dict,
+    ) -> None:
+        other_car = Car.objects.create(**{**valid_car_serializer_data, "brand": "Audi"})
+        query = {"fields": "id", "ordering": "-brand", "page_size": 1}
+        response_first_page = api_client.get("/app/cars/", data=query, format="json")
+        response_second_page = api_client.get(
+            response_first_page.data["next"], format="json"
+        )
+
+        assert response_first_page.data["results"] == [{"id": valid_car_model_data.id}]
+        assert response_second_page.data["results"] == [{"id": other_car.id}]
+
+    @pytest.mark.django_db
+    def test_async_list_fields(
+        self, api_client: APIClient, valid_car_model_data: Car
+    ) -> None:
+        response_get_cars = api_client.get(
+            "/app/async/cars/unrepaired/", data={"fields": "id,repaired"}
+        )
+
+        assert response_get_cars.json()["results"] == [
+            {"id": valid_car_model_data.id, "repaired": False}
+        ]
+
+    @pytest.mark.parametrize("parameter", ["fields", "omit"])
+    @pytest.mark.django_db
+    def test_unknown_field(self, api_client: APIClient, parameter: str) -> None:
+        response_get_cars = api_client.get(
+            "/app/cars/", data={parameter: "brand,colour"}, format="json"
+        )
+
+        assert response_get_cars.status_code == status.HTTP_400_BAD_REQUEST
+        assert response_get_cars.data[parameter].startswith(
+            f"{parameter.title()} should be a comma separated list of: id, brand"
+        )